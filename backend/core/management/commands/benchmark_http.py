@@ -0,0 +1,109 @@
+"""
+Micro-benchmark das sessões HTTP com pool (core.services.http_pool).
+
+Compara chamadas com requests.get (conexão nova a cada chamada) com
+chamadas pela sessão keep-alive do pool. Por padrão sobe um servidor stub
+local (HTTP/1.1 com keep-alive) que responde um JSON pequeno; use --url
+para medir contra outro endpoint (ex: um stand-in HTTPS, onde o ganho do
+handshake TLS é maior).
+
+Uso:
+    python manage.py benchmark_http
+    python manage.py benchmark_http --chamadas 2000 --latencia-conexao 5
+    python manage.py benchmark_http --url https://meu-stub.local/health
+"""
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from core.services.http_pool import PoolHTTP
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalho e corpo no mesmo segmento TCP (evita atraso de Nagle/delayed ACK)
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+    corpo = json.dumps({'status': 'ok'}).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.corpo)))
+        self.end_headers()
+        self.wfile.write(self.corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    latencia_conexao = 0.0
+
+    def get_request(self):
+        # Simula o custo de estabelecer conexão (RTT/handshake) de um host remoto
+        conexao = super().get_request()
+        if self.latencia_conexao:
+            time.sleep(self.latencia_conexao)
+        return conexao
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência por chamada com e sem sessões HTTP keep-alive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chamadas', type=int, default=500, help='Chamadas por estratégia (padrão: 500)')
+        parser.add_argument('--url', help='Endpoint a medir (padrão: servidor stub local)')
+        parser.add_argument(
+            '--latencia-conexao',
+            type=float,
+            default=0.0,
+            help='Atraso simulado (ms) ao aceitar cada conexão nova no stub (padrão: 0)',
+        )
+
+    def handle(self, *args, **options):
+        servidor = None
+        url = options['url']
+        if not url:
+            servidor = _StubServer(('127.0.0.1', 0), _StubHandler)
+            servidor.latencia_conexao = options['latencia_conexao'] / 1000
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{servidor.server_address[1]}/'
+            self.stdout.write(f'🔄 Stub local em {url}')
+
+        pool = PoolHTTP()
+        try:
+            resultados = {
+                'requests.get': self._medir(lambda: requests.get(url, timeout=10), options['chamadas']),
+                'pool': self._medir(lambda: pool.request('GET', url, timeout=10), options['chamadas']),
+            }
+        finally:
+            pool.fechar()
+            if servidor:
+                servidor.shutdown()
+
+        for nome, tempos in resultados.items():
+            self.stdout.write(
+                f'   {nome:<13} média={statistics.mean(tempos):.3f}ms '
+                f'p50={statistics.median(tempos):.3f}ms '
+                f'p95={statistics.quantiles(tempos, n=20)[-1]:.3f}ms'
+            )
+
+        economia = statistics.mean(resultados['requests.get']) - statistics.mean(resultados['pool'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Economia média por chamada: {economia:.3f}ms'))
+
+    @staticmethod
+    def _medir(chamar, chamadas):
+        chamar()  # aquecimento (abre a conexão do pool)
+        tempos = []
+        for _ in range(chamadas):
+            inicio = time.perf_counter()
+            chamar().raise_for_status()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return tempos
@@ -0,0 +1,559 @@
+"""
+Servidor local que simula as APIs externas (Korus, FEMME, Receita, a Lambda de signed URL e o OCR).
+
+Responde nos mesmos endpoints usados por KorusAPIClient, FemmeAPIClient,
+ReceitaAPIClient e SignedUrlAPIClient (core.services.external_api) e por
+OCRClient (core.services.ocr), com
+dados fictícios determinísticos (o mesmo CRM/CPF sempre gera a mesma
+resposta). Permite medir carga, circuit breakers, retry, singleflight e
+caches sem acessar os serviços reais.
+
+Comportamento configurável (para todas as APIs ou por API com --api):
+- latencia/variacao: atraso em ms (distribuição normal) antes de responder
+- taxa_erro/status_erro: fração das chamadas respondidas com HTTP de erro
+- taxa_timeout/tempo_timeout: fração das chamadas que ficam sem resposta
+  por tempo_timeout segundos (a conexão é fechada em seguida)
+- taxa_reset: fração das conexões resetadas sem resposta
+- taxa_nao_encontrado: fração dos CRM/CPF inexistentes e dos documentos
+  ilegíveis no OCR (determinística)
+
+Os tokens emitidos expiram em --validade-token segundos (testa a renovação
+após HTTP 401). A Lambda devolve URLs de upload para o próprio servidor
+(PUT /s3/...); os objetos enviados respondem a HEAD /s3/... com o tamanho
+(como o bucket na verificação dos uploads) e a GET com conteúdo fictício
+derivado da chave (download para o OCR). O mesmo caminho aceita o
+subconjunto da API S3 usado por core.services.s3.S3Client (PutObject,
+HeadObject e upload multipart), como um bucket "s3" com endereçamento por
+caminho: AWS_S3_ENDPOINT_URL=<url do servidor> e AWS_S3_BUCKET=s3. Só o
+tamanho dos objetos é guardado. O OCR (POST /ocr) devolve paciente e médico
+fictícios derivados do hash de cada documento. Contadores por API e resultado em
+GET /__estatisticas.
+
+Uso:
+    python manage.py simular_apis
+    python manage.py simular_apis --latencia 300 --variacao 100 --taxa-erro 0.05
+    python manage.py simular_apis --api femme:taxa_erro=0.5 --api korus:latencia=2000
+    python manage.py simular_apis --taxa-timeout 0.1 --tempo-timeout 60 --semente 42
+
+Ao iniciar, o comando imprime as variáveis de ambiente que apontam a
+aplicação para o servidor (KORUS_API_URL, FEMME_API_URL, ...).
+"""
+import hashlib
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+APIS = ('korus', 'femme', 'receita', 'lambda', 's3', 'ocr')
+
+NOMES = ('ANA', 'BRUNO', 'CARLA', 'DANIEL', 'FERNANDA', 'GUSTAVO', 'HELENA', 'JOÃO', 'MARIA', 'PAULO')
+SOBRENOMES = ('ALMEIDA', 'BARBOSA', 'CARVALHO', 'FERREIRA', 'LIMA', 'OLIVEIRA', 'PEREIRA', 'SANTOS', 'SILVA', 'SOUZA')
+
+
+@dataclass
+class Comportamento:
+    """Latência e falhas injetadas nas respostas de uma API."""
+    latencia: float = 200.0
+    variacao: float = 50.0
+    taxa_erro: float = 0.0
+    status_erro: int = 503
+    taxa_timeout: float = 0.0
+    tempo_timeout: float = 60.0
+    taxa_reset: float = 0.0
+    taxa_nao_encontrado: float = 0.1
+
+
+def _hash(*partes) -> int:
+    return int(hashlib.sha256(':'.join(partes).encode()).hexdigest()[:12], 16)
+
+
+def _nome(*partes) -> str:
+    h = _hash(*partes)
+    return f'{NOMES[h % 10]} {SOBRENOMES[(h // 10) % 10]} {SOBRENOMES[(h // 100) % 10]}'
+
+
+def _cpf(*partes) -> str:
+    """CPF fictício com dígitos verificadores válidos."""
+    digitos = [int(d) for d in f'{_hash(*partes) % 10 ** 9:09d}']
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos))
+        digitos.append(soma * 10 % 11 % 10)
+    return ''.join(map(str, digitos))
+
+
+class ServidorSimulado(ThreadingHTTPServer):
+    """
+    Servidor HTTP das APIs simuladas.
+
+    Também pode ser usado como fixture em testes:
+        servidor = ServidorSimulado(('127.0.0.1', 0))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    """
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, endereco, comportamentos=None, validade_token=300, semente=None):
+        super().__init__(endereco, _Handler)
+        self.comportamentos = {api: Comportamento() for api in APIS}
+        self.comportamentos.update(comportamentos or {})
+        self.validade_token = validade_token
+        self.aleatorio = random.Random(semente)
+        self.contadores = Counter()
+        self.objetos = {}
+        self.multipart = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url_base(self) -> str:
+        host, porta = self.server_address[:2]
+        return f'http://{host}:{porta}'
+
+    def variaveis_ambiente(self) -> dict:
+        """Variáveis que apontam os clientes de external_api para este servidor."""
+        return {
+            'KORUS_API_URL': f'{self.url_base}/korus',
+            'KORUS_API_LOGIN': 'simulado',
+            'KORUS_API_PASSWORD': 'simulado',
+            'FEMME_API_URL': f'{self.url_base}/femme',
+            'FEMME_API_CLIENT_ID': 'simulado',
+            'FEMME_API_CLIENT_SECRET': 'simulado',
+            'RECEITA_API_URL': f'{self.url_base}/receita/',
+            'RECEITA_API_TOKEN': 'simulado',
+            'AWS_SIGNED_URL_API': f'{self.url_base}/lambda',
+            'AWS_S3_ENDPOINT_URL': self.url_base,
+            'AWS_S3_BUCKET': 's3',
+            'AWS_ACCESS_KEY_ID': 'simulado',
+            'AWS_SECRET_ACCESS_KEY': 'simulado',
+            'OCR_API_URL': f'{self.url_base}/ocr',
+            'OCR_API_TOKEN': 'simulado',
+        }
+
+    def contar(self, api: str, resultado: str) -> None:
+        with self._lock:
+            self.contadores[(api, resultado)] += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            itens = list(self.contadores.items())
+        resumo = {}
+        for (api, resultado), total in sorted(itens):
+            resumo.setdefault(api, {})[resultado] = total
+        return resumo
+
+    def emitir_token(self) -> str:
+        return f'simulado-{time.time() + self.validade_token:.0f}'
+
+    def token_valido(self, autorizacao: str) -> bool:
+        prefixo = 'Bearer simulado-'
+        if not autorizacao.startswith(prefixo):
+            return False
+        try:
+            return float(autorizacao[len(prefixo):]) > time.time()
+        except ValueError:
+            return False
+
+    def nao_encontrado(self, api: str, chave: str) -> bool:
+        taxa = self.comportamentos[api].taxa_nao_encontrado
+        return _hash(api, chave) % 10000 < taxa * 10000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._atender('GET')
+
+    def do_POST(self):
+        self._atender('POST')
+
+    def do_PUT(self):
+        self._atender('PUT')
+
+    def do_HEAD(self):
+        self._atender('HEAD')
+
+    def do_DELETE(self):
+        self._atender('DELETE')
+
+    def _atender(self, metodo):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        self.corpo = self.rfile.read(tamanho) if tamanho else b''
+        partes = urlsplit(self.path)
+        self.parametros = {k: v[0] for k, v in parse_qs(partes.query, keep_blank_values=True).items()}
+        self.cabecalhos_resposta = {}
+
+        if partes.path == '/__estatisticas':
+            return self._json(200, self.server.estatisticas())
+
+        api = partes.path.strip('/').split('/', 1)[0]
+        rota = self._rota(metodo, partes.path.rstrip('/'))
+        if api not in APIS or rota is None:
+            return self._json(404, {'message': 'Endpoint não simulado.'})
+
+        if not self._injetar_falha(api):
+            status, dados = rota()
+            self.server.contar(api, str(status))
+            self._json(status, dados)
+
+    def _rota(self, metodo, caminho):
+        return {
+            ('POST', '/korus/Autenticacao'): self._korus_autenticacao,
+            ('POST', '/korus/Medico'): self._korus_medico,
+            ('GET', '/korus/paciente/cpf'): self._korus_paciente,
+            ('POST', '/femme/token'): self._femme_token,
+            ('GET', '/femme/medicos'): self._femme_medicos,
+            ('GET', '/receita'): self._receita,
+            ('POST', '/lambda'): self._lambda,
+            ('POST', '/ocr'): self._ocr,
+        }.get((metodo, caminho)) or (self._s3 if caminho.startswith('/s3/') else None)
+
+    def _injetar_falha(self, api) -> bool:
+        """Aplica reset/timeout/erro/latência; retorna True se a chamada já foi tratada."""
+        comportamento = self.server.comportamentos[api]
+        sorteio = self.server.aleatorio.random()
+
+        if sorteio < comportamento.taxa_reset:
+            self.server.contar(api, 'reset')
+            # SO_LINGER 0: o close() envia RST em vez de FIN
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.close_connection = True
+            return True
+        sorteio -= comportamento.taxa_reset
+
+        if sorteio < comportamento.taxa_timeout:
+            self.server.contar(api, 'timeout')
+            time.sleep(comportamento.tempo_timeout)
+            self.close_connection = True
+            return True
+        sorteio -= comportamento.taxa_timeout
+
+        atraso = max(self.server.aleatorio.gauss(comportamento.latencia, comportamento.variacao), 0)
+        time.sleep(atraso / 1000)
+
+        if sorteio < comportamento.taxa_erro:
+            self.server.contar(api, str(comportamento.status_erro))
+            self._json(comportamento.status_erro, {'message': 'Erro simulado.'})
+            return True
+        return False
+
+    def _json(self, status, dados):
+        if isinstance(dados, str):
+            return self._bruto(status, dados.encode(), 'application/xml')
+        if isinstance(dados, bytes):
+            return self._bruto(status, dados, 'application/octet-stream')
+        if self.command == 'HEAD':
+            # Sem corpo; Content-Length é o tamanho do objeto (ou 0)
+            self.send_response(status)
+            self.send_header('Content-Length', str(dados.get('tamanho', 0)))
+            self.end_headers()
+            return
+        corpo = json.dumps(dados, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _bruto(self, status, corpo, tipo):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in self.cabecalhos_resposta.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _corpo_json(self) -> dict:
+        try:
+            return json.loads(self.corpo or b'{}')
+        except ValueError:
+            return {}
+
+    def _autorizado(self) -> bool:
+        return self.server.token_valido(self.headers.get('Authorization', ''))
+
+    # Korus
+
+    def _korus_autenticacao(self):
+        credenciais = self._corpo_json()
+        if not credenciais.get('login') or not credenciais.get('senha'):
+            return 401, {'detail': 'Credenciais inválidas.'}
+        return 200, {'access_token': self.server.emitir_token(), 'expires_in': self.server.validade_token}
+
+    def _korus_medico(self):
+        if not self._autorizado():
+            return 401, {'detail': 'Token inválido ou expirado.'}
+        consulta = self._corpo_json()
+        crm, uf = str(consulta.get('crm', '')), str(consulta.get('uf', '')).upper()
+        if not crm or len(uf) != 2:
+            return 400, {'detail': 'Informe crm e uf.'}
+        if self.server.nao_encontrado('korus', f'{crm}/{uf}'):
+            return 200, []
+        return 200, [{
+            'id': _hash('medico', crm, uf) % 1000000,
+            'nome': f'DR(A). {_nome("medico", crm, uf)}',
+            'crm': crm,
+            'uf': uf,
+            'conselho': 'CRM',
+        }]
+
+    def _korus_paciente(self):
+        if not self._autorizado():
+            return 401, {'detail': 'Token inválido ou expirado.'}
+        cpf = self.parametros.get('cpf', '')
+        if len(cpf) != 11 or self.server.nao_encontrado('korus', cpf):
+            return 404, {'message': 'Paciente não encontrado.'}
+        h = _hash('paciente', cpf)
+        return 200, {
+            'matricula': str(h % 1000000),
+            'pessoaFisica': {
+                'nome': _nome('paciente', cpf),
+                'cpf': cpf,
+                'dataNascimento': f'{1940 + h % 65}-{1 + h % 12:02d}-{1 + h % 28:02d}',
+                'sexo': 'F' if h % 5 else 'M',
+            },
+            'contato': {'email': f'paciente{h % 100000}@exemplo.com.br'},
+            'telefones': [{'ddd': '11', 'numero': f'9{h % 100000000:08d}', 'tipoTelefone': 'Celular'}],
+            'convenio': 'PARTICULAR',
+            'plano': '',
+        }
+
+    # FEMME
+
+    def _femme_token(self):
+        credenciais = parse_qs(self.corpo.decode())
+        if not credenciais.get('client_id') or not credenciais.get('client_secret'):
+            return 401, {'message': 'Credenciais inválidas.'}
+        return 200, {'access_token': self.server.emitir_token(), 'expires_in': self.server.validade_token}
+
+    def _femme_medicos(self):
+        if not self._autorizado():
+            return 401, {'message': 'Unauthorized'}
+        crm, uf = self.parametros.get('crm', ''), self.parametros.get('uf_crm', '').upper()
+        if not crm or self.server.nao_encontrado('femme', f'{crm}/{uf}'):
+            return 200, {'data': {'medicos': []}}
+        h = _hash('medico', crm, uf)
+        return 200, {'data': {'medicos': [{
+            'id_medico': str(h % 1000000),
+            'nome_medico': _nome('medico', crm, uf),
+            'crm': crm,
+            'uf_crm': uf,
+            'logradouro': f'RUA {SOBRENOMES[h % 10]}, {h % 2000}',
+            'destino': ('INTERNET', 'MALOTE', 'CORREIO')[h % 3],
+        }]}}
+
+    # Receita
+
+    def _receita(self):
+        cpf = self.parametros.get('cpf', '')
+        if not self.parametros.get('token'):
+            return 200, {'status': False, 'return': 'NOK', 'message': 'Token inválido.'}
+        if len(cpf) != 11 or self.server.nao_encontrado('receita', cpf):
+            return 200, {'status': False, 'return': 'NOK', 'message': 'CPF não encontrado.'}
+        h = _hash('paciente', cpf)
+        return 200, {'status': True, 'return': 'OK', 'result': {
+            'numero_de_cpf': f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}',
+            'nome_da_pf': _nome('paciente', cpf),
+            'data_nascimento': f'{1 + h % 28:02d}/{1 + h % 12:02d}/{1940 + h % 65}',
+            'situacao_cadastral': 'REGULAR',
+        }}
+
+    # OCR
+
+    def _ocr(self):
+        if not self.headers.get('Authorization', '').removeprefix('Bearer '):
+            return 401, {'message': 'Token inválido.'}
+        documentos = self._corpo_json().get('documentos') or []
+        if not documentos or not all(d.get('id') and d.get('conteudo') for d in documentos):
+            return 400, {'message': 'Informe documentos com id e conteudo.'}
+        resposta = {}
+        for documento in documentos:
+            chave = documento['id']
+            if self.server.nao_encontrado('ocr', chave):
+                resposta[chave] = {}
+                continue
+            h = _hash('ocr', chave)
+            uf = ('SP', 'RJ', 'MG', 'PR', 'RS')[h % 5]
+            resposta[chave] = {
+                'nome_paciente': _nome('paciente', chave),
+                'cpf_paciente': _cpf('paciente', chave),
+                'data_nasc_paciente': f'{1940 + h % 65}-{1 + h % 12:02d}-{1 + h % 28:02d}',
+                'crm': str(10000 + h % 90000),
+                'uf_crm': uf,
+                'nome_medico': f'DR(A). {_nome("medico", chave)}',
+            }
+        return 200, resposta
+
+    # Lambda de signed URL e upload
+
+    def _lambda(self):
+        payload = self._corpo_json()
+        process_id, arquivos = payload.get('process_id'), payload.get('files') or []
+        if not process_id or not arquivos:
+            return 400, {'message': 'Informe process_id e files.'}
+        resposta = {}
+        for arquivo in arquivos:
+            nome = arquivo.get('filename') or arquivo.get('name', '')
+            chave = f'processing/{process_id}/{nome}'
+            resposta[nome] = {'key': chave, 'url': f'{self.server.url_base}/s3/{chave}', 'name': nome}
+        return 200, resposta
+
+    def _s3(self):
+        chave = urlsplit(self.path).path[len('/s3/'):]
+        upload_id = self.parametros.get('uploadId')
+        servidor = self.server
+
+        if self.command == 'POST' and 'uploads' in self.parametros:
+            upload_id = hashlib.sha256(f'{chave}:{time.time()}'.encode()).hexdigest()[:32]
+            with servidor._lock:
+                servidor.multipart[upload_id] = {}
+            return 200, (
+                '<InitiateMultipartUploadResult><Bucket>s3</Bucket>'
+                f'<Key>{chave}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>'
+            )
+
+        if upload_id is not None:
+            with servidor._lock:
+                partes = servidor.multipart.get(upload_id)
+                if partes is None:
+                    return 404, '<Error><Code>NoSuchUpload</Code></Error>'
+                if self.command == 'PUT':
+                    partes[int(self.parametros.get('partNumber', 0))] = len(self.corpo)
+                elif self.command == 'POST':
+                    servidor.objetos[chave] = sum(servidor.multipart.pop(upload_id).values())
+                elif self.command == 'DELETE':
+                    servidor.multipart.pop(upload_id)
+                    return 204, ''
+            etag = f'"{hashlib.md5(self.corpo).hexdigest()}"'
+            if self.command == 'PUT':
+                self.cabecalhos_resposta = {'ETag': etag}
+                return 200, ''
+            return 200, (
+                f'<CompleteMultipartUploadResult><Bucket>s3</Bucket><Key>{chave}</Key>'
+                f'<ETag>{etag}</ETag></CompleteMultipartUploadResult>'
+            )
+
+        if self.command == 'PUT':
+            with servidor._lock:
+                servidor.objetos[chave] = len(self.corpo)
+            self.cabecalhos_resposta = {'ETag': f'"{hashlib.md5(self.corpo).hexdigest()}"'}
+            return 200, ''
+        if self.command not in ('GET', 'HEAD'):
+            return 405, '<Error><Code>MethodNotAllowed</Code></Error>'
+        tamanho = servidor.objetos.get(chave)
+        if tamanho is None:
+            return 404, {}
+        if self.command == 'GET':
+            # Conteúdo fictício derivado da chave, com o tamanho enviado
+            return 200, (chave.encode() * (tamanho // max(len(chave), 1) + 1))[:tamanho]
+        return 200, {'tamanho': tamanho}
+
+
+def _ler_api(valor: str):
+    """Converte 'nome:campo=valor,campo=valor' em (nome, {campo: valor})."""
+    nome, _, atribuicoes = valor.partition(':')
+    if nome not in APIS or not atribuicoes:
+        raise CommandError(f'❌ --api inválido: {valor!r} (use nome:campo=valor, nome em {", ".join(APIS)})')
+    tipos = {campo.name: campo.type for campo in fields(Comportamento)}
+    alteracoes = {}
+    for atribuicao in atribuicoes.split(','):
+        campo, _, texto = atribuicao.partition('=')
+        campo = campo.strip().replace('-', '_')
+        if campo not in tipos:
+            raise CommandError(f'❌ Campo desconhecido em --api: {campo!r} (use {", ".join(tipos)})')
+        try:
+            alteracoes[campo] = int(texto) if tipos[campo] is int else float(texto)
+        except ValueError:
+            raise CommandError(f'❌ Valor inválido para {campo}: {texto!r}')
+    return nome, alteracoes
+
+
+class Command(BaseCommand):
+    help = 'Sobe um servidor local que simula Korus, FEMME, Receita e a Lambda de signed URL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+        parser.add_argument('--porta', type=int, default=8765, help='Porta de escuta (padrão: 8765)')
+        parser.add_argument('--latencia', type=float, default=200, help='Latência média em ms (padrão: 200)')
+        parser.add_argument('--variacao', type=float, default=50, help='Desvio padrão da latência em ms (padrão: 50)')
+        parser.add_argument('--taxa-erro', type=float, default=0, help='Fração de respostas com erro HTTP (padrão: 0)')
+        parser.add_argument('--status-erro', type=int, default=503, help='Status HTTP dos erros (padrão: 503)')
+        parser.add_argument('--taxa-timeout', type=float, default=0, help='Fração de chamadas sem resposta (padrão: 0)')
+        parser.add_argument(
+            '--tempo-timeout', type=float, default=60,
+            help='Segundos sem resposta antes de fechar a conexão (padrão: 60)',
+        )
+        parser.add_argument('--taxa-reset', type=float, default=0, help='Fração de conexões resetadas (padrão: 0)')
+        parser.add_argument(
+            '--taxa-nao-encontrado', type=float, default=0.1,
+            help='Fração de CRM/CPF inexistentes (padrão: 0.1)',
+        )
+        parser.add_argument('--validade-token', type=int, default=300, help='Validade dos tokens em s (padrão: 300)')
+        parser.add_argument('--semente', type=int, help='Semente do sorteio de latência/falhas')
+        parser.add_argument(
+            '--api', action='append', default=[], metavar='NOME:CAMPO=VALOR,...',
+            help='Comportamento de uma API específica (ex: femme:taxa_erro=0.5,latencia=800)',
+        )
+
+    def handle(self, *args, **options):
+        padrao = Comportamento(
+            latencia=options['latencia'],
+            variacao=options['variacao'],
+            taxa_erro=options['taxa_erro'],
+            status_erro=options['status_erro'],
+            taxa_timeout=options['taxa_timeout'],
+            tempo_timeout=options['tempo_timeout'],
+            taxa_reset=options['taxa_reset'],
+            taxa_nao_encontrado=options['taxa_nao_encontrado'],
+        )
+        comportamentos = {api: replace(padrao) for api in APIS}
+        for valor in options['api']:
+            nome, alteracoes = _ler_api(valor)
+            comportamentos[nome] = replace(comportamentos[nome], **alteracoes)
+
+        try:
+            servidor = ServidorSimulado(
+                (options['host'], options['porta']),
+                comportamentos,
+                validade_token=options['validade_token'],
+                semente=options['semente'],
+            )
+        except OSError as e:
+            raise CommandError(f'❌ Não foi possível escutar em {options["host"]}:{options["porta"]}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ APIs simuladas em {servidor.url_base}'))
+        for api in APIS:
+            c = comportamentos[api]
+            self.stdout.write(
+                f'   {api:<8} latência={c.latencia:.0f}±{c.variacao:.0f}ms erro={c.taxa_erro:.0%} ({c.status_erro}) '
+                f'timeout={c.taxa_timeout:.0%} ({c.tempo_timeout:.0f}s) reset={c.taxa_reset:.0%} '
+                f'não encontrado={c.taxa_nao_encontrado:.0%}'
+            )
+        self.stdout.write('\n🔄 Aponte a aplicação para o servidor com:')
+        for nome, valor in servidor.variaveis_ambiente().items():
+            self.stdout.write(f'   export {nome}={valor}')
+        self.stdout.write('\nCtrl+C encerra e mostra as estatísticas.')
+
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+
+        self.stdout.write('\n📊 Chamadas por API e resultado:')
+        for api, resultados in servidor.estatisticas().items():
+            self.stdout.write(f'   {api:<8} ' + ' '.join(f'{r}={t}' for r, t in resultados.items()))
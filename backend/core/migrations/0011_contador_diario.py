@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_add_medico_sem_destino_tipo_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefixo', models.CharField(help_text='Identificador da sequência (ex: PROT, TAR)', max_length=30, verbose_name='Prefixo')),
+                ('data', models.DateField(help_text='Dia ao qual o contador se refere', verbose_name='Data')),
+                ('valor', models.PositiveIntegerField(default=0, help_text='Último número emitido no dia', verbose_name='Último número')),
+            ],
+            options={
+                'verbose_name': 'Contador Diário',
+                'verbose_name_plural': 'Contadores Diários',
+                'db_table': 'core_contador_diario',
+                'constraints': [models.UniqueConstraint(fields=('prefixo', 'data'), name='core_contador_diario_prefixo_data_uniq')],
+            },
+        ),
+    ]
@@ -328,3 +328,92 @@ class LogEnvioEmail(TimeStampedModel):
     
     def __str__(self):
         return f"{self.tipo} - {self.descricao} ({self.status})"
+
+
+class ContadorDiario(models.Model):
+    """
+    Contador sequencial por prefixo e dia.
+    
+    Usado para gerar códigos no formato PREFIXO-YYYYMMDD-XXXX (protocolos,
+    tarefas) sem varrer a tabela de origem com LIKE a cada inserção e sem
+    gerar números duplicados sob concorrência: o incremento é feito por um
+    único UPDATE/INSERT ... RETURNING, serializado pelo lock da linha.
+    """
+    
+    prefixo = models.CharField(
+        'Prefixo',
+        max_length=30,
+        help_text='Identificador da sequência (ex: PROT, TAR)'
+    )
+    data = models.DateField(
+        'Data',
+        help_text='Dia ao qual o contador se refere'
+    )
+    valor = models.PositiveIntegerField(
+        'Último número',
+        default=0,
+        help_text='Último número emitido no dia'
+    )
+    
+    class Meta:
+        db_table = 'core_contador_diario'
+        verbose_name = 'Contador Diário'
+        verbose_name_plural = 'Contadores Diários'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['prefixo', 'data'],
+                name='core_contador_diario_prefixo_data_uniq',
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.prefixo} {self.data:%Y-%m-%d}: {self.valor}'
+    
+    @classmethod
+    def proximo(cls, prefixo, data=None, valor_inicial=None, using='default'):
+        """
+        Retorna atomicamente o próximo número do prefixo no dia.
+        
+        Args:
+            prefixo: Identificador da sequência
+            data: Dia do contador (padrão: hoje, horário local)
+            valor_inicial: Callable opcional chamado apenas quando o contador
+                do dia ainda não existe; deve retornar o último número já
+                emitido por outros meios (reconciliação com registros
+                existentes). Padrão: 0.
+            using: Alias do banco
+        
+        Returns:
+            int: Próximo número (1 para o primeiro do dia)
+        """
+        from datetime import datetime
+        from django.db import connections
+        
+        if data is None:
+            data = datetime.now().date()
+        
+        connection = connections[using]
+        tabela = connection.ops.quote_name(cls._meta.db_table)
+        data_db = connection.ops.adapt_datefield_value(data)
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {tabela} SET valor = valor + 1 '
+                f'WHERE prefixo = %s AND data = %s RETURNING valor',
+                [prefixo, data_db],
+            )
+            row = cursor.fetchone()
+            if row:
+                return row[0]
+            
+            base = valor_inicial() if valor_inicial else 0
+            
+            # Primeiro número do dia; se outro processo criar a linha antes,
+            # o ON CONFLICT incrementa a linha existente.
+            cursor.execute(
+                f'INSERT INTO {tabela} (prefixo, data, valor) VALUES (%s, %s, %s) '
+                f'ON CONFLICT (prefixo, data) DO UPDATE SET valor = {tabela}.valor + 1 '
+                f'RETURNING valor',
+                [prefixo, data_db, base + 1],
+            )
+            return cursor.fetchone()[0]
@@ -0,0 +1,192 @@
+"""
+Cache de resultados de consultas a APIs externas.
+
+Consultas de médico por (CRM, UF) se repetem ao longo do dia e cada uma
+pode levar vários segundos em FEMME e Korus. Os resultados (APIResponse)
+ficam no Redis com TTL por tipo de resultado:
+
+- encontrado: MEDICO_CACHE_TTL (padrão 6h)
+- não encontrado / duplicado: MEDICO_CACHE_TTL_NEGATIVO (padrão 10min), para
+  que um cadastro corrigido na origem apareça logo
+- falhas transitórias (timeout, HTTP 5xx, autenticação): não são guardadas
+
+Para descartar um médico (ex: cadastro corrigido na FEMME), use
+invalidar_medico(crm, uf), o comando `limpar_cache --medico CRM/UF` ou a
+action do admin em requisições/protocolos.
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import logging
+import os
+import re
+from dataclasses import asdict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .external_api import APIResponse, get_femme_client, get_korus_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'consultas:{nome}:{chave}'
+
+# Resultados possíveis de uma consulta (None = não guardar)
+ENCONTRADO = 'encontrado'
+NAO_ENCONTRADO = 'nao_encontrado'
+DUPLICADO = 'duplicado'
+
+Classificador = Callable[[APIResponse], Optional[str]]
+
+
+class CacheConsulta:
+    """Cache de APIResponse por chave normalizada, com TTL positivo e negativo."""
+
+    def __init__(self, nome: str, ttl: int, ttl_negativo: int):
+        self.nome = nome
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+
+    def _chave(self, chave: str) -> str:
+        return CACHE_KEY.format(nome=self.nome, chave=chave)
+
+    def obter(self, chave: str) -> Optional[APIResponse]:
+        """Retorna a resposta guardada ou None."""
+        dados = cache.get(self._chave(chave))
+        if dados is None:
+            return None
+        return APIResponse(**dados)
+
+    def salvar(self, chave: str, response: APIResponse, resultado: str) -> None:
+        ttl = self.ttl if resultado == ENCONTRADO else self.ttl_negativo
+        cache.set(self._chave(chave), asdict(response), ttl)
+
+    def consultar(self, chave: str, consultar: Callable[[], APIResponse], classificar: Classificador) -> APIResponse:
+        """
+        Retorna a resposta do cache ou executa a consulta e guarda o resultado.
+
+        Args:
+            chave: Chave já normalizada
+            consultar: Função que consulta a API externa
+            classificar: Função que define o tipo do resultado (None = não guardar)
+        """
+        response = self.obter(chave)
+        if response is not None:
+            logger.debug('Cache %s: acerto para %s', self.nome, chave)
+            return response
+
+        response = consultar()
+        resultado = classificar(response)
+        if resultado:
+            self.salvar(chave, response, resultado)
+        return response
+
+    async def aconsultar(
+        self, chave: str, consultar: Callable[[], Awaitable[APIResponse]], classificar: Classificador
+    ) -> APIResponse:
+        """Versão assíncrona de consultar() (consultar é uma corrotina; Redis fora do event loop)."""
+        response = await sync_to_async(self.obter)(chave)
+        if response is not None:
+            logger.debug('Cache %s: acerto para %s', self.nome, chave)
+            return response
+
+        response = await consultar()
+        resultado = classificar(response)
+        if resultado:
+            await sync_to_async(self.salvar)(chave, response, resultado)
+        return response
+
+    def invalidar(self, chave: str) -> None:
+        cache.delete(self._chave(chave))
+
+
+cache_medico_femme = CacheConsulta(
+    'medico_femme',
+    ttl=int(os.getenv('MEDICO_CACHE_TTL', str(6 * 60 * 60))),
+    ttl_negativo=int(os.getenv('MEDICO_CACHE_TTL_NEGATIVO', '600')),
+)
+cache_medico_korus = CacheConsulta(
+    'medico_korus',
+    ttl=cache_medico_femme.ttl,
+    ttl_negativo=cache_medico_femme.ttl_negativo,
+)
+
+
+def normalizar_crm(crm: str, uf: str) -> Tuple[str, str]:
+    """Normaliza CRM (sem espaços/pontuação) e UF (maiúscula)."""
+    return re.sub(r'[\s.\-/]', '', crm or '').upper(), (uf or '').strip().upper()
+
+
+def _chave_medico(crm: str, uf: str) -> str:
+    crm_norm, uf_norm = normalizar_crm(crm, uf)
+    return f'{uf_norm}:{crm_norm}'
+
+
+def classificar_medico(response: APIResponse) -> Optional[str]:
+    """Tipo do resultado de uma consulta de médico (None = falha transitória)."""
+    if response.success:
+        return ENCONTRADO
+    # Respostas de erro (5xx) chegam sem interpretação: data pode ser lista ou texto
+    if isinstance(response.data, dict) and response.data.get('quantidade', 0) > 1:
+        return DUPLICADO
+    if 'não encontrado' in (response.error or '').lower():
+        return NAO_ENCONTRADO
+    return None
+
+
+def buscar_medico_femme(crm: str, uf: str) -> APIResponse:
+    """FemmeAPIClient.buscar_medico com cache por (CRM, UF)."""
+    crm_norm, uf_norm = normalizar_crm(crm, uf)
+    if not crm_norm or len(uf_norm) != 2:
+        return get_femme_client().buscar_medico(crm, uf)
+    return cache_medico_femme.consultar(
+        _chave_medico(crm, uf),
+        lambda: get_femme_client().buscar_medico(crm_norm, uf_norm),
+        classificar_medico,
+    )
+
+
+def buscar_medico_korus(crm: str, uf: str) -> APIResponse:
+    """KorusAPIClient.buscar_medico_por_crm com cache por (CRM, UF)."""
+    crm_norm, uf_norm = normalizar_crm(crm, uf)
+    if not crm_norm or len(uf_norm) != 2:
+        return get_korus_client().buscar_medico_por_crm(crm, uf)
+    return cache_medico_korus.consultar(
+        _chave_medico(crm, uf),
+        lambda: get_korus_client().buscar_medico_por_crm(crm_norm, uf_norm),
+        classificar_medico,
+    )
+
+
+async def abuscar_medico_femme(crm: str, uf: str) -> APIResponse:
+    """Versão assíncrona de buscar_medico_femme()."""
+    crm_norm, uf_norm = normalizar_crm(crm, uf)
+    if not crm_norm or len(uf_norm) != 2:
+        return await get_femme_client().abuscar_medico(crm, uf)
+    return await cache_medico_femme.aconsultar(
+        _chave_medico(crm, uf),
+        lambda: get_femme_client().abuscar_medico(crm_norm, uf_norm),
+        classificar_medico,
+    )
+
+
+async def abuscar_medico_korus(crm: str, uf: str) -> APIResponse:
+    """Versão assíncrona de buscar_medico_korus()."""
+    crm_norm, uf_norm = normalizar_crm(crm, uf)
+    if not crm_norm or len(uf_norm) != 2:
+        return await get_korus_client().abuscar_medico_por_crm(crm, uf)
+    return await cache_medico_korus.aconsultar(
+        _chave_medico(crm, uf),
+        lambda: get_korus_client().abuscar_medico_por_crm(crm_norm, uf_norm),
+        classificar_medico,
+    )
+
+
+def invalidar_medico(crm: str, uf: str) -> None:
+    """Descarta os resultados em cache (FEMME e Korus) de um médico."""
+    chave = _chave_medico(crm, uf)
+    cache_medico_femme.invalidar(chave)
+    cache_medico_korus.invalidar(chave)
+    logger.info('Cache do médico %s removido', chave)
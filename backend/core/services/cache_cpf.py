@@ -0,0 +1,192 @@
+"""
+Cache cifrado de consultas de paciente por CPF (Korus e Receita).
+
+Pacientes recorrentes são comuns e o mesmo CPF costuma ser consultado de
+novo na mesma sessão (reabertura da etapa 2 da triagem). O resultado da
+consulta fica no Redis por pouco tempo, sem expor o CPF nem os dados do
+paciente:
+
+- Chave: HMAC-SHA256 do CPF com o SECRET_KEY (chave_consulta()), ex:
+  'cache_cpf:korus:cpf:<hmac>'. O CPF não aparece no Redis.
+- Valor: APIResponse em JSON cifrado com Fernet (AES-128 + HMAC). A chave
+  de cifra vem de CPF_CACHE_CHAVE (chave Fernet, ver abaixo) ou é derivada
+  do SECRET_KEY. Valor que não decifra (chave trocada) conta como falta.
+- TTL: CPF_CACHE_TTL (padrão 900s) para paciente encontrado e
+  CPF_CACHE_TTL_NEGATIVO (padrão 120s) para CPF não encontrado. Falhas
+  transitórias (timeout, HTTP 5xx, circuito aberto) não são guardadas.
+- Contadores de acertos/faltas por API no Redis, expostos em
+  /monitoramento/integracoes/ (estatisticas_cache_cpf()).
+- CPF_CACHE_TTL=0 desativa o cache.
+
+Os resultados publicados pelo singleflight (singleflight.py) usam a mesma
+cifra (cifrar()/decifrar()), pois também contêm dados de pacientes.
+
+Gerar uma chave de cifra:
+    python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+
+Uso:
+    from core.services.cache_cpf import cache_cpf_korus
+
+    response = cache_cpf_korus.consultar(cpf_limpo, lambda: consultar_api(cpf_limpo))
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from cryptography.fernet import Fernet, InvalidToken
+from django.conf import settings
+from django.core.cache import cache
+
+from .redis_client import get_redis, make_key
+from .singleflight import chave_consulta
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'cache_cpf:{chave}'
+CONTADOR_KEY = 'cache_cpf:{nome}:{evento}'
+
+
+@lru_cache(maxsize=1)
+def _cifra() -> Fernet:
+    chave = os.getenv('CPF_CACHE_CHAVE', '').strip()
+    if not chave:
+        digest = hashlib.sha256(f'cache_cpf:{settings.SECRET_KEY}'.encode()).digest()
+        chave = base64.urlsafe_b64encode(digest).decode()
+    return Fernet(chave)
+
+
+def cifrar(dados: dict) -> bytes:
+    """Serializa (JSON) e cifra um dicionário para guardar no Redis."""
+    return _cifra().encrypt(json.dumps(dados).encode())
+
+
+def decifrar(cifrado) -> Optional[dict]:
+    """Inverso de cifrar(); None se o valor não puder ser decifrado."""
+    try:
+        return json.loads(_cifra().decrypt(cifrado))
+    except (InvalidToken, ValueError, TypeError):
+        return None
+
+
+class CacheCPF:
+    """Cache de APIResponse por CPF, com chave HMAC e valor cifrado."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.ttl = int(os.getenv('CPF_CACHE_TTL', '900'))
+        self.ttl_negativo = int(os.getenv('CPF_CACHE_TTL_NEGATIVO', '120'))
+
+    def _chave(self, cpf_limpo: str) -> str:
+        return CACHE_KEY.format(chave=chave_consulta(f'{self.nome}:cpf', cpf_limpo))
+
+    def _ttl(self, response) -> int:
+        if response.success:
+            return self.ttl
+        if 'não encontrado' in (response.error or '').lower():
+            return min(self.ttl_negativo, self.ttl)
+        return 0
+
+    def obter(self, cpf_limpo: str):
+        """Retorna a resposta guardada (APIResponse) ou None."""
+        from .external_api import APIResponse
+
+        cifrado = cache.get(self._chave(cpf_limpo))
+        if cifrado is None:
+            return None
+        dados = decifrar(cifrado)
+        if dados is None:
+            logger.warning('Cache CPF %s: valor ilegível descartado', self.nome)
+            return None
+        return APIResponse(**dados)
+
+    def salvar(self, cpf_limpo: str, response) -> None:
+        ttl = self._ttl(response)
+        if ttl > 0:
+            cache.set(self._chave(cpf_limpo), cifrar(asdict(response)), ttl)
+
+    def consultar(self, cpf_limpo: str, consultar: Callable):
+        """
+        Retorna a resposta do cache ou executa a consulta e guarda o resultado.
+
+        Args:
+            cpf_limpo: CPF já validado (11 dígitos)
+            consultar: Função que consulta a API e retorna APIResponse
+        """
+        if self.ttl <= 0:
+            return consultar()
+
+        response = self._obter_contando(cpf_limpo)
+        if response is not None:
+            return response
+
+        response = consultar()
+        self.salvar(cpf_limpo, response)
+        return response
+
+    async def aconsultar(self, cpf_limpo: str, consultar: Callable[[], Awaitable]):
+        """Versão assíncrona de consultar() (consultar retorna uma corrotina; Redis fora do event loop)."""
+        if self.ttl <= 0:
+            return await consultar()
+
+        response = await sync_to_async(self._obter_contando)(cpf_limpo)
+        if response is not None:
+            return response
+
+        response = await consultar()
+        await sync_to_async(self.salvar)(cpf_limpo, response)
+        return response
+
+    def _obter_contando(self, cpf_limpo: str):
+        response = self.obter(cpf_limpo)
+        self._contar('acertos' if response is not None else 'faltas')
+        return response
+
+    def invalidar(self, cpf_limpo: str) -> None:
+        cache.delete(self._chave(cpf_limpo))
+
+    def _contar(self, evento: str) -> None:
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            redis.incr(make_key(CONTADOR_KEY.format(nome=self.nome, evento=evento)))
+        except Exception as e:
+            logger.debug('Cache CPF %s: contador indisponível: %s', self.nome, str(e))
+
+    def estatisticas(self) -> dict:
+        """Acertos, faltas e taxa de acerto acumulados (todos os workers)."""
+        valores = {'acertos': 0, 'faltas': 0}
+        redis = get_redis()
+        if redis is not None:
+            try:
+                chaves = [make_key(CONTADOR_KEY.format(nome=self.nome, evento=evento)) for evento in valores]
+                for evento, valor in zip(valores, redis.mget(chaves)):
+                    valores[evento] = int(valor or 0)
+            except Exception as e:
+                logger.debug('Cache CPF %s: contadores indisponíveis: %s', self.nome, str(e))
+        total = valores['acertos'] + valores['faltas']
+        valores['taxa_acerto'] = round(valores['acertos'] / total, 3) if total else None
+        return valores
+
+
+cache_cpf_korus = CacheCPF('korus')
+cache_cpf_receita = CacheCPF('receita')
+
+
+def estatisticas_cache_cpf() -> dict:
+    """Estatísticas dos caches de CPF (para monitoramento)."""
+    return {
+        'ttl': cache_cpf_korus.ttl,
+        'korus': cache_cpf_korus.estatisticas(),
+        'receita': cache_cpf_receita.estatisticas(),
+    }
@@ -4,21 +4,69 @@ Serviço para integração com APIs externas.
 Este módulo fornece classes reutilizáveis para autenticação e comunicação
 com APIs externas como Korus, facilitando a adição de novas integrações.
 
-@version 1.0.0
-@date 2024-12-16
+Tokens de autenticação (Korus, FEMME) são compartilhados entre workers
+via Redis (ver tokens.py); um HTTP 401 descarta o token e a requisição é
+repetida uma vez com um token novo.
+
+Cada API tem um circuit breaker com estado no Redis: com a API fora do ar,
+as chamadas retornam de imediato uma APIResponse degradada (status 503)
+em vez de ocupar o worker até o timeout.
+
+Os clientes têm variantes assíncronas (prefixo "a", como no ORM do Django:
+abuscar_paciente_por_cpf, abuscar_cpf, abuscar_medico...) usadas pelas views
+ASGI (operacao/async_views.py). Elas usam o pool httpx de http_pool.py e
+compartilham validação, interpretação das respostas, tokens e circuit
+breakers com as versões síncronas.
+
+Consultas idênticas e simultâneas (mesmo CPF ou CRM/UF) são coalescidas
+por singleflight.py: apenas uma chamada sai, as demais reaproveitam o
+resultado.
+
+Consultas (GET, busca de médico) e geração de token são repetidas em falhas
+transitórias, com backoff e dentro do prazo da requisição (ver retry.py).
+
+Consultas de paciente por CPF (Korus e Receita) passam pelo cache cifrado
+de cache_cpf.py. O CPF vai em query params (fora das URLs registradas em
+log) e mensagens de erro passam por _sem_dados_sensiveis() antes do log.
+
+O circuit breaker é verificado só na chamada real, dentro do cache e do
+singleflight: consultas em cache (ou reaproveitadas de outro worker)
+continuam sendo atendidas com o circuito aberto, e a chamada de teste do
+meio-aberto é sempre registrada.
+
+@version 1.6.0
+@date 2026-10-18
 """
 
 import logging
 import os
+import re
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from redis.exceptions import RedisError
 from requests.exceptions import RequestException, Timeout
 
+from .cache_cpf import cache_cpf_korus, cache_cpf_receita
+from .http_pool import ahttp_request, http_request
+from .redis_client import get_redis, make_key
+from .singleflight import chave_consulta, singleflight
+from .tokens import TokenCompartilhado, token_femme, token_korus
+
 logger = logging.getLogger(__name__)
 
+_DADOS_SENSIVEIS = re.compile(r'(cpf|token)=[^&\s\'"]*', re.IGNORECASE)
+
+
+def _sem_dados_sensiveis(texto: str) -> str:
+    """Mascara CPF e token em mensagens de erro (URLs com query string)."""
+    return _DADOS_SENSIVEIS.sub(r'\1=***', texto)
+
 
 @dataclass
 class APIResponse:
@@ -27,6 +75,178 @@ class APIResponse:
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     status_code: Optional[int] = None
+    degradado: bool = False
+
+
+# ============================================
+# CIRCUIT BREAKER
+# ============================================
+
+CIRCUIT_BREAKER_KEY = 'circuit_breaker:{nome}'
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+MEIO_ABERTO = 'meio_aberto'
+
+
+def _config_circuit_breaker(nome: str, parametro: str, padrao: str) -> float:
+    """Lê CIRCUIT_BREAKER_<NOME>_<PARAMETRO>, com fallback para CIRCUIT_BREAKER_<PARAMETRO>."""
+    valor = os.getenv(f'CIRCUIT_BREAKER_{nome.upper()}_{parametro}') or os.getenv(f'CIRCUIT_BREAKER_{parametro}', padrao)
+    return float(valor)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por API externa, com estado compartilhado no Redis.
+    
+    Estados:
+    - fechado: chamadas liberadas; falhas (timeout, erro de conexão, HTTP 5xx)
+      são contadas numa janela de JANELA segundos.
+    - aberto: atingido LIMIAR_FALHAS, as chamadas são recusadas de imediato
+      (APIResponse degradada) durante TEMPO_ABERTO segundos.
+    - meio_aberto: passado TEMPO_ABERTO, um único worker faz uma chamada de
+      teste; sucesso fecha o circuito, falha reabre.
+    
+    Configuração por variáveis de ambiente (globais ou por API):
+        CIRCUIT_BREAKER_LIMIAR_FALHAS / CIRCUIT_BREAKER_KORUS_LIMIAR_FALHAS (padrão: 5)
+        CIRCUIT_BREAKER_JANELA / CIRCUIT_BREAKER_KORUS_JANELA (padrão: 60s)
+        CIRCUIT_BREAKER_TEMPO_ABERTO / CIRCUIT_BREAKER_KORUS_TEMPO_ABERTO (padrão: 30s)
+    
+    Sem Redis disponível o circuito fica sempre fechado.
+    """
+    
+    def __init__(self, nome: str, descricao: str):
+        self.nome = nome
+        self.descricao = descricao
+        self.limiar_falhas = int(_config_circuit_breaker(nome, 'LIMIAR_FALHAS', '5'))
+        self.janela = int(_config_circuit_breaker(nome, 'JANELA', '60'))
+        self.tempo_aberto = _config_circuit_breaker(nome, 'TEMPO_ABERTO', '30')
+        self._chave = CIRCUIT_BREAKER_KEY.format(nome=nome)
+    
+    def _redis(self):
+        redis = get_redis()
+        if redis is None:
+            return None, None, None
+        chave = make_key(self._chave)
+        return redis, chave, f'{chave}:sonda'
+    
+    def permitir(self) -> bool:
+        """Indica se a chamada pode ser feita (no estado meio-aberto, só a chamada de teste)."""
+        redis, chave, chave_sonda = self._redis()
+        if redis is None:
+            return True
+        try:
+            estado, aberto_em = redis.hmget(chave, 'estado', 'aberto_em')
+            if estado is None or estado.decode() != ABERTO:
+                return True
+            if time.time() - float(aberto_em or 0) < self.tempo_aberto:
+                return False
+            # Meio-aberto: apenas um worker testa a API
+            return bool(redis.set(chave_sonda, 1, nx=True, ex=max(int(self.tempo_aberto), 1)))
+        except RedisError as e:
+            logger.warning(f"Circuit breaker {self.nome} indisponível: {str(e)}")
+            return True
+    
+    def registrar_sucesso(self) -> None:
+        redis, chave, chave_sonda = self._redis()
+        if redis is None:
+            return
+        try:
+            estado, falhas = redis.hmget(chave, 'estado', 'falhas')
+            if estado is None and falhas is None:
+                return
+            if estado and estado.decode() == ABERTO:
+                logger.info(f"Circuit breaker {self.nome} fechado após chamada de teste bem-sucedida")
+            redis.pipeline().delete(chave).delete(chave_sonda).execute()
+        except RedisError as e:
+            logger.warning(f"Circuit breaker {self.nome} indisponível: {str(e)}")
+    
+    def registrar_falha(self) -> None:
+        redis, chave, chave_sonda = self._redis()
+        if redis is None:
+            return
+        try:
+            agora = time.time()
+            pipe = redis.pipeline()
+            pipe.hincrby(chave, 'falhas', 1)
+            pipe.hset(chave, 'ultima_falha', agora)
+            pipe.hget(chave, 'estado')
+            pipe.expire(chave, self.janela + int(self.tempo_aberto))
+            falhas, _, estado, _ = pipe.execute()
+            
+            aberto = estado is not None and estado.decode() == ABERTO
+            if aberto or falhas >= self.limiar_falhas:
+                # Abre (ou reabre, se a chamada de teste falhou) o circuito
+                redis.pipeline().hset(chave, mapping={'estado': ABERTO, 'aberto_em': agora}).delete(chave_sonda).execute()
+                if not aberto:
+                    logger.warning(
+                        f"Circuit breaker {self.nome} aberto após {falhas} falha(s); "
+                        f"chamadas recusadas por {self.tempo_aberto:.0f}s"
+                    )
+        except RedisError as e:
+            logger.warning(f"Circuit breaker {self.nome} indisponível: {str(e)}")
+    
+    async def apermitir(self) -> bool:
+        """Versão assíncrona de permitir() (Redis fora do event loop)."""
+        return await sync_to_async(self.permitir)()
+    
+    async def aregistrar_falha(self) -> None:
+        await sync_to_async(self.registrar_falha)()
+    
+    def resposta_degradada(self) -> APIResponse:
+        """APIResponse retornada sem chamar a API enquanto o circuito está aberto."""
+        return APIResponse(
+            success=False,
+            error=f'{self.descricao} temporariamente indisponível. Tente novamente em instantes.',
+            status_code=503,
+            degradado=True,
+        )
+    
+    def estado(self) -> Dict[str, Any]:
+        """Estado atual para monitoramento."""
+        dados = {
+            'nome': self.nome,
+            'estado': FECHADO,
+            'falhas': 0,
+            'limiar_falhas': self.limiar_falhas,
+            'janela': self.janela,
+            'tempo_aberto': self.tempo_aberto,
+            'aberto_em': None,
+        }
+        redis, chave, _ = self._redis()
+        if redis is None:
+            dados['estado'] = 'desconhecido'
+            return dados
+        try:
+            estado, falhas, aberto_em = redis.hmget(chave, 'estado', 'falhas', 'aberto_em')
+        except RedisError:
+            dados['estado'] = 'desconhecido'
+            return dados
+        
+        dados['falhas'] = int(falhas or 0)
+        if estado and estado.decode() == ABERTO:
+            dados['aberto_em'] = float(aberto_em)
+            aberto_ha = time.time() - float(aberto_em)
+            dados['estado'] = ABERTO if aberto_ha < self.tempo_aberto else MEIO_ABERTO
+        return dados
+    
+    def resetar(self) -> None:
+        """Fecha o circuito manualmente."""
+        redis, chave, chave_sonda = self._redis()
+        if redis is not None:
+            redis.delete(chave, chave_sonda)
+
+
+circuit_breakers = {
+    'korus': CircuitBreaker('korus', 'API Korus'),
+    'receita': CircuitBreaker('receita', 'Consulta à Receita Federal'),
+    'femme': CircuitBreaker('femme', 'API FEMME'),
+}
+
+
+def estado_circuit_breakers() -> list:
+    """Estado de todos os circuit breakers (para monitoramento)."""
+    return [breaker.estado() for breaker in circuit_breakers.values()]
 
 
 class ExternalAPIClient(ABC):
@@ -35,17 +255,69 @@ class ExternalAPIClient(ABC):
     
     Fornece estrutura comum para autenticação e requisições HTTP.
     Subclasses devem implementar os métodos abstratos.
+
+    Subclasses que definem token_compartilhado reutilizam o token entre
+    instâncias e workers; authenticate() só é chamado quando não há token
+    válido no cache.
     """
+
+    token_compartilhado: Optional[TokenCompartilhado] = None
+    token_validade_padrao: int = 600
+    circuit_breaker: Optional[CircuitBreaker] = None
     
     def __init__(self, base_url: str, timeout: int = 20):
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self._token: Optional[str] = None
+        self._token_validade: int = self.token_validade_padrao
     
     @abstractmethod
     def authenticate(self) -> bool:
         """Realiza autenticação na API e armazena token."""
         pass
+
+    def _obter_token(self) -> bool:
+        """
+        Garante um token em self._token, usando o cache compartilhado.
+
+        Returns:
+            True se há token disponível
+        """
+        if self._token:
+            return True
+        if self.token_compartilhado is None:
+            return self.authenticate()
+        self._token = self.token_compartilhado.obter(self._gerar_token_compartilhado)
+        return bool(self._token)
+
+    def _gerar_token_compartilhado(self):
+        if not self.authenticate():
+            return None
+        return self._token, self._token_validade
+
+    async def aauthenticate(self) -> bool:
+        """Versão assíncrona de authenticate() (padrão: executa a síncrona em thread)."""
+        return await sync_to_async(self.authenticate, thread_sensitive=False)()
+
+    async def _aobter_token(self) -> bool:
+        """Versão assíncrona de _obter_token()."""
+        if self._token:
+            return True
+        if self.token_compartilhado is None:
+            return await self.aauthenticate()
+        self._token = await self.token_compartilhado.aobter(self._agerar_token_compartilhado)
+        return bool(self._token)
+
+    async def _agerar_token_compartilhado(self):
+        if not await self.aauthenticate():
+            return None
+        return self._token, self._token_validade
+
+    def _invalidar_token(self) -> None:
+        """Descarta o token atual (rejeitado pela API)."""
+        if self._token and self.token_compartilhado is not None:
+            self.token_compartilhado.invalidar(self._token)
+        self._token = None
     
     def _make_request(
         self,
@@ -54,7 +326,8 @@ class ExternalAPIClient(ABC):
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
         headers: Optional[Dict] = None,
-        require_auth: bool = True
+        require_auth: bool = True,
+        idempotente: Optional[bool] = None
     ) -> APIResponse:
         """
         Realiza requisição HTTP para a API.
@@ -66,78 +339,185 @@ class ExternalAPIClient(ABC):
             params: Query parameters
             headers: Headers adicionais
             require_auth: Se True, adiciona token de autenticação
+            idempotente: Repetir em falhas transitórias (padrão: apenas GET)
         
         Returns:
             APIResponse com resultado da requisição
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        if idempotente is None:
+            idempotente = method.upper() == 'GET'
+        request_headers = self._montar_headers(headers)
         
-        request_headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': 'FEMME-Integra/1.0'
-        }
-        
-        if headers:
-            request_headers.update(headers)
-        
-        if require_auth:
-            if not self._token:
-                if not self.authenticate():
-                    return APIResponse(
-                        success=False,
-                        error='Falha na autenticação com a API externa.'
-                    )
-            request_headers['Authorization'] = self._token
+        breaker = self.circuit_breaker
+        if breaker and not breaker.permitir():
+            logger.warning(f"Circuit breaker {breaker.nome} aberto; chamada a {url} recusada")
+            return breaker.resposta_degradada()
         
         try:
-            response = requests.request(
-                method=method.upper(),
-                url=url,
-                json=data,
-                params=params,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            
-            # Tentar parsear JSON
-            try:
-                response_data = response.json()
-            except ValueError:
-                response_data = {'raw': response.text}
-            
-            if response.ok:
-                return APIResponse(
-                    success=True,
-                    data=response_data,
-                    status_code=response.status_code
-                )
-            else:
-                return APIResponse(
-                    success=False,
-                    data=response_data,
-                    error=f'Erro na API: HTTP {response.status_code}',
-                    status_code=response.status_code
+            for tentativa in range(2):
+                if require_auth:
+                    if not self._obter_token():
+                        return self._falha_autenticacao()
+                    request_headers['Authorization'] = self._token
+                
+                response = http_request(
+                    method,
+                    url,
+                    json=data,
+                    params=params,
+                    headers=request_headers,
+                    timeout=self.timeout,
+                    idempotente=idempotente
                 )
                 
+                if response.status_code == 401 and require_auth and tentativa == 0:
+                    # Token expirado/revogado: autenticar novamente e repetir uma vez
+                    logger.warning(f"HTTP 401 em {url}; renovando token")
+                    self._invalidar_token()
+                    continue
+                break
+            
+            return self._interpretar_resposta(response)
+                
         except Timeout:
             logger.error(f"Timeout ao acessar {url}")
+            if breaker:
+                breaker.registrar_falha()
             return APIResponse(
                 success=False,
                 error='Tempo limite excedido ao acessar a API externa.'
             )
         except RequestException as e:
-            logger.error(f"Erro de conexão com {url}: {str(e)}")
+            logger.error(f"Erro de conexão com {url}: {_sem_dados_sensiveis(str(e))}")
+            if breaker:
+                breaker.registrar_falha()
             return APIResponse(
                 success=False,
                 error='Erro de conexão com a API externa.'
             )
         except Exception as e:
-            logger.error(f"Erro inesperado ao acessar {url}: {str(e)}", exc_info=True)
+            logger.error(f"Erro inesperado ao acessar {url}: {_sem_dados_sensiveis(str(e))}", exc_info=True)
             return APIResponse(
                 success=False,
                 error='Erro inesperado ao acessar a API externa.'
             )
 
+    async def _amake_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        require_auth: bool = True,
+        idempotente: Optional[bool] = None
+    ) -> APIResponse:
+        """Versão assíncrona de _make_request() (mesmos argumentos e retorno)."""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        if idempotente is None:
+            idempotente = method.upper() == 'GET'
+        request_headers = self._montar_headers(headers)
+        
+        breaker = self.circuit_breaker
+        if breaker and not await breaker.apermitir():
+            logger.warning(f"Circuit breaker {breaker.nome} aberto; chamada a {url} recusada")
+            return breaker.resposta_degradada()
+        
+        try:
+            for tentativa in range(2):
+                if require_auth:
+                    if not await self._aobter_token():
+                        return await sync_to_async(self._falha_autenticacao)()
+                    request_headers['Authorization'] = self._token
+                
+                response = await ahttp_request(
+                    method,
+                    url,
+                    json=data,
+                    params=params,
+                    headers=request_headers,
+                    timeout=self.timeout,
+                    idempotente=idempotente
+                )
+                
+                if response.status_code == 401 and require_auth and tentativa == 0:
+                    logger.warning(f"HTTP 401 em {url}; renovando token")
+                    self._invalidar_token()
+                    continue
+                break
+            
+            return await sync_to_async(self._interpretar_resposta)(response)
+        
+        except httpx.TimeoutException:
+            logger.error(f"Timeout ao acessar {url}")
+            if breaker:
+                await breaker.aregistrar_falha()
+            return APIResponse(
+                success=False,
+                error='Tempo limite excedido ao acessar a API externa.'
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Erro de conexão com {url}: {_sem_dados_sensiveis(str(e))}")
+            if breaker:
+                await breaker.aregistrar_falha()
+            return APIResponse(
+                success=False,
+                error='Erro de conexão com a API externa.'
+            )
+        except Exception as e:
+            logger.error(f"Erro inesperado ao acessar {url}: {_sem_dados_sensiveis(str(e))}", exc_info=True)
+            return APIResponse(
+                success=False,
+                error='Erro inesperado ao acessar a API externa.'
+            )
+
+    @staticmethod
+    def _montar_headers(headers: Optional[Dict]) -> Dict:
+        request_headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'FEMME-Integra/1.0'
+        }
+        if headers:
+            request_headers.update(headers)
+        return request_headers
+
+    def _falha_autenticacao(self) -> APIResponse:
+        if self.circuit_breaker:
+            self.circuit_breaker.registrar_falha()
+        return APIResponse(
+            success=False,
+            error='Falha na autenticação com a API externa.'
+        )
+
+    def _interpretar_resposta(self, response) -> APIResponse:
+        """Converte a resposta HTTP (requests ou httpx) em APIResponse e atualiza o circuit breaker."""
+        breaker = self.circuit_breaker
+        if breaker:
+            if response.status_code >= 500:
+                breaker.registrar_falha()
+            else:
+                breaker.registrar_sucesso()
+        
+        # Tentar parsear JSON
+        try:
+            response_data = response.json()
+        except ValueError:
+            response_data = {'raw': response.text}
+        
+        if response.status_code < 400:
+            return APIResponse(
+                success=True,
+                data=response_data,
+                status_code=response.status_code
+            )
+        return APIResponse(
+            success=False,
+            data=response_data,
+            error=f'Erro na API: HTTP {response.status_code}',
+            status_code=response.status_code
+        )
+
 
 class KorusAPIClient(ExternalAPIClient):
     """
@@ -149,10 +529,14 @@ class KorusAPIClient(ExternalAPIClient):
         if response.success:
             print(response.data)
     """
+
+    token_compartilhado = token_korus
+    circuit_breaker = circuit_breakers['korus']
     
     def __init__(self):
         base_url = os.getenv('KORUS_API_URL', 'https://agendamento-digital-b3-rw-femme.pixeon.cloud/api/femme')
         timeout = int(os.getenv('KORUS_API_TIMEOUT', '20'))
+        self.token_validade_padrao = int(os.getenv('KORUS_API_TOKEN_TTL', '600'))
         super().__init__(base_url, timeout)
         
         self._login = os.getenv('KORUS_API_LOGIN', '')
@@ -170,33 +554,15 @@ class KorusAPIClient(ExternalAPIClient):
             return False
         
         try:
-            response = requests.post(
+            response = http_request(
+                'POST',
                 f"{self.base_url}/Autenticacao",
-                json={
-                    'login': self._login,
-                    'senha': self._password
-                },
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'FEMME-Integra/1.0'
-                },
-                timeout=self.timeout
+                json=self._credenciais(),
+                headers=self._montar_headers(None),
+                timeout=self.timeout,
+                idempotente=True
             )
-            
-            if response.ok:
-                data = response.json()
-                access_token = data.get('access_token')
-                
-                if access_token:
-                    self._token = f'Bearer {access_token}'
-                    logger.info("Autenticação Korus bem-sucedida")
-                    return True
-                else:
-                    logger.error("Token não encontrado na resposta da API Korus")
-                    return False
-            else:
-                logger.error(f"Erro na autenticação Korus: HTTP {response.status_code}")
-                return False
+            return self._ler_token(response)
                 
         except Timeout:
             logger.error("Timeout na autenticação Korus")
@@ -208,6 +574,57 @@ class KorusAPIClient(ExternalAPIClient):
             logger.error(f"Erro inesperado na autenticação Korus: {str(e)}", exc_info=True)
             return False
     
+    async def aauthenticate(self) -> bool:
+        """Versão assíncrona de authenticate()."""
+        if not self._login or not self._password:
+            logger.error("Credenciais da API Korus não configuradas")
+            return False
+        
+        try:
+            response = await ahttp_request(
+                'POST',
+                f"{self.base_url}/Autenticacao",
+                json=self._credenciais(),
+                headers=self._montar_headers(None),
+                timeout=self.timeout,
+                idempotente=True
+            )
+            return self._ler_token(response)
+        
+        except httpx.TimeoutException:
+            logger.error("Timeout na autenticação Korus")
+            return False
+        except httpx.HTTPError as e:
+            logger.error(f"Erro de conexão na autenticação Korus: {str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"Erro inesperado na autenticação Korus: {str(e)}", exc_info=True)
+            return False
+    
+    def _credenciais(self) -> Dict[str, str]:
+        return {
+            'login': self._login,
+            'senha': self._password
+        }
+    
+    def _ler_token(self, response) -> bool:
+        """Guarda o token da resposta de /Autenticacao (requests ou httpx)."""
+        if response.status_code >= 400:
+            logger.error(f"Erro na autenticação Korus: HTTP {response.status_code}")
+            return False
+        
+        data = response.json()
+        access_token = data.get('access_token')
+        
+        if not access_token:
+            logger.error("Token não encontrado na resposta da API Korus")
+            return False
+        
+        self._token = f'Bearer {access_token}'
+        self._token_validade = int(data.get('expires_in') or self.token_validade_padrao)
+        logger.info("Autenticação Korus bem-sucedida")
+        return True
+    
     def buscar_medico_por_crm(self, crm: str, uf: str) -> APIResponse:
         """
         Busca médico por CRM e UF na API Korus.
@@ -223,31 +640,47 @@ class KorusAPIClient(ExternalAPIClient):
             - Se 2+ médicos: success=False, error='Múltiplos médicos encontrados', 
                             data={'medicos': [...], 'quantidade': N}
         """
-        # Limpar e validar parâmetros
-        crm_limpo = crm.strip()
-        uf_limpo = uf.strip().upper()
+        crm_limpo, uf_limpo, erro = _validar_crm(crm, uf)
+        if erro:
+            return erro
         
-        if not crm_limpo:
-            return APIResponse(
-                success=False,
-                error='CRM não informado.'
-            )
+        logger.info(f"Buscando médico por CRM: {crm_limpo}, UF: {uf_limpo}")
         
-        if not uf_limpo or len(uf_limpo) != 2:
-            return APIResponse(
-                success=False,
-                error='UF do CRM inválida. Informe 2 caracteres.'
+        response = singleflight.executar(
+            chave_consulta('korus:medico', uf_limpo, crm_limpo),
+            lambda: self._make_request(
+                method='POST',
+                endpoint='/Medico',
+                data={'crm': crm_limpo, 'uf': uf_limpo},
+                require_auth=True,
+                idempotente=True  # POST de consulta
             )
+        )
+        return self._interpretar_medicos(response, crm_limpo, uf_limpo)
+    
+    async def abuscar_medico_por_crm(self, crm: str, uf: str) -> APIResponse:
+        """Versão assíncrona de buscar_medico_por_crm()."""
+        crm_limpo, uf_limpo, erro = _validar_crm(crm, uf)
+        if erro:
+            return erro
         
         logger.info(f"Buscando médico por CRM: {crm_limpo}, UF: {uf_limpo}")
         
-        response = self._make_request(
-            method='POST',
-            endpoint='/Medico',
-            data={'crm': crm_limpo, 'uf': uf_limpo},
-            require_auth=True
+        response = await singleflight.aexecutar(
+            chave_consulta('korus:medico', uf_limpo, crm_limpo),
+            lambda: self._amake_request(
+                method='POST',
+                endpoint='/Medico',
+                data={'crm': crm_limpo, 'uf': uf_limpo},
+                require_auth=True,
+                idempotente=True  # POST de consulta
+            )
         )
-        
+        return self._interpretar_medicos(response, crm_limpo, uf_limpo)
+    
+    @staticmethod
+    def _interpretar_medicos(response: APIResponse, crm_limpo: str, uf_limpo: str) -> APIResponse:
+        """Converte a resposta de /Medico no formato de buscar_medico_por_crm()."""
         logger.info(f"Resposta Korus Médico - success={response.success}, status={response.status_code}, data={response.data}, error={response.error}")
         
         # Tratar erro de requisição
@@ -328,25 +761,54 @@ class KorusAPIClient(ExternalAPIClient):
         Returns:
             APIResponse com dados do paciente ou erro
         """
-        # Limpar CPF (remover pontos e traços)
-        cpf_limpo = cpf.replace('.', '').replace('-', '').strip()
+        cpf_limpo, erro = _validar_cpf(cpf)
+        if erro:
+            return erro
         
-        if not cpf_limpo or len(cpf_limpo) != 11:
-            return APIResponse(
-                success=False,
-                error='CPF inválido. Informe 11 dígitos.'
+        logger.info(f"Buscando paciente por CPF: {cpf_limpo[:3]}***{cpf_limpo[-2:]}")
+        
+        return cache_cpf_korus.consultar(cpf_limpo, lambda: self._consultar_paciente(cpf_limpo))
+    
+    def _consultar_paciente(self, cpf_limpo: str) -> APIResponse:
+        response = singleflight.executar(
+            chave_consulta('korus:cpf', cpf_limpo),
+            lambda: self._make_request(
+                method='GET',
+                endpoint='/paciente/cpf',
+                params={'cpf': cpf_limpo},
+                require_auth=True
             )
+        )
+        return self._interpretar_paciente(response)
+    
+    async def abuscar_paciente_por_cpf(self, cpf: str) -> APIResponse:
+        """Versão assíncrona de buscar_paciente_por_cpf()."""
+        cpf_limpo, erro = _validar_cpf(cpf)
+        if erro:
+            return erro
         
         logger.info(f"Buscando paciente por CPF: {cpf_limpo[:3]}***{cpf_limpo[-2:]}")
         
-        response = self._make_request(
-            method='GET',
-            endpoint=f'/paciente/cpf?cpf={cpf_limpo}',
-            require_auth=True
+        return await cache_cpf_korus.aconsultar(cpf_limpo, lambda: self._aconsultar_paciente(cpf_limpo))
+    
+    async def _aconsultar_paciente(self, cpf_limpo: str) -> APIResponse:
+        response = await singleflight.aexecutar(
+            chave_consulta('korus:cpf', cpf_limpo),
+            lambda: self._amake_request(
+                method='GET',
+                endpoint='/paciente/cpf',
+                params={'cpf': cpf_limpo},
+                require_auth=True
+            )
         )
-        
+        return self._interpretar_paciente(response)
+    
+    @staticmethod
+    def _interpretar_paciente(response: APIResponse) -> APIResponse:
+        """Trata as formas de "CPF não encontrado" da resposta de /paciente/cpf."""
         # Log da resposta para debug
-        logger.info(f"Resposta Korus - success={response.success}, status={response.status_code}, data={response.data}, error={response.error}")
+        # Sem os dados do paciente no log (CPF, nome, nascimento)
+        logger.info(f"Resposta Korus - success={response.success}, status={response.status_code}, error={response.error}")
         
         # Tratar caso de CPF não encontrado (pode vir como 404 ou lista/objeto vazio)
         if response.status_code == 404:
@@ -381,10 +843,42 @@ class KorusAPIClient(ExternalAPIClient):
         return response
 
 
+def _validar_cpf(cpf: str):
+    """Retorna (cpf_limpo, None) ou (None, APIResponse de erro)."""
+    # Limpar CPF (remover pontos e traços)
+    cpf_limpo = cpf.replace('.', '').replace('-', '').strip()
+    
+    if not cpf_limpo or len(cpf_limpo) != 11:
+        return None, APIResponse(
+            success=False,
+            error='CPF inválido. Informe 11 dígitos.'
+        )
+    return cpf_limpo, None
+
+
+def _validar_crm(crm: str, uf: str):
+    """Retorna (crm_limpo, uf_limpo, None) ou (None, None, APIResponse de erro)."""
+    crm_limpo = crm.strip()
+    uf_limpo = uf.strip().upper()
+    
+    if not crm_limpo:
+        return None, None, APIResponse(
+            success=False,
+            error='CRM não informado.'
+        )
+    
+    if not uf_limpo or len(uf_limpo) != 2:
+        return None, None, APIResponse(
+            success=False,
+            error='UF do CRM inválida. Informe 2 caracteres.'
+        )
+    return crm_limpo, uf_limpo, None
+
+
 def get_korus_client() -> KorusAPIClient:
     """
     Retorna nova instância do cliente Korus.
-    Sempre gera novo token a cada requisição conforme especificado.
+    O token é reaproveitado do cache compartilhado entre workers.
     
     Returns:
         KorusAPIClient configurado
@@ -430,88 +924,178 @@ class ReceitaAPIClient:
         Returns:
             APIResponse com dados do CPF ou erro
         """
-        # Limpar CPF
-        cpf_limpo = cpf.replace('.', '').replace('-', '').strip()
-        
-        if not cpf_limpo or len(cpf_limpo) != 11:
-            return APIResponse(
-                success=False,
-                error='CPF inválido. Informe 11 dígitos.'
+        cpf_limpo, erro = self._preparar_consulta(cpf)
+        if erro:
+            return erro
+        return cache_cpf_receita.consultar(
+            cpf_limpo,
+            lambda: singleflight.executar(
+                chave_consulta('receita:cpf', cpf_limpo),
+                lambda: self._consultar(cpf_limpo)
             )
-        
-        if not self.token:
-            return APIResponse(
-                success=False,
-                error='Token da API Receita não configurado.'
+        )
+    
+    async def abuscar_cpf(self, cpf: str) -> APIResponse:
+        """Versão assíncrona de buscar_cpf()."""
+        cpf_limpo, erro = self._preparar_consulta(cpf)
+        if erro:
+            return erro
+        return await cache_cpf_receita.aconsultar(
+            cpf_limpo,
+            lambda: singleflight.aexecutar(
+                chave_consulta('receita:cpf', cpf_limpo),
+                lambda: self._aconsultar(cpf_limpo)
             )
-        
+        )
+    
+    def _consultar(self, cpf_limpo: str) -> APIResponse:
+        # Dentro do cache e do singleflight: só a chamada real ocupa a sonda do meio-aberto
+        breaker = circuit_breakers['receita']
+        if not breaker.permitir():
+            logger.warning("Circuit breaker receita aberto; consulta recusada")
+            return breaker.resposta_degradada()
         try:
-            url = f"{self.base_url}?cpf={cpf_limpo}&token={self.token}"
-            
             logger.info(f"Consultando CPF na Receita: {cpf_limpo[:3]}***{cpf_limpo[-2:]}")
             
-            response = requests.get(
-                url,
+            response = http_request(
+                'GET',
+                self.base_url,
+                params={'cpf': cpf_limpo, 'token': self.token},
                 timeout=self.timeout,
+                idempotente=True,
                 headers={
                     'Content-Type': 'application/json'
                 }
             )
+            return self._interpretar_resposta(response)
             
-            logger.info(f"Resposta Receita - status_code={response.status_code}")
-            
-            if response.status_code != 200:
-                return APIResponse(
-                    success=False,
-                    status_code=response.status_code,
-                    error=f'Erro na API Receita: HTTP {response.status_code}'
-                )
-            
-            data = response.json()
-            
-            # Verificar se a consulta foi bem-sucedida
-            if not data.get('status'):
-                error_msg = data.get('message') or data.get('return') or 'CPF não encontrado na Receita Federal.'
-                logger.warning(f"CPF não encontrado na Receita: {error_msg}")
-                return APIResponse(
-                    success=False,
-                    error='CPF não encontrado na Receita Federal.'
-                )
-            
-            result = data.get('result', {})
-            
-            if not result:
-                return APIResponse(
-                    success=False,
-                    error='CPF não encontrado na Receita Federal.'
-                )
-            
-            logger.info(f"CPF encontrado na Receita: {result.get('nome_da_pf', 'N/A')[:20]}...")
+        except requests.exceptions.Timeout:
+            logger.error("Timeout ao consultar API Receita")
+            breaker.registrar_falha()
+            return self._erro_timeout()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro de conexão com API Receita: {_sem_dados_sensiveis(str(e))}")
+            breaker.registrar_falha()
+            return self._erro_conexao()
+        except Exception as e:
+            logger.error(f"Erro inesperado ao consultar API Receita: {_sem_dados_sensiveis(str(e))}", exc_info=True)
+            return self._erro_inesperado()
+    
+    async def _aconsultar(self, cpf_limpo: str) -> APIResponse:
+        breaker = circuit_breakers['receita']
+        if not await breaker.apermitir():
+            logger.warning("Circuit breaker receita aberto; consulta recusada")
+            return breaker.resposta_degradada()
+        try:
+            logger.info(f"Consultando CPF na Receita: {cpf_limpo[:3]}***{cpf_limpo[-2:]}")
             
-            return APIResponse(
-                success=True,
-                status_code=200,
-                data=result
+            response = await ahttp_request(
+                'GET',
+                self.base_url,
+                params={'cpf': cpf_limpo, 'token': self.token},
+                timeout=self.timeout,
+                idempotente=True,
+                headers={
+                    'Content-Type': 'application/json'
+                }
             )
-            
-        except requests.exceptions.Timeout:
+            return await sync_to_async(self._interpretar_resposta)(response)
+        
+        except httpx.TimeoutException:
             logger.error("Timeout ao consultar API Receita")
+            await breaker.aregistrar_falha()
+            return self._erro_timeout()
+        except httpx.HTTPError as e:
+            logger.error(f"Erro de conexão com API Receita: {_sem_dados_sensiveis(str(e))}")
+            await breaker.aregistrar_falha()
+            return self._erro_conexao()
+        except Exception as e:
+            logger.error(f"Erro inesperado ao consultar API Receita: {_sem_dados_sensiveis(str(e))}", exc_info=True)
+            return self._erro_inesperado()
+    
+    def _preparar_consulta(self, cpf: str):
+        """
+        Valida CPF e token antes da consulta.
+        
+        Returns:
+            (cpf_limpo, None) ou (None, APIResponse de erro)
+        """
+        cpf_limpo, erro = _validar_cpf(cpf)
+        if erro:
+            return None, erro
+        
+        if not self.token:
+            return None, APIResponse(
+                success=False,
+                error='Token da API Receita não configurado.'
+            )
+        return cpf_limpo, None
+    
+    @staticmethod
+    def _interpretar_resposta(response) -> APIResponse:
+        """Converte a resposta HTTP (requests ou httpx) em APIResponse."""
+        logger.info(f"Resposta Receita - status_code={response.status_code}")
+        
+        breaker = circuit_breakers['receita']
+        if response.status_code >= 500:
+            breaker.registrar_falha()
+        else:
+            breaker.registrar_sucesso()
+        
+        if response.status_code != 200:
             return APIResponse(
                 success=False,
-                error='Timeout ao consultar Receita Federal. Tente novamente.'
+                status_code=response.status_code,
+                error=f'Erro na API Receita: HTTP {response.status_code}'
             )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro de conexão com API Receita: {str(e)}")
+        
+        data = response.json()
+        
+        # Verificar se a consulta foi bem-sucedida
+        if not data.get('status'):
+            error_msg = data.get('message') or data.get('return') or 'CPF não encontrado na Receita Federal.'
+            logger.warning(f"CPF não encontrado na Receita: {error_msg}")
             return APIResponse(
                 success=False,
-                error='Erro ao conectar com a Receita Federal. Tente novamente.'
+                error='CPF não encontrado na Receita Federal.'
             )
-        except Exception as e:
-            logger.error(f"Erro inesperado ao consultar API Receita: {str(e)}", exc_info=True)
+        
+        result = data.get('result', {})
+        
+        if not result:
             return APIResponse(
                 success=False,
-                error='Erro inesperado ao consultar CPF.'
+                error='CPF não encontrado na Receita Federal.'
             )
+        
+        logger.info("CPF encontrado na Receita")
+        
+        return APIResponse(
+            success=True,
+            status_code=200,
+            data=result
+        )
+    
+    @staticmethod
+    def _erro_timeout() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Timeout ao consultar Receita Federal. Tente novamente.'
+        )
+    
+    @staticmethod
+    def _erro_conexao() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Erro ao conectar com a Receita Federal. Tente novamente.'
+        )
+    
+    @staticmethod
+    def _erro_inesperado() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Erro inesperado ao consultar CPF.'
+        )
 
 
 def get_receita_client() -> ReceitaAPIClient:
@@ -554,53 +1138,96 @@ class FemmeAPIClient:
         self.client_id = os.environ.get('FEMME_API_CLIENT_ID', '')
         self.client_secret = os.environ.get('FEMME_API_CLIENT_SECRET', '')
         self.timeout = int(os.environ.get('FEMME_API_TIMEOUT', '20'))
+        self.token_validade_padrao = int(os.environ.get('FEMME_API_TOKEN_TTL', '3600'))
         
         if not self.client_id or not self.client_secret:
             logger.warning("FEMME_API_CLIENT_ID ou FEMME_API_CLIENT_SECRET não configurados")
     
     def _gerar_token(self) -> str | None:
         """
-        Gera token de autenticação via client_credentials.
+        Retorna token de autenticação, reaproveitando o cache compartilhado.
         
         Returns:
             Token de acesso ou None em caso de erro
         """
+        return token_femme.obter(self._solicitar_token)
+    
+    async def _agerar_token(self) -> str | None:
+        """Versão assíncrona de _gerar_token()."""
+        return await token_femme.aobter(self._asolicitar_token)
+    
+    def _solicitar_token(self) -> tuple[str, int] | None:
+        """
+        Gera novo token via client_credentials.
+        
+        Returns:
+            (token, validade em segundos) ou None em caso de erro
+        """
         try:
             url = f"{self.base_url}/token"
             
             logger.info("Gerando token FEMME API...")
             
-            response = requests.post(
+            response = http_request(
+                'POST',
                 url,
-                data={
-                    'grant_type': 'client_credentials',
-                    'client_id': self.client_id,
-                    'client_secret': self.client_secret
-                },
+                data=self._credenciais(),
                 headers={
                     'Content-Type': 'application/x-www-form-urlencoded'
                 },
-                timeout=self.timeout
+                timeout=self.timeout,
+                idempotente=True
             )
-            
-            if response.status_code != 200:
-                logger.error(f"Erro ao gerar token FEMME: HTTP {response.status_code}")
-                return None
-            
-            data = response.json()
-            token = data.get('access_token')
-            
-            if token:
-                logger.info("Token FEMME gerado com sucesso")
-                return token
-            else:
-                logger.error("Token não encontrado na resposta")
-                return None
+            return self._ler_token(response)
                 
         except Exception as e:
             logger.error(f"Exceção ao gerar token FEMME: {str(e)}", exc_info=True)
             return None
     
+    async def _asolicitar_token(self) -> tuple[str, int] | None:
+        """Versão assíncrona de _solicitar_token()."""
+        try:
+            logger.info("Gerando token FEMME API...")
+            
+            response = await ahttp_request(
+                'POST',
+                f"{self.base_url}/token",
+                data=self._credenciais(),
+                headers={
+                    'Content-Type': 'application/x-www-form-urlencoded'
+                },
+                timeout=self.timeout,
+                idempotente=True
+            )
+            return self._ler_token(response)
+        
+        except Exception as e:
+            logger.error(f"Exceção ao gerar token FEMME: {str(e)}", exc_info=True)
+            return None
+    
+    def _credenciais(self) -> Dict[str, str]:
+        return {
+            'grant_type': 'client_credentials',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }
+    
+    def _ler_token(self, response) -> tuple[str, int] | None:
+        """Extrai (token, validade) da resposta de /token (requests ou httpx)."""
+        if response.status_code != 200:
+            logger.error(f"Erro ao gerar token FEMME: HTTP {response.status_code}")
+            return None
+        
+        data = response.json()
+        token = data.get('access_token')
+        
+        if not token:
+            logger.error("Token não encontrado na resposta")
+            return None
+        
+        logger.info("Token FEMME gerado com sucesso")
+        return token, int(data.get('expires_in') or self.token_validade_padrao)
+    
     def buscar_medico(self, crm: str, uf_crm: str) -> APIResponse:
         """
         Busca médico por CRM e UF.
@@ -612,115 +1239,341 @@ class FemmeAPIClient:
         Returns:
             APIResponse com lista de médicos ou erro
         """
-        # Validar parâmetros
-        crm_limpo = crm.strip()
-        uf_limpo = uf_crm.strip().upper()
+        crm_limpo, uf_limpo, erro = self._preparar_consulta(crm, uf_crm)
+        if erro:
+            return erro
+        return singleflight.executar(
+            chave_consulta('femme:medico', uf_limpo, crm_limpo),
+            lambda: self._consultar_medico(crm_limpo, uf_limpo)
+        )
+    
+    async def abuscar_medico(self, crm: str, uf_crm: str) -> APIResponse:
+        """Versão assíncrona de buscar_medico()."""
+        crm_limpo, uf_limpo, erro = self._preparar_consulta(crm, uf_crm)
+        if erro:
+            return erro
+        return await singleflight.aexecutar(
+            chave_consulta('femme:medico', uf_limpo, crm_limpo),
+            lambda: self._aconsultar_medico(crm_limpo, uf_limpo)
+        )
+    
+    def _consultar_medico(self, crm_limpo: str, uf_limpo: str) -> APIResponse:
+        # Dentro do singleflight: resultado reaproveitado não ocupa a sonda do meio-aberto
+        breaker = circuit_breakers['femme']
+        if not breaker.permitir():
+            logger.warning("Circuit breaker femme aberto; consulta recusada")
+            return breaker.resposta_degradada()
+        try:
+            logger.info(f"Consultando médico na API FEMME: CRM={crm_limpo}, UF={uf_limpo}")
+            
+            for tentativa in range(2):
+                token = self._gerar_token()
+                if not token:
+                    return self._erro_autenticacao()
+                
+                response = http_request(
+                    'GET',
+                    f"{self.base_url}/medicos",
+                    params=self._parametros_medico(crm_limpo, uf_limpo),
+                    headers=self._headers_medico(token),
+                    timeout=self.timeout,
+                    idempotente=True
+                )
+                
+                logger.info(f"Resposta FEMME API - status_code={response.status_code}")
+                
+                if response.status_code == 401 and tentativa == 0:
+                    # Token expirado/revogado: descartar e repetir uma vez
+                    token_femme.invalidar(token)
+                    continue
+                break
+            
+            return self._interpretar_resposta(response, crm_limpo, uf_limpo)
+            
+        except requests.exceptions.Timeout:
+            logger.error("Timeout ao consultar API FEMME")
+            breaker.registrar_falha()
+            return self._erro_timeout()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro de conexão com API FEMME: {str(e)}")
+            breaker.registrar_falha()
+            return self._erro_conexao()
+        except Exception as e:
+            logger.error(f"Erro inesperado ao consultar API FEMME: {str(e)}", exc_info=True)
+            return self._erro_inesperado()
+    
+    async def _aconsultar_medico(self, crm_limpo: str, uf_limpo: str) -> APIResponse:
+        breaker = circuit_breakers['femme']
+        if not await breaker.apermitir():
+            logger.warning("Circuit breaker femme aberto; consulta recusada")
+            return breaker.resposta_degradada()
+        try:
+            logger.info(f"Consultando médico na API FEMME: CRM={crm_limpo}, UF={uf_limpo}")
+            
+            for tentativa in range(2):
+                token = await self._agerar_token()
+                if not token:
+                    return await sync_to_async(self._erro_autenticacao)()
+                
+                response = await ahttp_request(
+                    'GET',
+                    f"{self.base_url}/medicos",
+                    params=self._parametros_medico(crm_limpo, uf_limpo),
+                    headers=self._headers_medico(token),
+                    timeout=self.timeout,
+                    idempotente=True
+                )
+                
+                logger.info(f"Resposta FEMME API - status_code={response.status_code}")
+                
+                if response.status_code == 401 and tentativa == 0:
+                    token_femme.invalidar(token)
+                    continue
+                break
+            
+            return await sync_to_async(self._interpretar_resposta)(response, crm_limpo, uf_limpo)
         
-        if not crm_limpo:
-            return APIResponse(
+        except httpx.TimeoutException:
+            logger.error("Timeout ao consultar API FEMME")
+            await breaker.aregistrar_falha()
+            return self._erro_timeout()
+        except httpx.HTTPError as e:
+            logger.error(f"Erro de conexão com API FEMME: {str(e)}")
+            await breaker.aregistrar_falha()
+            return self._erro_conexao()
+        except Exception as e:
+            logger.error(f"Erro inesperado ao consultar API FEMME: {str(e)}", exc_info=True)
+            return self._erro_inesperado()
+    
+    def _preparar_consulta(self, crm: str, uf_crm: str):
+        """
+        Valida parâmetros e credenciais antes da consulta.
+        
+        Returns:
+            (crm_limpo, uf_limpo, None) ou (None, None, APIResponse de erro)
+        """
+        crm_limpo, uf_limpo, erro = _validar_crm(crm, uf_crm)
+        if erro:
+            return None, None, erro
+        
+        if not self.client_id or not self.client_secret:
+            return None, None, APIResponse(
                 success=False,
-                error='CRM não informado.'
+                error='Credenciais da API FEMME não configuradas.'
             )
+        return crm_limpo, uf_limpo, None
+    
+    @staticmethod
+    def _parametros_medico(crm_limpo: str, uf_limpo: str) -> Dict[str, str]:
+        return {
+            'crm': crm_limpo,
+            'uf_crm': uf_limpo.lower()  # API espera UF em minúsculo
+        }
+    
+    @staticmethod
+    def _headers_medico(token: str) -> Dict[str, str]:
+        return {
+            'Authorization': f'Bearer {token}',
+            'Accept': 'application/json'
+        }
+    
+    @staticmethod
+    def _interpretar_resposta(response, crm_limpo: str, uf_limpo: str) -> APIResponse:
+        """Converte a resposta de /medicos (requests ou httpx) em APIResponse."""
+        breaker = circuit_breakers['femme']
+        if response.status_code >= 500:
+            breaker.registrar_falha()
+        else:
+            breaker.registrar_sucesso()
         
-        if not uf_limpo or len(uf_limpo) != 2:
+        if response.status_code == 401:
             return APIResponse(
                 success=False,
-                error='UF do CRM inválida. Informe 2 caracteres.'
+                status_code=401,
+                error='Token expirado ou inválido.'
             )
         
-        if not self.client_id or not self.client_secret:
+        if response.status_code != 200:
             return APIResponse(
                 success=False,
-                error='Credenciais da API FEMME não configuradas.'
+                status_code=response.status_code,
+                error=f'Erro na API FEMME: HTTP {response.status_code}'
             )
         
-        # Gerar token
-        token = self._gerar_token()
-        if not token:
+        data = response.json()
+        
+        # Extrair lista de médicos
+        medicos = data.get('data', {}).get('medicos', [])
+        
+        if not medicos:
+            logger.warning(f"Médico não encontrado: CRM={crm_limpo}, UF={uf_limpo}")
             return APIResponse(
                 success=False,
-                error='Erro ao autenticar na API FEMME.'
+                error='Médico não encontrado.'
             )
         
+        logger.info(f"Médico(s) encontrado(s): {len(medicos)} registro(s)")
+        
+        return APIResponse(
+            success=True,
+            status_code=200,
+            data=medicos
+        )
+    
+    @staticmethod
+    def _erro_autenticacao() -> APIResponse:
+        circuit_breakers['femme'].registrar_falha()
+        return APIResponse(
+            success=False,
+            error='Erro ao autenticar na API FEMME.'
+        )
+    
+    @staticmethod
+    def _erro_timeout() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Timeout ao consultar API. Tente novamente.'
+        )
+    
+    @staticmethod
+    def _erro_conexao() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Erro ao conectar com a API. Tente novamente.'
+        )
+    
+    @staticmethod
+    def _erro_inesperado() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Erro inesperado ao consultar médico.'
+        )
+
+
+def get_femme_client() -> FemmeAPIClient:
+    """
+    Retorna nova instância do cliente FEMME.
+    
+    Returns:
+        FemmeAPIClient configurado
+    """
+    return FemmeAPIClient()
+
+
+class SignedUrlAPIClient:
+    """
+    Cliente da API Lambda que gera URLs pré-assinadas para upload ao S3.
+    
+    Payload:
+        {"process_id": "123", "files": [{"name": ..., "type": ..., "filename": ...}]}
+    
+    Resposta esperada (um objeto por arquivo, indexado pelo nome):
+        {"IDREQ_X_20241211120000.pdf": {"key": "...", "url": "...", "name": "..."}}
+    """
+    
+    def __init__(self):
+        from core.config import get_aws_signed_url_api
+        
+        self.url = get_aws_signed_url_api()
+        self.timeout = int(os.environ.get('AWS_SIGNED_URL_API_TIMEOUT', '10'))
+    
+    def gerar(self, process_id: str, arquivos: list) -> APIResponse:
+        """
+        Solicita URLs pré-assinadas para os arquivos de um processo.
+        
+        Args:
+            process_id: ID numérico da tabela dados_requisicao
+            arquivos: Lista de {'name', 'type', 'filename'}
+        
+        Returns:
+            APIResponse com o objeto retornado pela Lambda em data
+        """
+        if not self.url:
+            return self._erro_configuracao()
+        
         try:
-            url = f"{self.base_url}/medicos"
-            
-            logger.info(f"Consultando médico na API FEMME: CRM={crm_limpo}, UF={uf_limpo}")
-            
-            response = requests.get(
-                url,
-                params={
-                    'crm': crm_limpo,
-                    'uf_crm': uf_limpo.lower()  # API espera UF em minúsculo
-                },
+            response = http_request(
+                'POST',
+                self.url,
+                json={'process_id': process_id, 'files': arquivos},
                 headers={
-                    'Authorization': f'Bearer {token}',
-                    'Accept': 'application/json'
+                    'Content-Type': 'application/json',
+                    'User-Agent': 'FEMME-Integra/1.0'
                 },
                 timeout=self.timeout
             )
-            
-            logger.info(f"Resposta FEMME API - status_code={response.status_code}")
-            
-            if response.status_code == 401:
-                return APIResponse(
-                    success=False,
-                    status_code=401,
-                    error='Token expirado ou inválido.'
-                )
-            
-            if response.status_code != 200:
-                return APIResponse(
-                    success=False,
-                    status_code=response.status_code,
-                    error=f'Erro na API FEMME: HTTP {response.status_code}'
-                )
-            
-            data = response.json()
-            
-            # Extrair lista de médicos
-            medicos = data.get('data', {}).get('medicos', [])
-            
-            if not medicos:
-                logger.warning(f"Médico não encontrado: CRM={crm_limpo}, UF={uf_limpo}")
-                return APIResponse(
-                    success=False,
-                    error='Médico não encontrado.'
-                )
-            
-            logger.info(f"Médico(s) encontrado(s): {len(medicos)} registro(s)")
-            
-            return APIResponse(
-                success=True,
-                status_code=200,
-                data=medicos
-            )
-            
-        except requests.exceptions.Timeout:
-            logger.error("Timeout ao consultar API FEMME")
-            return APIResponse(
-                success=False,
-                error='Timeout ao consultar API. Tente novamente.'
-            )
+            return self._interpretar_resposta(response)
         except requests.exceptions.RequestException as e:
-            logger.error(f"Erro de conexão com API FEMME: {str(e)}")
+            logger.error(f"Erro ao chamar API Lambda: {str(e)}")
+            return self._erro_conexao()
+    
+    async def agerar(self, process_id: str, arquivos: list) -> APIResponse:
+        """Versão assíncrona de gerar()."""
+        if not self.url:
+            return self._erro_configuracao()
+        
+        try:
+            response = await ahttp_request(
+                'POST',
+                self.url,
+                json={'process_id': process_id, 'files': arquivos},
+                headers={
+                    'Content-Type': 'application/json',
+                    'User-Agent': 'FEMME-Integra/1.0'
+                },
+                timeout=self.timeout
+            )
+            return self._interpretar_resposta(response)
+        except httpx.HTTPError as e:
+            logger.error(f"Erro ao chamar API Lambda: {str(e)}")
+            return self._erro_conexao()
+    
+    @staticmethod
+    def _interpretar_resposta(response) -> APIResponse:
+        if response.status_code != 200:
+            logger.error(f"Erro ao obter signed URL: {response.text}")
             return APIResponse(
                 success=False,
-                error='Erro ao conectar com a API. Tente novamente.'
+                status_code=response.status_code,
+                error='Erro ao gerar URL de upload.'
             )
-        except Exception as e:
-            logger.error(f"Erro inesperado ao consultar API FEMME: {str(e)}", exc_info=True)
+        
+        data = response.json()
+        if not data:
+            logger.error("Nenhum arquivo retornado pela API Lambda")
             return APIResponse(
                 success=False,
-                error='Erro inesperado ao consultar médico.'
+                status_code=response.status_code,
+                error='Erro ao gerar URL de upload.'
             )
+        
+        return APIResponse(
+            success=True,
+            status_code=response.status_code,
+            data=data
+        )
+    
+    @staticmethod
+    def _erro_configuracao() -> APIResponse:
+        logger.error("AWS_SIGNED_URL_API não configurada para o ambiente atual")
+        return APIResponse(
+            success=False,
+            error='Configuração de upload não encontrada.'
+        )
+    
+    @staticmethod
+    def _erro_conexao() -> APIResponse:
+        return APIResponse(
+            success=False,
+            error='Erro ao conectar com serviço de upload.'
+        )
 
 
-def get_femme_client() -> FemmeAPIClient:
+def get_signed_url_client() -> SignedUrlAPIClient:
     """
-    Retorna nova instância do cliente FEMME.
+    Retorna nova instância do cliente da API de signed URL.
     
     Returns:
-        FemmeAPIClient configurado
+        SignedUrlAPIClient configurado
     """
-    return FemmeAPIClient()
+    return SignedUrlAPIClient()
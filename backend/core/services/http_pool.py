@@ -0,0 +1,255 @@
+"""
+Sessões HTTP com pool de conexões para integrações externas.
+
+Chamadas com requests.get/post abrem uma conexão TCP (e handshake TLS) a
+cada requisição. Este módulo mantém, por processo, uma requests.Session por
+host com conexões keep-alive reutilizadas por todos os clientes (Korus,
+FEMME, Receita, Lambda de signed URL).
+
+Configuração (variáveis de ambiente):
+    HTTP_POOL_TAMANHO           Conexões mantidas por host (padrão: 10)
+    HTTP_POOL_TAMANHO_POR_HOST  Exceções por host, ex: "api.exemplo.com=20,outra.com=4"
+    HTTP_CONNECT_TIMEOUT        Timeout de conexão em segundos (padrão: 3.05)
+    HTTP_POOL_ASYNC_MAX_CONEXOES  Conexões simultâneas por host nos clientes
+                                  assíncronos (padrão: 100); as mantidas em
+                                  keep-alive seguem HTTP_POOL_TAMANHO
+
+O timeout informado pelos clientes é o de leitura; o de conexão é separado
+para que um host fora do ar falhe rápido. Ambos são limitados ao prazo da
+requisição HTTP em andamento (ver retry.py).
+
+Chamadas idempotentes (idempotente=True) são repetidas em falhas de conexão
+e HTTP 502/503/504, com backoff exponencial e jitter (ver retry.py).
+
+Uso:
+    from core.services.http_pool import http_request
+
+    response = http_request('GET', url, timeout=20, params={...})
+    response = http_request('GET', url, timeout=20, idempotente=True)
+
+Views assíncronas (ASGI) usam ahttp_request(), com clientes httpx.AsyncClient
+por host e por event loop, seguindo o mesmo dimensionamento e timeouts:
+
+    response = await ahttp_request('GET', url, timeout=20, params={...})
+
+@version 1.2.0
+@date 2026-10-18
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .retry import STATUS_TRANSITORIOS, limitar_ao_prazo, politica_retry, registrar as registrar_retry
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'FEMME-Integra/1.0'
+
+# Falhas de conexão (recusada, resetada, timeout de conexão) repetidas nas
+# chamadas idempotentes; timeouts de leitura não são repetidos
+ERROS_CONEXAO_ASYNC = (httpx.NetworkError, httpx.RemoteProtocolError, httpx.ConnectTimeout)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def _tamanhos_por_host() -> dict:
+    tamanhos = {}
+    for item in os.getenv('HTTP_POOL_TAMANHO_POR_HOST', '').split(','):
+        host, _, tamanho = item.partition('=')
+        if host.strip() and tamanho.strip().isdigit():
+            tamanhos[host.strip().lower()] = int(tamanho)
+    return tamanhos
+
+
+class PoolHTTP:
+    """Sessões keep-alive por host, recriadas após fork do processo."""
+
+    def __init__(self):
+        self.tamanho_padrao = int(os.getenv('HTTP_POOL_TAMANHO', '10'))
+        self.tamanhos_por_host = _tamanhos_por_host()
+        self.connect_timeout = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+        self._sessoes = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def sessao(self, url: str) -> requests.Session:
+        """Retorna a sessão do host da URL, criando-a na primeira chamada."""
+        partes = urlsplit(url)
+        origem = f'{partes.scheme}://{partes.netloc}'.lower()
+
+        if os.getpid() != self._pid:
+            # Processo filho (fork do gunicorn): não herdar sockets do pai
+            self._sessoes = {}
+            self._pid = os.getpid()
+
+        sessao = self._sessoes.get(origem)
+        if sessao is None:
+            with self._lock:
+                sessao = self._sessoes.get(origem)
+                if sessao is None:
+                    sessao = self._criar_sessao(origem, partes.hostname or '')
+                    self._sessoes[origem] = sessao
+        return sessao
+
+    def _criar_sessao(self, origem: str, host: str) -> requests.Session:
+        tamanho = self.tamanhos_por_host.get(host.lower(), self.tamanho_padrao)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho, max_retries=0)
+
+        sessao = requests.Session()
+        sessao.headers['User-Agent'] = USER_AGENT
+        # Sessão compartilhada entre requisições de usuários: não guardar cookies
+        sessao.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        sessao.mount(f'{origem}/', adapter)
+        logger.debug('Sessão HTTP criada para %s (pool %d)', origem, tamanho)
+        return sessao
+
+    def timeout(self, timeout: Optional[Timeout]) -> Optional[Tuple[float, float]]:
+        """Converte o timeout de leitura em (connect, read)."""
+        if timeout is None or isinstance(timeout, tuple):
+            return timeout
+        return (min(self.connect_timeout, timeout), timeout)
+
+    def request(
+        self, method: str, url: str, timeout: Optional[Timeout] = None, idempotente: bool = False, **kwargs
+    ) -> requests.Response:
+        """
+        Equivalente a requests.request() usando a sessão do host.
+
+        Com idempotente=True, falhas de conexão e HTTP 502/503/504 são repetidas
+        conforme a política de retry.py. O timeout de cada tentativa respeita o
+        prazo da requisição em andamento.
+        """
+        sessao = self.sessao(url)
+        host = urlsplit(url).hostname or ''
+        tentativa = 0
+        while True:
+            timeout_tentativa = limitar_ao_prazo(timeout)
+            if timeout_tentativa == 0:
+                raise requests.exceptions.Timeout(f'Prazo da requisição esgotado antes da chamada a {host}')
+            try:
+                response = sessao.request(method.upper(), url, timeout=self.timeout(timeout_tentativa), **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                espera = politica_retry.proxima_espera(tentativa, host, type(e).__name__) if idempotente else None
+                if espera is None:
+                    raise
+            else:
+                if not (idempotente and response.status_code in STATUS_TRANSITORIOS):
+                    if tentativa:
+                        registrar_retry(host, 'recuperadas')
+                    return response
+                espera = politica_retry.proxima_espera(tentativa, host, f'HTTP {response.status_code}')
+                if espera is None:
+                    return response
+                response.close()
+            time.sleep(espera)
+            tentativa += 1
+
+    def fechar(self) -> None:
+        """Fecha todas as sessões do processo."""
+        with self._lock:
+            for sessao in self._sessoes.values():
+                sessao.close()
+            self._sessoes = {}
+
+
+pool = PoolHTTP()
+
+
+def http_request(
+    method: str, url: str, timeout: Optional[Timeout] = None, idempotente: bool = False, **kwargs
+) -> requests.Response:
+    """Atalho para pool.request()."""
+    return pool.request(method, url, timeout=timeout, idempotente=idempotente, **kwargs)
+
+
+class PoolHTTPAsync:
+    """
+    Clientes httpx.AsyncClient por host, um conjunto por event loop.
+
+    Sob o worker ASGI há um único loop por processo, então as conexões são
+    reaproveitadas por todas as requisições em andamento. Conexões de
+    clientes assíncronos não podem ser usadas em outro loop; por isso o
+    registro é indexado pelo loop corrente.
+    """
+
+    def __init__(self, pool_sync: PoolHTTP):
+        self._config = pool_sync
+        self.max_conexoes = int(os.getenv('HTTP_POOL_ASYNC_MAX_CONEXOES', '100'))
+        self._clientes = weakref.WeakKeyDictionary()
+
+    def cliente(self, url: str) -> httpx.AsyncClient:
+        partes = urlsplit(url)
+        origem = f'{partes.scheme}://{partes.netloc}'.lower()
+        clientes = self._clientes.setdefault(asyncio.get_running_loop(), {})
+
+        cliente = clientes.get(origem)
+        if cliente is None:
+            tamanho = self._config.tamanhos_por_host.get((partes.hostname or '').lower(), self._config.tamanho_padrao)
+            cliente = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=max(self.max_conexoes, tamanho),
+                    max_keepalive_connections=tamanho,
+                ),
+            )
+            clientes[origem] = cliente
+            logger.debug('Cliente HTTP assíncrono criado para %s (pool %d)', origem, tamanho)
+        return cliente
+
+    def timeout(self, timeout: Optional[Timeout]) -> httpx.Timeout:
+        if timeout is None:
+            return httpx.Timeout(None)
+        connect, read = self._config.timeout(timeout)
+        return httpx.Timeout(read, connect=connect)
+
+    async def request(
+        self, method: str, url: str, timeout: Optional[Timeout] = None, idempotente: bool = False, **kwargs
+    ) -> httpx.Response:
+        """Equivalente assíncrono de PoolHTTP.request() (retorna httpx.Response)."""
+        cliente = self.cliente(url)
+        host = urlsplit(url).hostname or ''
+        tentativa = 0
+        while True:
+            timeout_tentativa = limitar_ao_prazo(timeout)
+            if timeout_tentativa == 0:
+                raise httpx.TimeoutException(f'Prazo da requisição esgotado antes da chamada a {host}')
+            try:
+                response = await cliente.request(method.upper(), url, timeout=self.timeout(timeout_tentativa), **kwargs)
+            except ERROS_CONEXAO_ASYNC as e:
+                espera = politica_retry.proxima_espera(tentativa, host, type(e).__name__) if idempotente else None
+                if espera is None:
+                    raise
+            else:
+                # Mesmo comportamento das sessões síncronas: não guardar cookies
+                cliente.cookies.clear()
+                if not (idempotente and response.status_code in STATUS_TRANSITORIOS):
+                    if tentativa:
+                        registrar_retry(host, 'recuperadas')
+                    return response
+                espera = politica_retry.proxima_espera(tentativa, host, f'HTTP {response.status_code}')
+                if espera is None:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(espera)
+            tentativa += 1
+
+
+pool_async = PoolHTTPAsync(pool)
+
+
+async def ahttp_request(
+    method: str, url: str, timeout: Optional[Timeout] = None, idempotente: bool = False, **kwargs
+) -> httpx.Response:
+    """Atalho para pool_async.request()."""
+    return await pool_async.request(method, url, timeout=timeout, idempotente=idempotente, **kwargs)
@@ -1,10 +1,143 @@
+"""
+Cliente da API de OCR das requisições digitalizadas, com cache por conteúdo.
+
+O OCR é lento (segundos por página) e nunca roda dentro de uma requisição
+HTTP: quem o chama é o pipeline em segundo plano de operacao/ocr_requisicoes.py.
+Este módulo cuida apenas da API e do cache:
+
+- Documentos são enviados em lotes (OCR_LOTE, padrão 5) em uma chamada
+  POST, repetida em falhas transitórias (ver retry.py): o OCR não tem
+  efeito colateral.
+- O resultado de cada documento fica no cache indexado pelo SHA-256 do
+  conteúdo ('ocr:<sha256>'), por OCR_CACHE_TTL segundos (padrão 30 dias):
+  redigitalizações idênticas e arquivos duplicados não voltam à API.
+  Documentos repetidos no mesmo lote também são enviados uma única vez.
+- O valor guardado contém dados de pacientes e é cifrado com a mesma cifra
+  do cache de CPF (cache_cpf.cifrar()/decifrar()).
+- Falhas (API fora do ar, documento sem resultado) não são guardadas.
+
+Contrato da API (OCR_API_URL, token em OCR_API_TOKEN):
+    POST {"documentos": [{"id": "<sha256>", "tipo": "application/pdf", "conteudo": "<base64>"}]}
+    200  {"<sha256>": {"nome_paciente": ..., "cpf_paciente": ..., "data_nasc_paciente": "AAAA-MM-DD",
+                       "crm": ..., "uf_crm": ..., "nome_medico": ...}}
+
+Uso:
+    from core.services.ocr import get_ocr_client, hash_conteudo
+
+    resultados = get_ocr_client().extrair({hash_conteudo(pdf): pdf})
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import base64
+import hashlib
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+from django.core.cache import cache
+
+from .cache_cpf import cifrar, decifrar
+from .http_pool import http_request
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'ocr:{hash}'
+
+
+def hash_conteudo(conteudo: bytes) -> str:
+    """SHA-256 (hex) do conteúdo do arquivo: chave do cache de OCR."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
 class OCRClient:
-    """Stub para integração futura com OCR externo."""
-
-    def extract_data_from_image(self, file_or_url):
-        """Retorna dados mockados até haver integração real."""
-        # TODO: substituir por chamada real à API de OCR
-        return {
-            "status": "mock",
-            "texto_extraido": "",
-        }
+    """Extração de dados de requisições digitalizadas (PDF) pela API de OCR."""
+
+    def __init__(self):
+        self.url = os.getenv('OCR_API_URL', '')
+        self.token = os.getenv('OCR_API_TOKEN', '')
+        self.timeout = int(os.getenv('OCR_API_TIMEOUT', '60'))
+        self.lote = max(int(os.getenv('OCR_LOTE', '5')), 1)
+        self.ttl = int(os.getenv('OCR_CACHE_TTL', str(30 * 24 * 3600)))
+
+    @property
+    def configurado(self) -> bool:
+        return bool(self.url)
+
+    def extrair(self, documentos: Dict[str, bytes]) -> Dict[str, Optional[dict]]:
+        """
+        Extrai os dados de vários documentos, consultando o cache antes da API.
+
+        Args:
+            documentos: Conteúdo dos arquivos indexado por hash_conteudo()
+
+        Returns:
+            Dados extraídos por hash; None para documentos que falharam
+            (podem ser reenviados depois)
+        """
+        resultados = {}
+        faltas = []
+        for chave in documentos:
+            resultados[chave] = self._obter_cache(chave)
+            if resultados[chave] is None:
+                faltas.append(chave)
+
+        if faltas:
+            logger.info('OCR: %d documento(s) no cache, %d para a API', len(documentos) - len(faltas), len(faltas))
+        for inicio in range(0, len(faltas), self.lote):
+            lote = faltas[inicio:inicio + self.lote]
+            extraidos = self._chamar_api({chave: documentos[chave] for chave in lote})
+            for chave in lote:
+                dados = extraidos.get(chave)
+                resultados[chave] = dados
+                if dados is not None and self.ttl > 0:
+                    cache.set(CACHE_KEY.format(hash=chave), cifrar(dados), self.ttl)
+        return resultados
+
+    def _obter_cache(self, chave: str) -> Optional[dict]:
+        if self.ttl <= 0:
+            return None
+        cifrado = cache.get(CACHE_KEY.format(hash=chave))
+        return decifrar(cifrado) if cifrado is not None else None
+
+    def _chamar_api(self, documentos: Dict[str, bytes]) -> Dict[str, dict]:
+        if not self.configurado:
+            logger.warning('OCR_API_URL não configurada')
+            return {}
+
+        payload = {'documentos': [
+            {'id': chave, 'tipo': 'application/pdf', 'conteudo': base64.b64encode(conteudo).decode()}
+            for chave, conteudo in documentos.items()
+        ]}
+        try:
+            response = http_request(
+                'POST',
+                self.url,
+                json=payload,
+                headers={'Authorization': f'Bearer {self.token}', 'User-Agent': 'FEMME-Integra/1.0'},
+                timeout=self.timeout,
+                idempotente=True,
+            )
+        except Exception as e:
+            logger.error('Erro ao chamar API de OCR (%d documento(s)): %s', len(documentos), str(e))
+            return {}
+
+        if response.status_code != 200:
+            logger.error('API de OCR retornou HTTP %d (%d documento(s))', response.status_code, len(documentos))
+            return {}
+        try:
+            dados = response.json()
+        except ValueError:
+            dados = None
+        if not isinstance(dados, dict):
+            logger.error('API de OCR retornou resposta inválida')
+            return {}
+        return {chave: valor for chave, valor in dados.items() if isinstance(valor, dict)}
+
+
+@lru_cache(maxsize=1)
+def get_ocr_client() -> OCRClient:
+    """Retorna o cliente de OCR do processo (configurado pelas variáveis OCR_*)."""
+    return OCRClient()
@@ -0,0 +1,42 @@
+"""
+Acesso direto ao Redis do cache padrão.
+
+O cache do Django (django-redis) cobre get/set simples. Estruturas como
+sets, contadores atômicos e locks precisam do cliente Redis cru; este módulo
+centraliza a obtenção da conexão e a montagem das chaves com o mesmo
+KEY_PREFIX/versão usados pelo cache.
+
+Todas as funções toleram indisponibilidade do Redis (retornam None), no
+mesmo espírito do IGNORE_EXCEPTIONS configurado em settings.CACHES.
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def get_redis():
+    """
+    Retorna a conexão Redis crua do cache 'default'.
+
+    Returns:
+        Cliente redis.Redis ou None se o backend não for Redis/estiver indisponível
+    """
+    try:
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+    except Exception as e:
+        logger.warning('Conexão Redis indisponível: %s', str(e))
+        return None
+
+
+def make_key(key: str) -> str:
+    """Monta a chave completa (com KEY_PREFIX e versão) usada pelo cache."""
+    return cache.make_key(key)
+
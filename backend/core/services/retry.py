@@ -0,0 +1,160 @@
+"""
+Novas tentativas com backoff exponencial para chamadas externas idempotentes.
+
+Falhas transitórias (conexão recusada ou resetada, HTTP 502/503/504) chegavam
+direto ao operador. As chamadas marcadas como idempotentes
+(http_request(..., idempotente=True): consultas GET, busca de médico,
+geração de token) passam a ser repetidas:
+
+- Até RETRY_TENTATIVAS tentativas no total (padrão 3), com espera aleatória
+  entre 0 e min(RETRY_BACKOFF_MAXIMO, RETRY_BACKOFF_BASE * 2^n) segundos
+  ("full jitter"), para que workers não repitam todos ao mesmo tempo.
+- Timeouts de leitura não são repetidos: a API está lenta e repetir apenas
+  aumentaria a carga (e o tempo de espera do operador).
+- Prazo por requisição: PrazoRequisicaoMiddleware define o prazo total da
+  requisição HTTP (settings.PRAZO_REQUISICAO, derivado do timeout do
+  gunicorn). O timeout de cada tentativa é limitado ao tempo restante e uma
+  nova tentativa só é feita se couberem a espera e RETRY_TEMPO_MINIMO
+  segundos de chamada. Sem prazo (comandos, shell) vale só o limite de
+  tentativas.
+- Métricas por host no Redis (novas_tentativas, recuperadas, esgotadas,
+  cortadas_prazo), expostas em /monitoramento/integracoes/.
+
+O prazo é um ContextVar: vale para a thread da requisição e para tarefas
+asyncio criadas nela. Pools de threads precisam copiar o contexto
+(contextvars.copy_context().run).
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar, Token
+from typing import Optional, Tuple, Union
+
+from .redis_client import get_redis, make_key
+
+logger = logging.getLogger(__name__)
+
+METRICAS_KEY = 'retry:metricas'
+STATUS_TRANSITORIOS = frozenset({502, 503, 504})
+EVENTOS = ('novas_tentativas', 'recuperadas', 'esgotadas', 'cortadas_prazo')
+
+Timeout = Union[float, Tuple[float, float]]
+
+# Instante (time.monotonic()) limite da requisição HTTP em andamento
+prazo_requisicao: ContextVar[Optional[float]] = ContextVar('prazo_requisicao', default=None)
+
+
+def definir_prazo(segundos: float) -> Token:
+    """Define o prazo da requisição atual (retorna o token para limpar_prazo())."""
+    return prazo_requisicao.set(time.monotonic() + segundos)
+
+
+def limpar_prazo(token: Token) -> None:
+    prazo_requisicao.reset(token)
+
+
+def tempo_restante() -> Optional[float]:
+    """Segundos até o prazo da requisição (None = sem prazo)."""
+    prazo = prazo_requisicao.get()
+    if prazo is None:
+        return None
+    return prazo - time.monotonic()
+
+
+def limitar_ao_prazo(timeout: Optional[Timeout]) -> Optional[Timeout]:
+    """
+    Limita o timeout de uma tentativa ao tempo restante da requisição.
+
+    Returns:
+        Timeout ajustado; 0 se o prazo já esgotou
+    """
+    restante = tempo_restante()
+    if restante is None:
+        return timeout
+    if restante <= 0:
+        return 0
+    if timeout is None:
+        return restante
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return (min(connect, restante), min(read, restante))
+    return min(timeout, restante)
+
+
+class PoliticaRetry:
+    """Limite de tentativas e backoff exponencial com jitter."""
+
+    def __init__(self):
+        self.tentativas = max(int(os.getenv('RETRY_TENTATIVAS', '3')), 1)
+        self.backoff_base = float(os.getenv('RETRY_BACKOFF_BASE', '0.2'))
+        self.backoff_maximo = float(os.getenv('RETRY_BACKOFF_MAXIMO', '2'))
+        self.tempo_minimo = float(os.getenv('RETRY_TEMPO_MINIMO', '1'))
+
+    def espera(self, tentativa: int) -> float:
+        """Espera antes da tentativa seguinte à de número `tentativa` (0 = primeira)."""
+        return random.uniform(0, min(self.backoff_maximo, self.backoff_base * (2 ** tentativa)))
+
+    def proxima_espera(self, tentativa: int, host: str, motivo: str) -> Optional[float]:
+        """
+        Decide se haverá nova tentativa após uma falha transitória.
+
+        Args:
+            tentativa: Número da tentativa que falhou (0 = primeira)
+            host: Host chamado (para métricas e log)
+            motivo: Descrição da falha (para log)
+
+        Returns:
+            Segundos a aguardar antes de repetir, ou None para desistir
+        """
+        if tentativa + 1 >= self.tentativas:
+            registrar(host, 'esgotadas')
+            logger.warning('Chamada a %s falhou após %d tentativa(s): %s', host, tentativa + 1, motivo)
+            return None
+
+        espera = self.espera(tentativa)
+        restante = tempo_restante()
+        if restante is not None and restante < espera + self.tempo_minimo:
+            registrar(host, 'cortadas_prazo')
+            logger.warning('Chamada a %s sem nova tentativa (prazo da requisição): %s', host, motivo)
+            return None
+
+        registrar(host, 'novas_tentativas')
+        logger.info('Chamada a %s: %s; nova tentativa em %.2fs', host, motivo, espera)
+        return espera
+
+
+politica_retry = PoliticaRetry()
+
+
+def registrar(host: str, evento: str) -> None:
+    """Incrementa o contador de um evento de retry do host."""
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        redis.hincrby(make_key(METRICAS_KEY), f'{host}:{evento}', 1)
+    except Exception as e:
+        logger.debug('Métricas de retry indisponíveis: %s', str(e))
+
+
+def estatisticas_retry() -> dict:
+    """Contadores de retry por host (para monitoramento)."""
+    metricas = {}
+    redis = get_redis()
+    if redis is None:
+        return metricas
+    try:
+        valores = redis.hgetall(make_key(METRICAS_KEY))
+    except Exception as e:
+        logger.debug('Métricas de retry indisponíveis: %s', str(e))
+        return metricas
+
+    for campo, valor in valores.items():
+        host, _, evento = campo.decode().rpartition(':')
+        metricas.setdefault(host, dict.fromkeys(EVENTOS, 0))[evento] = int(valor)
+    return metricas
@@ -1,7 +1,222 @@
+"""
+Cliente S3 para uploads feitos pelo servidor (PDFs de protocolo, arquivos
+regenerados, exportações).
+
+Os uploads do scanner vão direto do navegador ao S3 por URL pré-assinada
+(API Lambda); este cliente cobre os arquivos gerados no próprio backend:
+
+- Arquivos de até uma parte (AWS_S3_TAMANHO_PARTE_MB, padrão 8 MB) vão em
+  um único PutObject.
+- Arquivos maiores são enviados em multipart, lendo o arquivo em partes de
+  tamanho fixo. As partes sobem em paralelo em um pool de threads por
+  processo (AWS_S3_THREADS, padrão 4), e a leitura só avança quando uma
+  parte termina: cada upload mantém no máximo AWS_S3_THREADS + 2 partes
+  em memória (~48 MB no padrão), qualquer que seja o tamanho do arquivo.
+- Se uma parte falha, o upload multipart é abortado (sem partes órfãs
+  cobradas no bucket) e o erro do boto3 é propagado.
+- Um cliente boto3 por processo (thread-safe), com pool de conexões
+  (AWS_S3_MAX_CONEXOES, padrão 10) e retry padrão do botocore.
+
+Configuração:
+    AWS_S3_BUCKET          Bucket de destino
+    AWS_S3_ENDPOINT_URL    Endpoint compatível com S3 (MinIO, LocalStack ou
+                           `manage.py simular_apis`, bucket "s3"); vazio = AWS
+    AWS_DEFAULT_REGION     Região (padrão: us-east-1)
+    Credenciais pela cadeia padrão do boto3 (AWS_ACCESS_KEY_ID/
+    AWS_SECRET_ACCESS_KEY, perfil ou IAM role).
+
+A URL pública retornada é a do CloudFront (core.config.get_file_url), a
+mesma gravada pelos uploads do scanner.
+
+Uso:
+    from core.services.s3 import get_s3_client
+
+    with open(caminho_pdf, 'rb') as arquivo:
+        url = get_s3_client().enviar(arquivo, f'protocolos/{protocolo.id}/protocolo.pdf')
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import BinaryIO, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from core.config import get_file_url
+
+logger = logging.getLogger(__name__)
+
+# O S3 exige partes de pelo menos 5 MB (exceto a última)
+TAMANHO_MINIMO_PARTE = 5 * 1024 * 1024
+
+_executor_partes = ThreadPoolExecutor(
+    max_workers=int(os.getenv('AWS_S3_THREADS', '4')),
+    thread_name_prefix='s3-partes',
+)
+
+
+def _ler_parte(arquivo: BinaryIO, tamanho: int) -> bytes:
+    """Lê exatamente `tamanho` bytes (menos apenas no fim do arquivo)."""
+    bloco = arquivo.read(tamanho)
+    if len(bloco) in (0, tamanho):
+        return bloco
+    partes = [bloco]
+    lidos = len(bloco)
+    while lidos < tamanho:
+        bloco = arquivo.read(tamanho - lidos)
+        if not bloco:
+            break
+        partes.append(bloco)
+        lidos += len(bloco)
+    return b''.join(partes)
+
+
 class S3Client:
-    """Stub para integrações com S3."""
+    """Upload de arquivos ao S3 com multipart em paralelo e memória limitada."""
+
+    def __init__(
+        self,
+        bucket: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        tamanho_parte: Optional[int] = None,
+        threads: Optional[int] = None,
+        **opcoes_boto3
+    ):
+        """
+        Args:
+            bucket: Bucket de destino (padrão: AWS_S3_BUCKET)
+            endpoint_url: Endpoint compatível com S3 (padrão: AWS_S3_ENDPOINT_URL)
+            tamanho_parte: Bytes por parte do multipart (padrão: AWS_S3_TAMANHO_PARTE_MB)
+            threads: Partes simultâneas por upload (padrão: AWS_S3_THREADS)
+            opcoes_boto3: Repassadas a boto3.client() (ex: credenciais em testes)
+        """
+        self.bucket = bucket or os.getenv('AWS_S3_BUCKET', '')
+        endpoint_url = endpoint_url or os.getenv('AWS_S3_ENDPOINT_URL') or None
+        self.tamanho_parte = tamanho_parte or int(float(os.getenv('AWS_S3_TAMANHO_PARTE_MB', '8')) * 1024 * 1024)
+        self.threads = threads or int(os.getenv('AWS_S3_THREADS', '4'))
+
+        if self.tamanho_parte < TAMANHO_MINIMO_PARTE and not endpoint_url:
+            logger.warning('AWS_S3_TAMANHO_PARTE_MB abaixo do mínimo do S3; usando 5 MB')
+            self.tamanho_parte = TAMANHO_MINIMO_PARTE
+
+        self._client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1'),
+            config=Config(
+                max_pool_connections=int(os.getenv('AWS_S3_MAX_CONEXOES', '10')),
+                connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05')),
+                read_timeout=int(os.getenv('AWS_S3_TIMEOUT', '60')),
+                retries={'mode': 'standard', 'max_attempts': 3},
+                # Endpoints compatíveis (MinIO, stand-in local) usam bucket no caminho
+                s3={'addressing_style': 'path' if endpoint_url else 'auto'},
+                # Checksum só quando a operação exige (compatível com MinIO e stand-ins)
+                request_checksum_calculation='when_required',
+                response_checksum_validation='when_required',
+            ),
+            **opcoes_boto3
+        )
+
+    def enviar(self, arquivo: BinaryIO, chave: str, content_type: str = 'application/pdf') -> str:
+        """
+        Envia um arquivo ao bucket sem carregá-lo inteiro em memória.
+
+        Args:
+            arquivo: Objeto binário aberto para leitura (arquivo, BytesIO, stream)
+            chave: Chave do objeto no bucket
+            content_type: Tipo MIME gravado no objeto
+
+        Returns:
+            URL pública do arquivo (CloudFront)
+
+        Raises:
+            botocore.exceptions.BotoCoreError/ClientError em falha do upload
+        """
+        primeira = _ler_parte(arquivo, self.tamanho_parte)
+        if len(primeira) < self.tamanho_parte:
+            self._client.put_object(Bucket=self.bucket, Key=chave, Body=primeira, ContentType=content_type)
+            logger.info('Arquivo enviado ao S3: %s (%d bytes)', chave, len(primeira))
+        else:
+            partes, total = self._enviar_multipart(arquivo, chave, content_type, primeira)
+            logger.info('Arquivo enviado ao S3 em %d partes: %s (%d bytes)', partes, chave, total)
+        return get_file_url(chave)
+
+    def _enviar_multipart(self, arquivo: BinaryIO, chave: str, content_type: str, primeira: bytes):
+        upload_id = self._client.create_multipart_upload(
+            Bucket=self.bucket, Key=chave, ContentType=content_type
+        )['UploadId']
+        # Limita as partes lidas e ainda não enviadas (memória por upload)
+        vagas = threading.Semaphore(self.threads)
+        futuros = []
+        total = 0
+        try:
+            bloco, numero = primeira, 1
+            while bloco:
+                total += len(bloco)
+                futuro = _executor_partes.submit(self._enviar_parte, chave, upload_id, numero, bloco)
+                futuro.add_done_callback(lambda _: vagas.release())
+                futuros.append(futuro)
+                del bloco  # a referência fica só com a tarefa até a parte ser enviada
+
+                vagas.acquire()
+                falha = next((f.exception() for f in futuros if f.done() and f.exception()), None)
+                if falha:
+                    raise falha
+                bloco, numero = _ler_parte(arquivo, self.tamanho_parte), numero + 1
+
+            partes = [futuro.result() for futuro in futuros]
+            self._client.complete_multipart_upload(
+                Bucket=self.bucket, Key=chave, UploadId=upload_id,
+                MultipartUpload={'Parts': partes},
+            )
+            return len(partes), total
+        except BaseException:
+            for futuro in futuros:
+                futuro.cancel()
+            self._abortar(chave, upload_id)
+            raise
+
+    def _enviar_parte(self, chave: str, upload_id: str, numero: int, bloco: bytes) -> dict:
+        response = self._client.upload_part(
+            Bucket=self.bucket, Key=chave, UploadId=upload_id, PartNumber=numero, Body=bloco
+        )
+        return {'PartNumber': numero, 'ETag': response['ETag']}
+
+    def _abortar(self, chave: str, upload_id: str) -> None:
+        try:
+            self._client.abort_multipart_upload(Bucket=self.bucket, Key=chave, UploadId=upload_id)
+            logger.warning('Upload multipart abortado: %s', chave)
+        except Exception as e:
+            logger.error('Erro ao abortar upload multipart %s: %s', chave, str(e))
+
+    def tamanho(self, chave: str) -> Optional[int]:
+        """Tamanho do objeto em bytes, ou None se não existir."""
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=chave)['ContentLength']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
 
     def upload_requisicao_image(self, file_obj, path: str) -> str:
-        """Futuro: envia arquivo para bucket S3 e retorna URL pública."""
-        # TODO: implementar integração real com boto3
-        return f"https://s3.mock/{path}"
+        """Envia arquivo de requisição e retorna a URL pública (compatível com o stub anterior)."""
+        return self.enviar(file_obj, path, content_type=getattr(file_obj, 'content_type', None) or 'application/pdf')
+
+
+@lru_cache(maxsize=1)
+def get_s3_client() -> S3Client:
+    """
+    Retorna o cliente S3 do processo (o cliente boto3 é thread-safe e
+    mantém o pool de conexões).
+
+    Returns:
+        S3Client configurado pelas variáveis AWS_S3_*
+    """
+    return S3Client()
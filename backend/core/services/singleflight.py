@@ -0,0 +1,186 @@
+"""
+Coalescência de consultas idênticas e simultâneas a APIs externas.
+
+Quando várias estações de triagem consultam o mesmo médico ou paciente ao
+mesmo tempo, cada uma disparava sua própria requisição à Korus/FEMME/Receita.
+Com o singleflight, apenas uma chamada sai por chave:
+
+- A chave é a consulta normalizada, com os dados identificadores trocados
+  por um HMAC (ex: 'korus:cpf:<hmac>'), para que CPFs não apareçam no Redis.
+- Quem obtém o lock ('singleflight:<chave>:lock') executa a consulta e
+  publica o resultado, cifrado (ver cache_cpf.cifrar()), em
+  'singleflight:<chave>:resultado' por SINGLEFLIGHT_TTL_RESULTADO segundos.
+- Os demais aguardam o resultado (até SINGLEFLIGHT_ESPERA_MAXIMA segundos)
+  e o reaproveitam. Se o lock sumir sem resultado (falha do executor) ou o
+  prazo esgotar, consultam por conta própria.
+- Um resultado publicado também atende quem chegar logo depois do fim da
+  chamada (dentro do TTL), evitando uma segunda rodada.
+- Com o Redis indisponível, cada chamada consulta diretamente.
+
+Uso:
+    from core.services.singleflight import chave_consulta, singleflight
+
+    response = singleflight.executar(
+        chave_consulta('korus:cpf', cpf),
+        lambda: client._consultar(cpf),
+    )
+
+    response = await singleflight.aexecutar(chave, lambda: client._aconsultar(cpf))
+
+@version 1.1.0
+@date 2026-10-18
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+from dataclasses import asdict
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'singleflight:{chave}'
+INTERVALO_ESPERA = 0.05
+
+
+def chave_consulta(prefixo: str, *partes: str) -> str:
+    """
+    Monta a chave de uma consulta: '<prefixo>:<hmac das partes normalizadas>'.
+
+    Args:
+        prefixo: API e tipo de consulta (ex: 'korus:cpf', 'femme:medico')
+        partes: Valores já normalizados que identificam a consulta
+    """
+    valor = ':'.join(partes).encode()
+    digest = hmac.new(settings.SECRET_KEY.encode(), valor, hashlib.sha256).hexdigest()
+    return f'{prefixo}:{digest}'
+
+
+class SingleFlight:
+    """Uma chamada externa por chave, com o resultado repassado aos concorrentes."""
+
+    def __init__(self):
+        self.ttl_resultado = int(os.getenv('SINGLEFLIGHT_TTL_RESULTADO', '5'))
+        self.espera_maxima = float(os.getenv('SINGLEFLIGHT_ESPERA_MAXIMA', '25'))
+        self.lock_timeout = int(os.getenv('SINGLEFLIGHT_LOCK_TIMEOUT', '30'))
+
+    def _chaves(self, chave: str):
+        base = CACHE_KEY.format(chave=chave)
+        return f'{base}:lock', f'{base}:resultado'
+
+    def executar(self, chave: str, consultar: Callable):
+        """
+        Executa consultar() uma única vez entre chamadas simultâneas com a mesma chave.
+
+        Args:
+            chave: Chave da consulta (ver chave_consulta())
+            consultar: Função que chama a API e retorna APIResponse
+
+        Returns:
+            APIResponse da consulta (própria ou de outro worker)
+        """
+        chave_lock, chave_resultado = self._chaves(chave)
+
+        response, dono = self._iniciar(chave_lock, chave_resultado)
+        if response is not None:
+            return response
+
+        if dono:
+            try:
+                response = consultar()
+            except Exception:
+                cache.delete(chave_lock)
+                raise
+            return self._publicar(chave_lock, chave_resultado, response)
+
+        limite = time.monotonic() + self.espera_maxima
+        while time.monotonic() < limite:
+            response = self._resultado(chave_resultado)
+            if response is not None:
+                logger.debug('Singleflight %s: resultado reaproveitado', chave)
+                return response
+            if cache.get(chave_lock) is None:
+                break
+            time.sleep(INTERVALO_ESPERA)
+
+        response = self._resultado(chave_resultado)
+        if response is not None:
+            return response
+        logger.debug('Singleflight %s: consulta executada sem coalescência', chave)
+        return consultar()
+
+    async def aexecutar(self, chave: str, consultar: Callable[[], Awaitable]):
+        """
+        Versão assíncrona de executar() (consultar retorna uma corrotina).
+
+        O Redis é acessado fora do event loop (API assíncrona do cache e
+        sync_to_async): um Redis lento não trava as demais consultas.
+        """
+        chave_lock, chave_resultado = self._chaves(chave)
+
+        response, dono = await sync_to_async(self._iniciar)(chave_lock, chave_resultado)
+        if response is not None:
+            return response
+
+        if dono:
+            try:
+                response = await consultar()
+            except BaseException:
+                # Inclui cancelamento da tarefa (prazo da view esgotado)
+                await cache.adelete(chave_lock)
+                raise
+            return await sync_to_async(self._publicar)(chave_lock, chave_resultado, response)
+
+        limite = time.monotonic() + self.espera_maxima
+        while time.monotonic() < limite:
+            response = await sync_to_async(self._resultado)(chave_resultado)
+            if response is not None:
+                logger.debug('Singleflight %s: resultado reaproveitado', chave)
+                return response
+            if await cache.aget(chave_lock) is None:
+                break
+            await asyncio.sleep(INTERVALO_ESPERA)
+
+        response = await sync_to_async(self._resultado)(chave_resultado)
+        if response is not None:
+            return response
+        logger.debug('Singleflight %s: consulta executada sem coalescência', chave)
+        return await consultar()
+
+    def _iniciar(self, chave_lock: str, chave_resultado: str):
+        """Resultado de uma chamada que acabou de terminar ou, sem ele, a tentativa de obter o lock."""
+        response = self._resultado(chave_resultado)
+        if response is not None:
+            return response, False
+        return None, cache.add(chave_lock, 1, self.lock_timeout)
+
+    def _publicar(self, chave_lock: str, chave_resultado: str, response):
+        # Publicar antes de liberar o lock: quem aguarda vê o resultado ou o lock
+        from .cache_cpf import cifrar
+
+        try:
+            cache.set(chave_resultado, cifrar(asdict(response)), self.ttl_resultado)
+        finally:
+            cache.delete(chave_lock)
+        return response
+
+    @staticmethod
+    def _resultado(chave_resultado: str):
+        from .cache_cpf import decifrar
+        from .external_api import APIResponse
+
+        cifrado = cache.get(chave_resultado)
+        dados = decifrar(cifrado) if cifrado is not None else None
+        if dados is None:
+            return None
+        return APIResponse(**dados)
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,183 @@
+"""
+Cache compartilhado de tokens de autenticação de APIs externas.
+
+Os clientes (Korus, FEMME) são instanciados a cada requisição; sem cache,
+toda consulta precisava autenticar antes da chamada real. O token passa a
+ser guardado no Redis junto com sua expiração e reutilizado por todos os
+workers:
+
+- Cada processo mantém uma cópia local para evitar ida ao Redis.
+- Perto da expiração (RENOVACAO_ANTECIPADA segundos), apenas o worker que
+  obtiver o lock de renovação autentica novamente; os demais continuam
+  usando o token vigente.
+- Sem token válido, apenas o dono do lock autentica; os demais aguardam
+  até ESPERA_MAXIMA segundos pelo novo token.
+- Um HTTP 401 invalida o token (invalidar()) e o cliente autentica de novo.
+- Com o Redis indisponível, cada processo usa apenas a cópia local.
+
+Clientes assíncronos (views ASGI) usam aobter() com um gerador assíncrono;
+o cache e o lock são os mesmos, acessados fora do event loop.
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'tokens_api:{nome}'
+LOCK_TIMEOUT = 30
+ESPERA_MAXIMA = 5.0
+RENOVACAO_ANTECIPADA = 60
+
+# Gerador de token: retorna (token, validade_em_segundos) ou None em caso de falha
+GeradorToken = Callable[[], Optional[Tuple[str, int]]]
+GeradorTokenAsync = Callable[[], Awaitable[Optional[Tuple[str, int]]]]
+
+
+class TokenCompartilhado:
+    """Token de uma API externa compartilhado entre workers via Redis."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._chave = CACHE_KEY.format(nome=nome)
+        self._chave_lock = f'{self._chave}:lock'
+        self._local: Optional[dict] = None
+        self._lock_local = threading.Lock()
+
+    def obter(self, gerar: GeradorToken) -> Optional[str]:
+        """
+        Retorna um token válido, autenticando somente quando necessário.
+
+        Args:
+            gerar: Função que autentica na API e retorna (token, validade)
+
+        Returns:
+            Token ou None se a autenticação falhar
+        """
+        agora = time.time()
+        entrada = self._local
+        if entrada and agora < entrada['expira_em'] - RENOVACAO_ANTECIPADA:
+            return entrada['token']
+
+        entrada = cache.get(self._chave)
+        if entrada and agora < entrada['expira_em']:
+            self._local = entrada
+            if agora < entrada['expira_em'] - RENOVACAO_ANTECIPADA:
+                return entrada['token']
+            # Renovação antecipada: um único worker renova, os demais seguem com o atual
+            if cache.add(self._chave_lock, 1, LOCK_TIMEOUT):
+                return self._renovar(gerar) or entrada['token']
+            return entrada['token']
+
+        if cache.add(self._chave_lock, 1, LOCK_TIMEOUT):
+            return self._renovar(gerar)
+
+        # Outro worker está autenticando: aguardar enquanto o lock existir
+        limite = time.monotonic() + ESPERA_MAXIMA
+        while time.monotonic() < limite and cache.get(self._chave_lock) is not None:
+            time.sleep(0.05)
+            entrada = cache.get(self._chave)
+            if entrada and time.time() < entrada['expira_em']:
+                self._local = entrada
+                return entrada['token']
+
+        # Redis indisponível ou renovação do outro worker falhou
+        with self._lock_local:
+            entrada = self._local
+            if entrada and time.time() < entrada['expira_em'] - RENOVACAO_ANTECIPADA:
+                return entrada['token']
+            return self._renovar(gerar, liberar_lock=False)
+
+    async def aobter(self, gerar: GeradorTokenAsync) -> Optional[str]:
+        """
+        Versão assíncrona de obter(): nem a espera pelo lock nem o acesso ao
+        Redis (API assíncrona do cache) bloqueiam o event loop.
+        """
+        agora = time.time()
+        entrada = self._local
+        if entrada and agora < entrada['expira_em'] - RENOVACAO_ANTECIPADA:
+            return entrada['token']
+
+        entrada = await cache.aget(self._chave)
+        if entrada and agora < entrada['expira_em']:
+            self._local = entrada
+            if agora < entrada['expira_em'] - RENOVACAO_ANTECIPADA:
+                return entrada['token']
+            if await cache.aadd(self._chave_lock, 1, LOCK_TIMEOUT):
+                return await self._arenovar(gerar) or entrada['token']
+            return entrada['token']
+
+        if await cache.aadd(self._chave_lock, 1, LOCK_TIMEOUT):
+            return await self._arenovar(gerar)
+
+        limite = time.monotonic() + ESPERA_MAXIMA
+        while time.monotonic() < limite and await cache.aget(self._chave_lock) is not None:
+            await asyncio.sleep(0.05)
+            entrada = await cache.aget(self._chave)
+            if entrada and time.time() < entrada['expira_em']:
+                self._local = entrada
+                return entrada['token']
+
+        entrada = self._local
+        if entrada and time.time() < entrada['expira_em'] - RENOVACAO_ANTECIPADA:
+            return entrada['token']
+        return await self._arenovar(gerar, liberar_lock=False)
+
+    def _renovar(self, gerar: GeradorToken, liberar_lock: bool = True) -> Optional[str]:
+        try:
+            return self._guardar(gerar())
+        finally:
+            if liberar_lock:
+                cache.delete(self._chave_lock)
+
+    async def _arenovar(self, gerar: GeradorTokenAsync, liberar_lock: bool = True) -> Optional[str]:
+        try:
+            resultado = await gerar()
+            return await sync_to_async(self._guardar)(resultado)
+        finally:
+            if liberar_lock:
+                await cache.adelete(self._chave_lock)
+
+    def _guardar(self, resultado: Optional[Tuple[str, int]]) -> Optional[str]:
+        if not resultado:
+            return None
+
+        token, validade = resultado
+        entrada = {'token': token, 'expira_em': time.time() + validade}
+        self._local = entrada
+        cache.set(self._chave, entrada, validade)
+        logger.info('Token %s renovado (validade %ss)', self.nome, validade)
+        return token
+
+    def invalidar(self, token: str) -> None:
+        """
+        Descarta o token rejeitado pela API (HTTP 401).
+
+        Só remove a entrada do Redis se ela ainda contiver o mesmo token,
+        evitando descartar um token que outro worker acabou de renovar.
+        """
+        if self._local and self._local['token'] == token:
+            self._local = None
+
+        entrada = cache.get(self._chave)
+        if entrada and entrada['token'] == token:
+            cache.delete(self._chave)
+            logger.info('Token %s invalidado após rejeição da API', self.nome)
+
+    def limpar(self) -> None:
+        """Remove o token do processo e do Redis."""
+        self._local = None
+        cache.delete(self._chave)
+
+
+token_korus = TokenCompartilhado('korus')
+token_femme = TokenCompartilhado('femme')
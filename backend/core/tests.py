@@ -1,3 +1,232 @@
-from django.test import TestCase
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .management.commands.simular_apis import Comportamento, ServidorSimulado
+from .services.cache_cpf import CacheCPF
+from .services.external_api import APIResponse, FemmeAPIClient, ReceitaAPIClient, circuit_breakers
+from .services.http_pool import http_request
+from .services.retry import definir_prazo, limpar_prazo, politica_retry
+from .services.s3 import S3Client
+from .services.singleflight import singleflight
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SingleFlightTests(TestCase):
+    """Consultas idênticas simultâneas geram uma única chamada externa."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_chamadas_simultaneas_executam_uma_consulta(self):
+        chamadas = []
+
+        def consultar():
+            chamadas.append(1)
+            time.sleep(0.2)
+            return APIResponse(success=True, data={'nome': 'MARIA'}, status_code=200)
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            respostas = list(executor.map(lambda _: singleflight.executar('teste:cpf:1', consultar), range(5)))
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertTrue(all(r.success and r.data == {'nome': 'MARIA'} for r in respostas))
+
+    def test_falha_do_executor_libera_a_chave(self):
+        def falhar():
+            raise RuntimeError('falha')
+
+        with self.assertRaises(RuntimeError):
+            singleflight.executar('teste:cpf:2', falhar)
+
+        response = singleflight.executar('teste:cpf:2', lambda: APIResponse(success=True))
+        self.assertTrue(response.success)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheCPFTests(TestCase):
+    """Cache cifrado de consultas de CPF."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_resultado_cifrado_e_reaproveitado(self):
+        chamadas = []
+
+        def consultar():
+            chamadas.append(1)
+            return APIResponse(success=True, data={'nome': 'MARIA', 'cpf': '12345678900'}, status_code=200)
+
+        cache_cpf = CacheCPF('teste')
+        primeira = cache_cpf.consultar('12345678900', consultar)
+        segunda = cache_cpf.consultar('12345678900', consultar)
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(segunda.data, primeira.data)
+        chave = cache_cpf._chave('12345678900')
+        self.assertNotIn('12345678900', chave)
+        self.assertNotIn(b'MARIA', cache.get(chave))
+
+    def test_falha_transitoria_nao_guardada(self):
+        chamadas = []
+
+        def consultar():
+            chamadas.append(1)
+            return APIResponse(success=False, error='Tempo limite excedido ao acessar a API externa.')
+
+        cache_cpf = CacheCPF('teste')
+        cache_cpf.consultar('12345678900', consultar)
+        cache_cpf.consultar('12345678900', consultar)
+        self.assertEqual(len(chamadas), 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RetryTests(TestCase):
+    """Novas tentativas de chamadas externas idempotentes."""
+
+    def _servidor(self, status):
+        respostas = list(status)
+        chamadas = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                chamadas.append(self.path)
+                self.send_response(respostas.pop(0) if len(respostas) > 1 else respostas[0])
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        self.addCleanup(servidor.shutdown)
+        return f'http://127.0.0.1:{servidor.server_port}/', chamadas
+
+    def test_http_503_repetido_apenas_se_idempotente(self):
+        url, chamadas = self._servidor([503, 200])
+        self.assertEqual(http_request('GET', url, timeout=2, idempotente=True).status_code, 200)
+        self.assertEqual(len(chamadas), 2)
+
+        url, chamadas = self._servidor([503, 200])
+        self.assertEqual(http_request('GET', url, timeout=2).status_code, 503)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_sem_nova_tentativa_apos_o_prazo(self):
+        url, chamadas = self._servidor([503])
+        token = definir_prazo(politica_retry.tempo_minimo / 2)
+        try:
+            self.assertEqual(http_request('GET', url, timeout=2, idempotente=True).status_code, 503)
+        finally:
+            limpar_prazo(token)
+        self.assertEqual(len(chamadas), 1)
+
+
+def servidor_simulado(testcase, **comportamentos):
+    """Sobe o servidor do comando simular_apis durante um teste."""
+    servidor = ServidorSimulado(('127.0.0.1', 0), comportamentos, semente=1)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    testcase.addCleanup(servidor.server_close)
+    testcase.addCleanup(servidor.shutdown)
+    return servidor
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SimularApisTests(TestCase):
+    """Servidor local das APIs externas (comando simular_apis)."""
+
+    def setUp(self):
+        cache.clear()
+
+    def _femme(self, servidor):
+        femme = FemmeAPIClient()
+        femme.base_url = f'{servidor.url_base}/femme'
+        femme.client_id = femme.client_secret = 'simulado'
+        return femme
+
+    def test_femme_responde_com_dados_deterministicos(self):
+        servidor = servidor_simulado(self, femme=Comportamento(latencia=0, variacao=0, taxa_nao_encontrado=0))
+        femme = self._femme(servidor)
+
+        primeira = femme.buscar_medico('123456', 'sp')
+        self.assertTrue(primeira.success, primeira.error)
+        self.assertEqual(primeira.data[0]['uf_crm'], 'SP')
+        self.assertEqual(femme.buscar_medico('123456', 'SP').data, primeira.data)
+        self.assertEqual(set(servidor.estatisticas()['femme']), {'200'})
+
+    def test_falhas_injetadas(self):
+        servidor = servidor_simulado(
+            self,
+            receita=Comportamento(latencia=0, variacao=0, taxa_erro=1),
+            femme=Comportamento(latencia=0, variacao=0, taxa_reset=1),
+        )
+        receita = ReceitaAPIClient()
+        receita.base_url, receita.token = f'{servidor.url_base}/receita/', 'simulado'
+        femme = self._femme(servidor)
+
+        self.assertEqual(receita.buscar_cpf('52998224725').status_code, 503)
+        self.assertFalse(femme.buscar_medico('123456', 'SP').success)
+        estatisticas = servidor.estatisticas()
+        self.assertEqual(estatisticas['receita'], {'503': politica_retry.tentativas})
+        self.assertEqual(estatisticas['femme'], {'reset': politica_retry.tentativas})
+
+
+class S3ClientTests(TestCase):
+    """Upload pelo servidor: PutObject e multipart em paralelo (bucket do simular_apis)."""
+
+    def test_envio_simples_e_multipart(self):
+        servidor = servidor_simulado(self, s3=Comportamento(latencia=0, variacao=0))
+        cliente = S3Client(
+            bucket='s3', endpoint_url=servidor.url_base, tamanho_parte=64 * 1024, threads=2,
+            aws_access_key_id='simulado', aws_secret_access_key='simulado',
+        )
+
+        cliente.enviar(io.BytesIO(b'%PDF-1.4 pequeno'), 'protocolos/1/pequeno.pdf')
+        # 5 partes cheias + uma parcial
+        cliente.enviar(io.BytesIO(b'x' * (5 * 64 * 1024 + 100)), 'protocolos/1/grande.pdf')
+
+        self.assertEqual(cliente.tamanho('protocolos/1/pequeno.pdf'), 16)
+        self.assertEqual(cliente.tamanho('protocolos/1/grande.pdf'), 5 * 64 * 1024 + 100)
+        self.assertIsNone(cliente.tamanho('protocolos/1/inexistente.pdf'))
+        self.assertEqual(servidor.multipart, {})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CircuitBreakerConsultasTests(TestCase):
+    """O circuit breaker só é consultado na chamada real, depois do cache e do singleflight."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cpf_em_cache_atendido_com_circuito_aberto(self):
+        servidor = servidor_simulado(self, receita=Comportamento(latencia=0, variacao=0, taxa_nao_encontrado=0))
+        receita = ReceitaAPIClient()
+        receita.base_url, receita.token = f'{servidor.url_base}/receita/', 'simulado'
+        primeira = receita.buscar_cpf('52998224725')
+        self.assertTrue(primeira.success, primeira.error)
+
+        with mock.patch.object(circuit_breakers['receita'], 'permitir', return_value=False) as permitir:
+            self.assertEqual(receita.buscar_cpf('52998224725').data, primeira.data)
+            # Acerto no cache não ocupa a chamada de teste do meio-aberto
+            permitir.assert_not_called()
+            self.assertTrue(receita.buscar_cpf('11144477735').degradado)
+        self.assertEqual(servidor.estatisticas()['receita'], {'200': 1})
+
+    def test_resultado_do_singleflight_nao_ocupa_a_sonda(self):
+        servidor = servidor_simulado(self, femme=Comportamento(latencia=0, variacao=0, taxa_nao_encontrado=0))
+        femme = FemmeAPIClient()
+        femme.base_url = f'{servidor.url_base}/femme'
+        femme.client_id = femme.client_secret = 'simulado'
+        primeira = femme.buscar_medico('123456', 'SP')
+        self.assertTrue(primeira.success, primeira.error)
+
+        # Resultado publicado por outro worker (SINGLEFLIGHT_TTL_RESULTADO)
+        with mock.patch.object(circuit_breakers['femme'], 'permitir', return_value=False) as permitir:
+            self.assertEqual(femme.buscar_medico('123456', 'SP').data, primeira.data)
+            permitir.assert_not_called()
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from .views import DashboardView, health
+from .views import DashboardView, health, monitoramento_integracoes
 
 app_name = 'core'
 
 urlpatterns = [
     path('', DashboardView.as_view(), name='dashboard'),
     path('health/', health, name='health'),
+    path('monitoramento/integracoes/', monitoramento_integracoes, name='monitoramento-integracoes'),
 ]
@@ -1,8 +1,12 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Count
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.generic import TemplateView
 
+from core.services.cache_cpf import estatisticas_cache_cpf
+from core.services.external_api import estado_circuit_breakers
+from core.services.retry import estatisticas_retry
 from operacao.models import DadosRequisicao, StatusRequisicao, Unidade
 
 
@@ -10,6 +14,17 @@ def health(request):
     return HttpResponse('ok')
 
 
+@staff_member_required
+def monitoramento_integracoes(request):
+    """Estado das integrações externas (circuit breakers, cache de CPF, retries) para monitoramento."""
+    return JsonResponse({
+        'status': 'success',
+        'circuit_breakers': estado_circuit_breakers(),
+        'cache_cpf': estatisticas_cache_cpf(),
+        'retry': estatisticas_retry(),
+    })
+
+
 class DashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'dashboard.html'
     login_url = 'admin:login'
@@ -1,8 +1,11 @@
 """
 Middleware customizado para o projeto Femme Integra.
 """
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
 
+from core.services.retry import definir_prazo, limpar_prazo
+
 
 class DevelopmentCacheMiddleware:
     """
@@ -14,14 +17,27 @@ class DevelopmentCacheMiddleware:
     
     Em produção (DEBUG=False):
     - Não interfere nos headers de cache
+    
+    Funciona nas views síncronas (WSGI) e assíncronas (ASGI).
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
     
     def __call__(self, request):
-        response = self.get_response(request)
-        
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._adicionar_headers(self.get_response(request))
+    
+    async def __acall__(self, request):
+        return self._adicionar_headers(await self.get_response(request))
+    
+    @staticmethod
+    def _adicionar_headers(response):
         # Apenas em desenvolvimento
         if settings.DEBUG:
             # Header específico para Cloudflare fazer bypass do cache
@@ -32,3 +48,39 @@ class DevelopmentCacheMiddleware:
             # WhiteNoise já configurou corretamente com max-age=60
         
         return response
+
+
+class PrazoRequisicaoMiddleware:
+    """
+    Define o prazo total da requisição para as chamadas externas.
+    
+    O gunicorn encerra o worker que passa de `timeout` segundos numa
+    requisição. Com o prazo (settings.PRAZO_REQUISICAO, o timeout do gunicorn
+    menos uma margem), timeouts e novas tentativas das APIs externas são
+    limitados ao tempo que ainda resta (ver core/services/retry.py).
+    
+    Funciona nas views síncronas (WSGI) e assíncronas (ASGI).
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = definir_prazo(settings.PRAZO_REQUISICAO)
+        try:
+            return self.get_response(request)
+        finally:
+            limpar_prazo(token)
+    
+    async def __acall__(self, request):
+        token = definir_prazo(settings.PRAZO_REQUISICAO)
+        try:
+            return await self.get_response(request)
+        finally:
+            limpar_prazo(token)
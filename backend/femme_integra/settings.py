@@ -83,6 +83,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'femme_integra.middleware.PrazoRequisicaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'femme_integra.middleware.DevelopmentCacheMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -112,6 +113,24 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'femme_integra.wsgi.application'
+ASGI_APPLICATION = 'femme_integra.asgi.application'
+
+# Views assíncronas das consultas a APIs externas (operacao/async_views.py).
+# Ativado por padrão em asgi.py; sob WSGI as views síncronas são mantidas.
+ASYNC_VIEWS = os.getenv('DJANGO_ASYNC_VIEWS', 'false').lower() == 'true'
+
+if ASYNC_VIEWS:
+    # O processo ASGI só recebe as consultas (o nginx serve /static/). Sem o
+    # WhiteNoise, que é apenas síncrono, toda a pilha de middlewares roda no
+    # event loop e as views não ocupam uma thread por requisição.
+    MIDDLEWARE = [m for m in MIDDLEWARE if m != 'whitenoise.middleware.WhiteNoiseMiddleware']
+
+# Prazo total (s) de uma requisição para chamadas externas e suas novas
+# tentativas: timeout do gunicorn (deploy/gunicorn_config.py) menos uma margem
+# para montar a resposta (ver PrazoRequisicaoMiddleware).
+PRAZO_REQUISICAO = (
+    float(os.getenv('GUNICORN_TIMEOUT', '30')) - float(os.getenv('PRAZO_REQUISICAO_MARGEM', '3'))
+)
 
 
 # Database
@@ -1,11 +1,15 @@
 from django.contrib import admin, messages
 from django.core.cache import cache
 
+from core.services.cache_consultas import invalidar_medico
+
+from . import diretorio_medicos
 from .models import (
     AmostraMotivoArmazenamentoInadequado,
     EventoTarefa,
     LogAlteracaoAmostra,
     LogRecebimento,
+    Medico,
     MotivoArmazenamentoInadequado,
     MotivoAlteracaoAmostra,
     MotivoPreenchimento,
@@ -30,20 +34,39 @@ from .models import (
     TipoTarefa,
     Unidade,
 )
+from .referencias import registro as registro_referencias
 
 
 # Action global para limpar cache
 @admin.action(description='🔄 Limpar cache (Unidades e Portadores)')
 def limpar_cache_recebimento(modeladmin, request, queryset):
-    """Action para limpar o cache de unidades e portadores."""
-    cache.delete('recebimento:unidades')
-    cache.delete('recebimento:portadores')
+    """
+    Action para forçar a recarga de unidades e portadores.
+    
+    Normalmente desnecessária: salvar/excluir registros já invalida o cache
+    versionado (operacao.referencias). Útil após alterações feitas direto no banco.
+    """
+    for model in (Unidade, PortadorRepresentante, Origem):
+        registro_referencias.invalidar(model)
     messages.success(
         request,
         '✅ Cache limpo com sucesso! As unidades e portadores serão recarregados na próxima requisição.'
     )
 
 
+@admin.action(description='🔄 Limpar cache de consulta do médico (CRM/UF)')
+def limpar_cache_medico(modeladmin, request, queryset):
+    """Descarta as consultas FEMME/Korus em cache (e no diretório local) dos médicos selecionados."""
+    medicos = set(queryset.exclude(crm='').values_list('crm', 'uf_crm'))
+    for crm, uf_crm in medicos:
+        invalidar_medico(crm, uf_crm)
+        diretorio_medicos.invalidar(crm, uf_crm)
+    messages.success(
+        request,
+        f'✅ Cache de {len(medicos)} médico(s) limpo. A próxima validação consultará as APIs.'
+    )
+
+
 @admin.action(description='🗑️ Limpar TODO o cache do sistema')
 def limpar_cache_completo(modeladmin, request, queryset):
     """Action para limpar todo o cache do sistema."""
@@ -148,6 +171,7 @@ class DadosRequisicaoAdmin(admin.ModelAdmin):
     list_filter = ('status', 'unidade', 'origem', 'flag_erro_preenchimento', 'korus_bloqueado')
     search_fields = ('cod_req', 'cod_barras_req', 'nome_paciente', 'crm')
     inlines = [AmostraInline, RequisicaoStatusHistoricoInline, RequisicaoArquivoInline]
+    actions = [limpar_cache_medico]
     autocomplete_fields = (
         'unidade',
         'status',
@@ -263,10 +287,13 @@ class TipoArquivoAdmin(admin.ModelAdmin):
 @admin.register(RequisicaoArquivo)
 class RequisicaoArquivoAdmin(admin.ModelAdmin):
     """Admin para arquivos das requisições."""
-    list_display = ('cod_req', 'nome_arquivo', 'tipo_arquivo', 'data_upload_formatted', 'created_by')
-    list_filter = ('tipo_arquivo', 'data_upload', 'created_at')
+    list_display = ('cod_req', 'nome_arquivo', 'tipo_arquivo', 'verificacao', 'data_upload_formatted', 'created_by')
+    list_filter = ('tipo_arquivo', 'verificacao', 'data_upload', 'created_at')
     search_fields = ('cod_req', 'requisicao__cod_barras_req', 'nome_arquivo')
-    readonly_fields = ('data_upload', 'created_at', 'updated_at', 'created_by', 'updated_by')
+    readonly_fields = (
+        'data_upload', 'tamanho_bytes', 'verificacao', 'verificado_em',
+        'created_at', 'updated_at', 'created_by', 'updated_by',
+    )
     autocomplete_fields = ('requisicao', 'tipo_arquivo')
     date_hierarchy = 'data_upload'
     
@@ -277,6 +304,9 @@ class RequisicaoArquivoAdmin(admin.ModelAdmin):
         ('Arquivo', {
             'fields': ('tipo_arquivo', 'nome_arquivo', 'url_arquivo', 'data_upload')
         }),
+        ('Verificação no bucket', {
+            'fields': ('tamanho_bytes', 'verificacao', 'verificado_em')
+        }),
         ('Auditoria', {
             'fields': ('created_at', 'updated_at', 'created_by', 'updated_by'),
             'classes': ('collapse',)
@@ -434,6 +464,7 @@ class ProtocoloAdmin(admin.ModelAdmin):
     )
     list_filter = ('status', 'medico_validado', 'unidade', 'uf_crm', 'created_at')
     search_fields = ('codigo', 'crm', 'nome_medico', 'portador__nome')
+    actions = [limpar_cache_medico]
     readonly_fields = ('codigo', 'created_at', 'updated_at', 'created_by', 'updated_by')
     ordering = ('-created_at',)
     date_hierarchy = 'created_at'
@@ -607,3 +638,19 @@ class RequisicaoExameAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related(
             'requisicao', 'tipo_amostra', 'tipo_atendimento'
         )
+
+
+@admin.register(Medico)
+class MedicoAdmin(admin.ModelAdmin):
+    list_display = ('crm', 'uf', 'nome', 'fonte', 'destino', 'sincronizado_em_formatted')
+    list_filter = ('fonte', 'uf')
+    # Busca por nome usa ILIKE, atendido pelo índice trigram (PostgreSQL)
+    search_fields = ('crm', 'nome')
+    readonly_fields = ('dados', 'sincronizado_em', 'created_at', 'updated_at')
+    ordering = ('uf', 'crm', 'fonte')
+    
+    def sincronizado_em_formatted(self, obj):
+        if obj.sincronizado_em:
+            return obj.sincronizado_em.strftime('%d/%m/%Y %H:%M')
+        return '-'
+    sincronizado_em_formatted.short_description = 'Sincronizado em'
@@ -0,0 +1,323 @@
+"""
+Views assíncronas (ASGI) das consultas a APIs externas.
+
+ConsultarCPFKorusView, ConsultarCPFReceitaView, ValidarMedicoCompletoView,
+ObterSignedUrlView e ObterSignedUrlsLoteView passam quase todo o tempo aguardando HTTP. Sob o servidor
+ASGI (gunicorn + UvicornWorker, ver deploy/gunicorn_asgi_config.py) estas
+variantes aguardam as APIs sem ocupar uma thread, de modo que um processo
+atende centenas de consultas simultâneas.
+
+As regras de negócio são as mesmas das views síncronas (funções
+compartilhadas em triagem_views.py e upload_views.py); apenas as chamadas
+HTTP usam os clientes assíncronos e o acesso ao banco passa por
+sync_to_async.
+
+As URLs usam estas classes quando settings.ASYNC_VIEWS está ativo
+(DJANGO_ASYNC_VIEWS=true, padrão em femme_integra/asgi.py).
+
+@version 1.0.0
+@date 2026-10-18
+"""
+
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.mixins import AccessMixin
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+from django.views import View
+from django_ratelimit.core import is_ratelimited
+from django_ratelimit.exceptions import Ratelimited
+
+from core.services.cache_consultas import abuscar_medico_femme, abuscar_medico_korus
+from core.services.external_api import get_korus_client, get_receita_client, get_signed_url_client
+
+from .diretorio_medicos import ConsultaDiretorio
+from .models import DadosRequisicao, Medico
+from .triagem_views import (
+    VALIDACAO_MEDICO_PRAZO,
+    mapear_paciente_korus,
+    mapear_paciente_receita,
+    resposta_erro_consulta_cpf,
+    resposta_medico_femme,
+    resposta_medico_korus,
+    salvar_paciente_korus,
+    salvar_paciente_receita,
+    zerar_dados_paciente,
+)
+from .upload_views import (
+    arquivo_lambda,
+    nome_arquivo_padrao,
+    nomes_arquivo_lote,
+    quantidade_lote,
+    resposta_signed_url,
+    resposta_signed_urls,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLoginRequiredView(AccessMixin, View):
+    """
+    Equivalente assíncrono de LoginRequiredMixin + @ratelimit(key='user').
+
+    O usuário é carregado com request.auser() (request.user é síncrono) e o
+    limite de requisições usa a mesma configuração do django-ratelimit. O
+    contador do limite fica no Redis e é verificado fora do event loop.
+    """
+
+    login_url = 'admin:login'
+    ratelimit_rate = None
+    ratelimit_method = 'GET'
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        request.user = user
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+
+        if self.ratelimit_rate and await sync_to_async(is_ratelimited)(
+            request=request,
+            group=f'{self.__module__}.{type(self).__name__}',
+            key='user',
+            rate=self.ratelimit_rate,
+            method=self.ratelimit_method,
+            increment=True,
+        ):
+            cls = getattr(settings, 'RATELIMIT_EXCEPTION_CLASS', Ratelimited)
+            raise (import_string(cls) if isinstance(cls, str) else cls)()
+
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class ConsultarCPFKorusView(AsyncLoginRequiredView):
+    """Variante assíncrona de triagem_views.ConsultarCPFKorusView."""
+
+    ratelimit_rate = '30/m'
+
+    async def get(self, request, *args, **kwargs):
+        cpf = request.GET.get('cpf', '').strip()
+        requisicao_id = request.GET.get('requisicao_id')
+
+        if not cpf:
+            return JsonResponse(
+                {'status': 'error', 'message': 'CPF não informado.'},
+                status=400
+            )
+
+        if requisicao_id:
+            await sync_to_async(zerar_dados_paciente)(requisicao_id, cpf, request.user, 'Korus')
+
+        try:
+            response = await get_korus_client().abuscar_paciente_por_cpf(cpf)
+        except Exception as e:
+            logger.error(f"Exceção ao consultar API Korus: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao conectar com a API externa. Tente novamente.'},
+                status=500
+            )
+
+        if not response.success:
+            return resposta_erro_consulta_cpf(response, 'Korus')
+
+        paciente = mapear_paciente_korus(response.data)
+
+        if requisicao_id:
+            await sync_to_async(salvar_paciente_korus)(requisicao_id, paciente, cpf, request.user)
+
+        return JsonResponse({
+            'status': 'success',
+            'paciente': paciente
+        })
+
+
+class ConsultarCPFReceitaView(AsyncLoginRequiredView):
+    """Variante assíncrona de triagem_views.ConsultarCPFReceitaView."""
+
+    ratelimit_rate = '30/m'
+
+    async def get(self, request, *args, **kwargs):
+        cpf = request.GET.get('cpf', '').strip()
+        requisicao_id = request.GET.get('requisicao_id')
+
+        if not cpf:
+            return JsonResponse(
+                {'status': 'error', 'message': 'CPF não informado.'},
+                status=400
+            )
+
+        if requisicao_id:
+            await sync_to_async(zerar_dados_paciente)(requisicao_id, cpf, request.user, 'Receita')
+
+        try:
+            response = await get_receita_client().abuscar_cpf(cpf)
+        except Exception as e:
+            logger.error(f"Exceção ao consultar API Receita: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao conectar com a API externa. Tente novamente.'},
+                status=500
+            )
+
+        if not response.success:
+            return resposta_erro_consulta_cpf(response, 'Receita')
+
+        paciente = mapear_paciente_receita(response.data)
+
+        if requisicao_id:
+            await sync_to_async(salvar_paciente_receita)(requisicao_id, paciente, cpf, request.user)
+
+        return JsonResponse({
+            'status': 'success',
+            'paciente': paciente
+        })
+
+
+class ValidarMedicoCompletoView(AsyncLoginRequiredView):
+    """
+    Variante assíncrona de triagem_views.ValidarMedicoCompletoView.
+
+    O diretório local é consultado primeiro; as APIs restantes (FEMME e
+    KORUS) são consultadas como tarefas concorrentes no event loop (sem o
+    pool de threads), com o mesmo prazo total e a mesma precedência.
+    """
+
+    ratelimit_rate = '30/m'
+
+    async def get(self, request, *args, **kwargs):
+        crm = request.GET.get('crm', '').strip()
+        uf_crm = request.GET.get('uf_crm', '').strip().upper()
+
+        if not crm:
+            return JsonResponse(
+                {'status': 'error', 'code': 'validation', 'message': 'CRM não informado.'},
+                status=400
+            )
+
+        if not uf_crm:
+            return JsonResponse(
+                {'status': 'error', 'code': 'validation', 'message': 'UF do CRM não informada.'},
+                status=400
+            )
+
+        diretorio = await ConsultaDiretorio.acarregar(crm, uf_crm)
+        response_femme = diretorio.fresco(Medico.Fonte.FEMME)
+        response_korus = diretorio.fresco(Medico.Fonte.KORUS)
+        tarefas = []
+
+        try:
+            if response_femme is None:
+                limite = time.monotonic() + VALIDACAO_MEDICO_PRAZO
+                tarefa_femme = asyncio.create_task(abuscar_medico_femme(crm, uf_crm))
+                tarefas.append(tarefa_femme)
+                if response_korus is None:
+                    tarefa_korus = asyncio.create_task(abuscar_medico_korus(crm, uf_crm))
+                    tarefas.append(tarefa_korus)
+                response_femme = await diretorio.aresolver(
+                    Medico.Fonte.FEMME, await self._aguardar(tarefa_femme, limite, 'FEMME')
+                )
+            resposta = resposta_medico_femme(response_femme, crm, uf_crm)
+            if resposta is not None:
+                return resposta
+
+            if response_korus is None:
+                response_korus = await diretorio.aresolver(
+                    Medico.Fonte.KORUS, await self._aguardar(tarefa_korus, limite, 'KORUS')
+                )
+            return resposta_medico_korus(response_korus, crm, uf_crm)
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    @staticmethod
+    async def _aguardar(tarefa, limite, api):
+        """Aguarda o resultado de uma consulta até o prazo total (None em erro/timeout)."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(tarefa), timeout=max(limite - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            logger.warning(f"Prazo de {VALIDACAO_MEDICO_PRAZO}s esgotado aguardando API {api}")
+        except Exception as e:
+            logger.error(f"Erro ao consultar API {api}: {str(e)}", exc_info=True)
+        return None
+
+
+class ObterSignedUrlView(AsyncLoginRequiredView):
+    """Variante assíncrona de upload_views.ObterSignedUrlView."""
+
+    ratelimit_rate = '30/m'
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            requisicao_id = request.GET.get('requisicao_id')
+
+            if not requisicao_id:
+                return JsonResponse(
+                    {'status': 'error', 'message': 'ID da requisição não informado.'},
+                    status=400
+                )
+
+            try:
+                requisicao = await DadosRequisicao.objects.aget(id=requisicao_id)
+            except DadosRequisicao.DoesNotExist:
+                return JsonResponse(
+                    {'status': 'error', 'message': 'Requisição não encontrada.'},
+                    status=404
+                )
+
+            filename_padrao = nome_arquivo_padrao(requisicao)
+            response = await get_signed_url_client().agerar(
+                str(requisicao.id),
+                [arquivo_lambda(filename_padrao)]
+            )
+            return resposta_signed_url(requisicao, filename_padrao, response)
+
+        except Exception as e:
+            logger.error(f"Erro ao gerar signed URL: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
+                status=500
+            )
+
+
+class ObterSignedUrlsLoteView(AsyncLoginRequiredView):
+    """Variante assíncrona de upload_views.ObterSignedUrlsLoteView."""
+
+    ratelimit_rate = '30/m'
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            requisicao_id = request.GET.get('requisicao_id')
+
+            if not requisicao_id:
+                return JsonResponse(
+                    {'status': 'error', 'message': 'ID da requisição não informado.'},
+                    status=400
+                )
+
+            quantidade, erro = quantidade_lote(request)
+            if erro:
+                return erro
+
+            try:
+                requisicao = await DadosRequisicao.objects.aget(id=requisicao_id)
+            except DadosRequisicao.DoesNotExist:
+                return JsonResponse(
+                    {'status': 'error', 'message': 'Requisição não encontrada.'},
+                    status=404
+                )
+
+            nomes = nomes_arquivo_lote(requisicao, quantidade)
+            response = await get_signed_url_client().agerar(
+                str(requisicao.id),
+                [arquivo_lambda(nome) for nome in nomes]
+            )
+            return resposta_signed_urls(requisicao, nomes, response)
+
+        except Exception as e:
+            logger.error(f"Erro ao gerar signed URLs: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao gerar URLs de upload.'},
+                status=500
+            )
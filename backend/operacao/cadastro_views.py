@@ -18,6 +18,7 @@ from .models import (
     StatusRequisicao,
     TipoAtendimento,
 )
+from .referencias import obter_referencia
 
 logger = logging.getLogger('operacao')
 
@@ -195,7 +196,7 @@ class CadastroAutorizarView(LoginRequiredMixin, View):
             
             # Buscar status de destino
             try:
-                status_automacao = StatusRequisicao.objects.get(codigo=STATUS_AUTOMACAO)
+                status_automacao = obter_referencia(StatusRequisicao, codigo=STATUS_AUTOMACAO)
             except StatusRequisicao.DoesNotExist:
                 return JsonResponse({
                     'status': 'error',
@@ -0,0 +1,207 @@
+"""
+Diretório local de médicos solicitantes (tabela medico).
+
+A validação do médico na triagem e no protocolo consultava FEMME e/ou Korus
+a cada requisição. O diretório guarda, por CRM/UF e por fonte, o último
+retorno bem-sucedido de cada API, e as views o consultam antes delas:
+
+- Entrada "fresca" (sincronizado_em dentro de MEDICO_DIRETORIO_VALIDADE_HORAS,
+  padrão 168h): a resposta sai do banco, sem chamada externa.
+- Sem entrada fresca: a API é consultada (com o cache Redis de
+  core.services.cache_consultas) e o resultado volta para o diretório:
+  sucesso grava/atualiza a entrada, "não encontrado"/duplicado a remove.
+- Falha transitória da API (timeout, HTTP 5xx, circuito aberto): uma
+  entrada expirada, se existir, é usada no lugar do erro.
+
+A carga inicial e a renovação em massa são feitas pelo comando
+`sincronizar_medicos`. Para forçar nova consulta de um médico (cadastro
+corrigido na origem), use invalidar(crm, uf), chamado também pelo comando
+`limpar_cache --medico` e pela action do admin.
+
+Uso:
+    from .diretorio_medicos import buscar_medico_femme
+
+    response = buscar_medico_femme(crm, uf)   # mesmo APIResponse da API
+
+    diretorio = ConsultaDiretorio.carregar(crm, uf)
+    response = diretorio.fresco(Medico.Fonte.FEMME)
+    if response is None:
+        response = diretorio.resolver(Medico.Fonte.FEMME, consultar_api())
+"""
+import logging
+import os
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.utils import timezone
+
+from core.services import cache_consultas
+from core.services.cache_consultas import ENCONTRADO, classificar_medico, normalizar_crm
+from core.services.external_api import APIResponse
+
+from .models import Medico
+
+logger = logging.getLogger(__name__)
+
+VALIDADE = timedelta(hours=int(os.getenv('MEDICO_DIRETORIO_VALIDADE_HORAS', '168')))
+
+# Ações de resolver() sobre a entrada do diretório
+GRAVAR = 'gravar'
+REMOVER = 'remover'
+USAR_EXPIRADA = 'usar_expirada'
+
+
+def campos_entrada(fonte: str, response: APIResponse) -> Optional[dict]:
+    """
+    Campos da entrada do diretório a partir do retorno de uma API.
+
+    Returns:
+        Dict com nome, endereço, destino e dados; None se o retorno não
+        identifica um único médico
+    """
+    if fonte == Medico.Fonte.FEMME:
+        if not response.data:
+            return None
+        med = response.data[0]
+        nome, endereco, destino = med.get('nome_medico'), med.get('logradouro'), med.get('destino')
+    else:
+        med = (response.data or {}).get('medico')
+        if not med:
+            return None
+        nome, endereco, destino = med.get('nome'), '', ''
+
+    return {
+        'nome': (nome or '')[:200],
+        'endereco': (endereco or '')[:255],
+        'destino': (destino or '')[:100],
+        'dados': response.data,
+    }
+
+
+def resposta_entrada(entrada: Medico) -> APIResponse:
+    """APIResponse equivalente ao retorno da API de origem da entrada."""
+    return APIResponse(success=True, status_code=200, data=entrada.dados)
+
+
+class ConsultaDiretorio:
+    """Entradas do diretório para um CRM/UF (todas as fontes em uma consulta ao banco)."""
+
+    def __init__(self, crm: str, uf: str, entradas: Dict[str, Medico]):
+        self.crm = crm
+        self.uf = uf
+        self.entradas = entradas
+
+    @property
+    def valido(self) -> bool:
+        return bool(self.crm) and len(self.uf) == 2
+
+    @classmethod
+    def carregar(cls, crm: str, uf: str) -> 'ConsultaDiretorio':
+        crm_norm, uf_norm = normalizar_crm(crm, uf)
+        consulta = cls(crm_norm, uf_norm, {})
+        if consulta.valido:
+            consulta.entradas = {m.fonte: m for m in Medico.objects.filter(crm=crm_norm, uf=uf_norm)}
+        return consulta
+
+    @classmethod
+    async def acarregar(cls, crm: str, uf: str) -> 'ConsultaDiretorio':
+        """Versão assíncrona de carregar()."""
+        crm_norm, uf_norm = normalizar_crm(crm, uf)
+        consulta = cls(crm_norm, uf_norm, {})
+        if consulta.valido:
+            consulta.entradas = {m.fonte: m async for m in Medico.objects.filter(crm=crm_norm, uf=uf_norm)}
+        return consulta
+
+    def fresco(self, fonte: str) -> Optional[APIResponse]:
+        """Resposta da fonte a partir do diretório, se a entrada estiver dentro da validade."""
+        entrada = self.entradas.get(fonte)
+        if entrada is None or entrada.sincronizado_em < timezone.now() - VALIDADE:
+            return None
+        logger.debug('Diretório de médicos: acerto %s %s/%s', fonte, self.uf, self.crm)
+        return resposta_entrada(entrada)
+
+    def _acao(self, fonte: str, response: Optional[APIResponse]) -> Optional[str]:
+        if not self.valido:
+            return None
+        resultado = classificar_medico(response) if response is not None else None
+        if resultado == ENCONTRADO:
+            return GRAVAR
+        if fonte not in self.entradas:
+            return None
+        # Médico não encontrado/duplicado na origem: a entrada deixou de valer
+        return REMOVER if resultado else USAR_EXPIRADA
+
+    def resolver(self, fonte: str, response: Optional[APIResponse]) -> Optional[APIResponse]:
+        """
+        Aplica o resultado da API ao diretório e retorna a resposta a usar.
+
+        Args:
+            fonte: Medico.Fonte consultada
+            response: Retorno da API (None em timeout/erro)
+        """
+        try:
+            acao = self._acao(fonte, response)
+            if acao == USAR_EXPIRADA:
+                logger.warning('API %s indisponível: usando diretório expirado para %s/%s', fonte, self.uf, self.crm)
+                return resposta_entrada(self.entradas[fonte])
+            if acao == GRAVAR:
+                self._gravar(fonte, response)
+            elif acao == REMOVER:
+                Medico.objects.filter(crm=self.crm, uf=self.uf, fonte=fonte).delete()
+        except Exception:
+            # O diretório é uma otimização: a validação segue com a resposta da API
+            logger.exception('Erro ao atualizar diretório de médicos (%s %s/%s)', fonte, self.uf, self.crm)
+        return response
+
+    async def aresolver(self, fonte: str, response: Optional[APIResponse]) -> Optional[APIResponse]:
+        """Versão assíncrona de resolver()."""
+        try:
+            acao = self._acao(fonte, response)
+            if acao == USAR_EXPIRADA:
+                logger.warning('API %s indisponível: usando diretório expirado para %s/%s', fonte, self.uf, self.crm)
+                return resposta_entrada(self.entradas[fonte])
+            if acao == GRAVAR:
+                campos = campos_entrada(fonte, response)
+                if campos:
+                    await Medico.objects.aupdate_or_create(
+                        crm=self.crm, uf=self.uf, fonte=fonte,
+                        defaults={**campos, 'sincronizado_em': timezone.now()},
+                    )
+            elif acao == REMOVER:
+                await Medico.objects.filter(crm=self.crm, uf=self.uf, fonte=fonte).adelete()
+        except Exception:
+            logger.exception('Erro ao atualizar diretório de médicos (%s %s/%s)', fonte, self.uf, self.crm)
+        return response
+
+    def _gravar(self, fonte: str, response: APIResponse) -> None:
+        campos = campos_entrada(fonte, response)
+        if campos:
+            Medico.objects.update_or_create(
+                crm=self.crm, uf=self.uf, fonte=fonte,
+                defaults={**campos, 'sincronizado_em': timezone.now()},
+            )
+
+
+def _buscar(fonte: str, crm: str, uf: str, consultar: Callable[[str, str], APIResponse]) -> APIResponse:
+    diretorio = ConsultaDiretorio.carregar(crm, uf)
+    response = diretorio.fresco(fonte)
+    if response is not None:
+        return response
+    return diretorio.resolver(fonte, consultar(crm, uf))
+
+
+def buscar_medico_femme(crm: str, uf: str) -> APIResponse:
+    """Consulta de médico na FEMME pelo diretório (API apenas sem entrada fresca)."""
+    return _buscar(Medico.Fonte.FEMME, crm, uf, cache_consultas.buscar_medico_femme)
+
+
+def buscar_medico_korus(crm: str, uf: str) -> APIResponse:
+    """Consulta de médico na Korus pelo diretório (API apenas sem entrada fresca)."""
+    return _buscar(Medico.Fonte.KORUS, crm, uf, cache_consultas.buscar_medico_korus)
+
+
+def invalidar(crm: str, uf: str) -> int:
+    """Remove as entradas de um médico; a próxima validação consulta as APIs."""
+    crm_norm, uf_norm = normalizar_crm(crm, uf)
+    removidas, _ = Medico.objects.filter(crm=crm_norm, uf=uf_norm).delete()
+    return removidas
@@ -0,0 +1,149 @@
+"""
+Chaves de idempotência para endpoints POST acionados por bipagem.
+
+As estações de bipagem reenviam a requisição quando a rede oscila. Sem
+proteção, o reenvio refaz todo o trabalho no banco (ou falha com
+IntegrityError). Com o cabeçalho 'Idempotency-Key', a primeira resposta
+fica armazenada no Redis e os reenvios com a mesma chave recebem a
+resposta original sem executar a view novamente.
+
+No frontend, FemmeUtils.postIdempotente (static/js/utils/idempotencia.js)
+gera uma chave por ação do usuário (recebimento, triagem, confirmação de
+upload do scanner) e a mantém nas novas tentativas dessa ação.
+
+Regras:
+- Sem o cabeçalho, a view é executada normalmente (compatível com clientes
+  que não o enviam).
+- A chave é escopada por usuário e rota; reutilizá-la com outro corpo de
+  requisição retorna 422.
+- Enquanto a primeira requisição está em processamento, reenvios recebem
+  409 (o cliente deve tentar novamente em seguida).
+- Respostas 5xx não são armazenadas: o reenvio executa a view de novo.
+- Com o Redis indisponível, a view é executada sem proteção.
+
+Uso:
+    @method_decorator(idempotente(), name='post')
+    class MinhaView(LoginRequiredMixin, View):
+        ...
+"""
+import hashlib
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+CABECALHO = 'Idempotency-Key'
+CABECALHO_REPETICAO = 'Idempotent-Replayed'
+CACHE_KEY = 'idempotencia:{usuario}:{rota}:{chave}'
+TAMANHO_MAXIMO_CHAVE = 255
+
+TTL_PADRAO = getattr(settings, 'IDEMPOTENCIA_TTL', 60 * 60 * 24)
+# Tempo máximo de uma requisição em processamento antes de liberar a chave
+TTL_PROCESSAMENTO = getattr(settings, 'IDEMPOTENCIA_TTL_PROCESSAMENTO', 120)
+
+PROCESSANDO = 'processando'
+CONCLUIDO = 'concluido'
+
+
+def _hash(valor: bytes) -> str:
+    return hashlib.sha256(valor).hexdigest()
+
+
+def idempotente(ttl=None):
+    """
+    Decorator de view que armazena a primeira resposta por Idempotency-Key.
+
+    Args:
+        ttl: Tempo (segundos) em que a resposta fica disponível para reenvios
+    """
+    ttl = ttl or TTL_PADRAO
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            chave_cliente = request.headers.get(CABECALHO, '').strip()
+            if not chave_cliente:
+                return view_func(request, *args, **kwargs)
+
+            if len(chave_cliente) > TAMANHO_MAXIMO_CHAVE:
+                return JsonResponse(
+                    {'status': 'error', 'message': f'{CABECALHO} inválido.'},
+                    status=400,
+                )
+
+            usuario = request.user.pk if request.user.is_authenticated else 'anonimo'
+            chave = CACHE_KEY.format(
+                usuario=usuario,
+                rota=request.path,
+                chave=_hash(chave_cliente.encode()),
+            )
+            hash_corpo = _hash(request.body)
+
+            if not cache.add(chave, {'estado': PROCESSANDO, 'hash_corpo': hash_corpo}, TTL_PROCESSAMENTO):
+                entrada = cache.get(chave)
+                if entrada is None:
+                    # Redis indisponível ou chave expirou entre o add e o get
+                    return view_func(request, *args, **kwargs)
+                return _responder_repeticao(entrada, hash_corpo, chave_cliente)
+
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                cache.delete(chave)
+                raise
+
+            if response.status_code >= 500 or getattr(response, 'streaming', False):
+                cache.delete(chave)
+                return response
+
+            cache.set(
+                chave,
+                {
+                    'estado': CONCLUIDO,
+                    'hash_corpo': hash_corpo,
+                    'status': response.status_code,
+                    'content_type': response.get('Content-Type'),
+                    'conteudo': response.content,
+                },
+                ttl,
+            )
+            return response
+
+        return _wrapped
+
+    return decorator
+
+
+def _responder_repeticao(entrada, hash_corpo, chave_cliente):
+    """Monta a resposta para um reenvio com chave já utilizada."""
+    if entrada['hash_corpo'] != hash_corpo:
+        logger.warning('Idempotency-Key reutilizado com corpo diferente: %s', chave_cliente)
+        return JsonResponse(
+            {
+                'status': 'error',
+                'message': f'{CABECALHO} já utilizado em outra requisição.',
+            },
+            status=422,
+        )
+
+    if entrada['estado'] == PROCESSANDO:
+        return JsonResponse(
+            {
+                'status': 'error',
+                'message': 'Requisição anterior ainda em processamento. Tente novamente em instantes.',
+            },
+            status=409,
+        )
+
+    logger.info('Resposta reaproveitada para Idempotency-Key %s', chave_cliente)
+    response = HttpResponse(
+        entrada['conteudo'],
+        status=entrada['status'],
+        content_type=entrada['content_type'],
+    )
+    response[CABECALHO_REPETICAO] = 'true'
+    return response
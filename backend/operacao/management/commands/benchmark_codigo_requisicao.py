@@ -0,0 +1,126 @@
+"""
+Benchmark de criação concorrente de requisições (geração de cod_req).
+
+Compara o gerador atual (bloco da sequence + retry por IntegrityError) com a
+estratégia anterior (código aleatório + exists() antes de inserir), criando
+requisições em várias threads, cada uma com sua própria conexão.
+
+As requisições criadas usam cod_barras_req com prefixo BENCH- e são removidas
+ao final (use --manter para inspecioná-las).
+
+Uso:
+    python manage.py benchmark_codigo_requisicao
+    python manage.py benchmark_codigo_requisicao --threads 16 --por-thread 500
+    python manage.py benchmark_codigo_requisicao --estrategia atual
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, connections, transaction
+
+from operacao.models import DadosRequisicao, StatusRequisicao, Unidade
+from operacao.services import GeradorCodigoRequisicao, RequisicaoService
+
+PREFIXO = 'BENCH-'
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão de criação concorrente de requisições por estratégia de cod_req'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Threads concorrentes (padrão: 8)')
+        parser.add_argument('--por-thread', type=int, default=200, help='Requisições por thread (padrão: 200)')
+        parser.add_argument(
+            '--estrategia',
+            choices=['atual', 'legado', 'ambas'],
+            default='ambas',
+            help='Estratégia a medir (padrão: ambas)',
+        )
+        parser.add_argument('--manter', action='store_true', help='Não remove as requisições criadas')
+
+    def handle(self, *args, **options):
+        unidade = Unidade.objects.first()
+        status = StatusRequisicao.objects.filter(codigo='1').first()
+        if not unidade or not status:
+            raise CommandError('❌ É necessário ao menos uma Unidade e o status 1 (ABERTO NTO).')
+
+        self.stdout.write(f'🗄️  Banco: {connection.vendor}')
+        if connection.vendor != 'postgresql':
+            self.stdout.write(
+                self.style.WARNING('⚠️  Sem PostgreSQL o gerador usa códigos aleatórios (sem sequence).')
+            )
+
+        estrategias = ['legado', 'atual'] if options['estrategia'] == 'ambas' else [options['estrategia']]
+        try:
+            for estrategia in estrategias:
+                self._executar(estrategia, unidade, status, options['threads'], options['por_thread'])
+        finally:
+            if not options['manter']:
+                # Evita um aviso por registro do signal de LogRecebimento
+                logging.getLogger('operacao.signals').setLevel(logging.ERROR)
+                removidas, _ = DadosRequisicao.objects.filter(cod_barras_req__startswith=PREFIXO).delete()
+                self.stdout.write(f'🗑️  {removidas} registros de benchmark removidos.')
+
+    def _executar(self, estrategia, unidade, status, threads, por_thread):
+        criar = self._criar_atual if estrategia == 'atual' else self._criar_legado
+        contadores = {'ok': 0, 'erros': 0, 'colisoes': 0}
+        lock = threading.Lock()
+
+        def trabalhar(_):
+            try:
+                for _ in range(por_thread):
+                    cod_barras = f'{PREFIXO}{uuid.uuid4().hex[:20]}'
+                    try:
+                        colisoes = criar(cod_barras, unidade, status)
+                        with lock:
+                            contadores['ok'] += 1
+                            contadores['colisoes'] += colisoes
+                    except Exception as e:
+                        with lock:
+                            contadores['erros'] += 1
+                        self.stderr.write(f'   erro: {e}')
+            finally:
+                connections.close_all()
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(trabalhar, range(threads)))
+        duracao = time.perf_counter() - inicio
+
+        total = threads * por_thread
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {estrategia:<6} {total} requisições em {duracao:.2f}s '
+                f'({contadores["ok"] / duracao:.0f}/s) | ok={contadores["ok"]} '
+                f'erros={contadores["erros"]} colisões={contadores["colisoes"]}'
+            )
+        )
+
+    @staticmethod
+    def _criar_atual(cod_barras, unidade, status):
+        with transaction.atomic():
+            RequisicaoService.inserir_requisicao(cod_barras_req=cod_barras, unidade=unidade, status=status)
+        return 0
+
+    @staticmethod
+    def _criar_legado(cod_barras, unidade, status):
+        """Estratégia anterior: código aleatório validado com exists() antes do INSERT."""
+        colisoes = 0
+        while True:
+            codigo = GeradorCodigoRequisicao.aleatorio()
+            if DadosRequisicao.objects.filter(cod_req=codigo).exists():
+                colisoes += 1
+                continue
+            try:
+                with transaction.atomic():
+                    DadosRequisicao.objects.create(
+                        cod_req=codigo, cod_barras_req=cod_barras, unidade=unidade, status=status
+                    )
+                return colisoes
+            except IntegrityError:
+                # Corrida: outro processo inseriu o mesmo código entre o exists() e o INSERT
+                colisoes += 1
@@ -1,13 +1,22 @@
 """
 Comando para limpar o cache do sistema.
 
+Sem argumentos, invalida o cache versionado de unidades/portadores/origens
+(normalmente automático via signals; útil após alterações feitas no banco).
+
 Uso:
     python manage.py limpar_cache
     python manage.py limpar_cache --all
-    python manage.py limpar_cache --key recebimento:unidades
+    python manage.py limpar_cache --key <chave>
+    python manage.py limpar_cache --medico 12345/SP
 """
 from django.core.cache import cache
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.cache_consultas import invalidar_medico
+from operacao import diretorio_medicos
+from operacao.models import Origem, PortadorRepresentante, Unidade
+from operacao.referencias import registro as registro_referencias
 
 
 class Command(BaseCommand):
@@ -24,6 +33,12 @@ class Command(BaseCommand):
             type=str,
             help='Limpa uma chave específica do cache',
         )
+        parser.add_argument(
+            '--medico',
+            type=str,
+            metavar='CRM/UF',
+            help='Limpa o cache de consulta (e o diretório local) de um médico (ex: 12345/SP)',
+        )
 
     def handle(self, *args, **options):
         if options['all']:
@@ -43,28 +58,30 @@ class Command(BaseCommand):
             )
             return
 
-        # Limpar caches específicos do recebimento (padrão)
-        keys_to_clear = [
-            'recebimento:unidades',
-            'recebimento:portadores',
-        ]
-        
-        cleared = []
-        for key in keys_to_clear:
-            if cache.delete(key):
-                cleared.append(key)
-        
-        if cleared:
+        if options['medico']:
+            crm, _, uf = options['medico'].rpartition('/')
+            if not crm or len(uf.strip()) != 2:
+                raise CommandError('❌ Informe o médico no formato CRM/UF (ex: 12345/SP).')
+            invalidar_medico(crm, uf)
+            diretorio_medicos.invalidar(crm, uf)
             self.stdout.write(
-                self.style.SUCCESS(
-                    f'✅ Cache limpo com sucesso!\n'
-                    f'   Chaves removidas: {", ".join(cleared)}'
-                )
+                self.style.SUCCESS(f'✅ Cache do médico {crm}/{uf.upper()} foi limpo com sucesso!')
             )
-        else:
-            self.stdout.write(
-                self.style.WARNING('⚠️  Nenhuma chave de cache encontrada para limpar.')
+            return
+
+        # Invalidar dados de referência do recebimento (padrão).
+        # O cache é versionado e já se invalida ao salvar/excluir registros;
+        # este caminho serve para alterações feitas direto no banco.
+        modelos = [Unidade, PortadorRepresentante, Origem]
+        for model in modelos:
+            registro_referencias.invalidar(model)
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Cache invalidado com sucesso!\n'
+                f'   Modelos: {", ".join(model.__name__ for model in modelos)}'
             )
+        )
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,64 @@
+"""
+Executa o OCR das requisições digitalizadas que ficaram pendentes.
+
+A confirmação do upload agenda o OCR em segundo plano
+(operacao/ocr_requisicoes.py); este comando retoma as requisições que
+continuam com flag_ocr=False (ver operacao/segundo_plano.py). Arquivos já
+processados saem do cache de OCR sem nova chamada à API.
+
+Uso:
+    python manage.py processar_ocr
+    python manage.py processar_ocr --dias 30 --threads 4
+"""
+from datetime import timedelta
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from core.services.ocr import get_ocr_client
+from operacao.models import DadosRequisicao
+from operacao.ocr_requisicoes import COD_TIPO_REQUISICAO, LOTE, processar_requisicoes
+from operacao.segundo_plano import ComandoPendentes
+
+
+class Command(ComandoPendentes):
+    help = 'Executa o OCR das requisições digitalizadas com OCR pendente'
+
+    lote_padrao = LOTE
+    descricao_minutos = 'Considera apenas arquivos enviados há mais de N minutos (padrão: 5)'
+    mensagem_nenhum = '✅ Nenhuma requisição com OCR pendente.'
+    mensagem_inicio = '🔄 OCR de {total} requisição(ões) com {threads} thread(s)...'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--dias', type=int, default=7,
+            help='Ignora arquivos enviados há mais de N dias (padrão: 7)',
+        )
+
+    def handle(self, *args, **options):
+        if not get_ocr_client().configurado:
+            raise CommandError('❌ OCR_API_URL não configurada.')
+        super().handle(*args, **options)
+
+    def pendentes(self, limite, options):
+        return DadosRequisicao.objects.filter(
+            flag_ocr=False,
+            arquivos__cod_tipo_arquivo=COD_TIPO_REQUISICAO,
+            arquivos__data_upload__lte=limite,
+            arquivos__data_upload__gte=timezone.now() - timedelta(days=options['dias']),
+        ).distinct().values_list('id', flat=True)
+
+    def processar(self, ids):
+        return processar_requisicoes(ids)
+
+    def relatorio(self, totais):
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ OCR concluído\n'
+            f'   Processadas: {totais["processadas"]}\n'
+            f'   Sem arquivo disponível: {totais["sem_arquivo"]}'
+        ))
+        if totais['pendentes']:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {totais["pendentes"]} requisição(ões) não puderam ser processadas; continuam pendentes.'
+            ))
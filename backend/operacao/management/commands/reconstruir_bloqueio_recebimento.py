@@ -0,0 +1,41 @@
+"""
+Comando para reconstruir o set de códigos bloqueados para recebimento (Redis).
+
+O set é mantido automaticamente pelos signals de DadosRequisicao; use este
+comando após restaurar o Redis, alterar STATUS_BLOQUEIO_RECEBIMENTO ou
+executar atualizações de status diretamente no banco.
+
+Uso:
+    python manage.py reconstruir_bloqueio_recebimento
+    python manage.py reconstruir_bloqueio_recebimento --lote 10000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from redis.exceptions import RedisError
+
+from operacao.services import STATUS_BLOQUEIO_RECEBIMENTO, BloqueioRecebimentoCache
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o set Redis de códigos de barras bloqueados para recebimento'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Quantidade de códigos enviados ao Redis por comando (padrão: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'🔄 Reconstruindo set de bloqueio (status: {", ".join(STATUS_BLOQUEIO_RECEBIMENTO)})...'
+        )
+
+        try:
+            total = BloqueioRecebimentoCache.reconstruir(tamanho_lote=options['lote'])
+        except (RuntimeError, RedisError) as e:
+            raise CommandError(f'❌ Não foi possível reconstruir o set: {e}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Set de bloqueio reconstruído com {total} códigos de barras.')
+        )
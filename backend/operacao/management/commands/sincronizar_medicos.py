@@ -0,0 +1,169 @@
+"""
+Sincronização em massa do diretório local de médicos (tabela medico).
+
+Reúne os CRM/UF usados em requisições e protocolos recentes, consulta a FEMME
+(e a Korus quando a FEMME não encontra o médico) e grava os resultados no
+diretório em lotes (bulk_create com upsert). Depois disso as validações da
+triagem e do protocolo respondem pelo banco, sem chamar as APIs.
+
+Por padrão só são consultados médicos sem entrada no diretório ou com a
+entrada expirada (MEDICO_DIRETORIO_VALIDADE_HORAS). Médicos não encontrados
+na origem têm a entrada removida.
+
+Também aceita a carga de uma exportação da FEMME em CSV (separador ';',
+colunas crm;uf;nome;endereco;destino), sem consulta às APIs.
+
+Uso:
+    python manage.py sincronizar_medicos
+    python manage.py sincronizar_medicos --dias 365 --threads 8
+    python manage.py sincronizar_medicos --todos
+    python manage.py sincronizar_medicos --arquivo medicos_femme.csv
+"""
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.services.cache_consultas import ENCONTRADO, classificar_medico, invalidar_medico, normalizar_crm
+from core.services.external_api import APIResponse, get_femme_client, get_korus_client
+from operacao.diretorio_medicos import VALIDADE, campos_entrada
+from operacao.models import DadosRequisicao, Medico, Protocolo
+
+CAMPOS_ATUALIZADOS = ['nome', 'endereco', 'destino', 'dados', 'sincronizado_em', 'updated_at']
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza o diretório local de médicos com FEMME/Korus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=180,
+            help='Considera médicos de requisições/protocolos dos últimos N dias (padrão: 180)',
+        )
+        parser.add_argument('--todos', action='store_true', help='Consulta também médicos com entrada válida')
+        parser.add_argument('--threads', type=int, default=4, help='Consultas simultâneas às APIs (padrão: 4)')
+        parser.add_argument('--lote', type=int, default=500, help='Registros por INSERT (padrão: 500)')
+        parser.add_argument('--arquivo', type=str, help='Carrega um CSV exportado da FEMME em vez de consultar as APIs')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['lote'] < 1:
+            raise CommandError('❌ --threads e --lote devem ser maiores que zero.')
+
+        if options['arquivo']:
+            entradas = self._ler_arquivo(options['arquivo'])
+            self._gravar(entradas, options['lote'])
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(entradas)} médico(s) carregados de {options["arquivo"]}.'))
+            return
+
+        medicos = self._medicos_recentes(options['dias'])
+        if not options['todos']:
+            validos = set(
+                Medico.objects.filter(sincronizado_em__gte=timezone.now() - VALIDADE).values_list('crm', 'uf')
+            )
+            medicos -= validos
+        self.stdout.write(f'🔄 {len(medicos)} médico(s) a sincronizar com {options["threads"]} thread(s)...')
+        if not medicos:
+            self.stdout.write(self.style.SUCCESS('✅ Diretório já está atualizado.'))
+            return
+
+        inicio = time.monotonic()
+        entradas, remover, falhas = [], [], 0
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            for (crm, uf), resultado in zip(medicos, executor.map(self._consultar, medicos)):
+                if resultado is None:
+                    falhas += 1
+                elif resultado:
+                    entradas.append(resultado)
+                else:
+                    remover.append((crm, uf))
+
+        self._gravar(entradas, options['lote'])
+        for crm, uf in remover:
+            Medico.objects.filter(crm=crm, uf=uf).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Sincronização concluída em {time.monotonic() - inicio:.1f}s\n'
+            f'   Atualizados: {len(entradas)}\n'
+            f'   Não encontrados (removidos): {len(remover)}'
+        ))
+        if falhas:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {falhas} consulta(s) falharam (API indisponível); as entradas atuais foram mantidas.'
+            ))
+
+    def _medicos_recentes(self, dias):
+        """CRM/UF normalizados de requisições e protocolos criados nos últimos dias."""
+        desde = timezone.now() - timedelta(days=dias)
+        pares = set()
+        for model in (DadosRequisicao, Protocolo):
+            consulta = model.objects.filter(created_at__gte=desde).exclude(crm='').exclude(uf_crm='')
+            for crm, uf in consulta.values_list('crm', 'uf_crm').distinct().iterator():
+                crm_norm, uf_norm = normalizar_crm(crm, uf)
+                if crm_norm and len(uf_norm) == 2:
+                    pares.add((crm_norm, uf_norm))
+        return pares
+
+    def _consultar(self, medico):
+        """
+        Consulta FEMME e, se necessário, Korus.
+
+        Returns:
+            Medico a gravar; False se não encontrado em nenhuma; None em falha da API
+        """
+        crm, uf = medico
+        try:
+            for fonte, consultar in (
+                (Medico.Fonte.FEMME, get_femme_client().buscar_medico),
+                (Medico.Fonte.KORUS, get_korus_client().buscar_medico_por_crm),
+            ):
+                response = consultar(crm, uf)
+                resultado = classificar_medico(response)
+                if resultado is None:
+                    return None
+                if resultado == ENCONTRADO:
+                    campos = campos_entrada(fonte, response)
+                    if campos:
+                        # O resultado em cache no Redis pode ser anterior ao sincronizado
+                        invalidar_medico(crm, uf)
+                        return Medico(crm=crm, uf=uf, fonte=fonte, sincronizado_em=timezone.now(), **campos)
+        except Exception as e:
+            self.stderr.write(f'❌ Erro ao consultar médico {crm}/{uf}: {e}')
+            return None
+        return False
+
+    def _ler_arquivo(self, caminho):
+        try:
+            with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+                linhas = list(csv.DictReader(arquivo, delimiter=';'))
+        except OSError as e:
+            raise CommandError(f'❌ Não foi possível ler {caminho}: {e}')
+
+        agora = timezone.now()
+        entradas = {}
+        for linha in linhas:
+            crm, uf = normalizar_crm(linha.get('crm', ''), linha.get('uf', ''))
+            if not crm or len(uf) != 2:
+                continue
+            dados = [{
+                'id_medico': linha.get('id_medico', ''),
+                'nome_medico': linha.get('nome', ''),
+                'crm': crm,
+                'uf_crm': uf,
+                'logradouro': linha.get('endereco', ''),
+                'destino': linha.get('destino', ''),
+            }]
+            campos = campos_entrada(Medico.Fonte.FEMME, APIResponse(success=True, data=dados))
+            entradas[(crm, uf)] = Medico(crm=crm, uf=uf, fonte=Medico.Fonte.FEMME, sincronizado_em=agora, **campos)
+        return list(entradas.values())
+
+    def _gravar(self, entradas, lote):
+        Medico.objects.bulk_create(
+            entradas,
+            batch_size=lote,
+            update_conflicts=True,
+            unique_fields=['crm', 'uf', 'fonte'],
+            update_fields=CAMPOS_ATUALIZADOS,
+        )
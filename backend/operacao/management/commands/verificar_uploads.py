@@ -0,0 +1,47 @@
+"""
+Verifica no bucket os arquivos de upload que ficaram pendentes.
+
+A confirmação do upload agenda a verificação em segundo plano
+(operacao/verificacao_arquivos.py); este comando retoma os arquivos que
+continuam com verificacao=PENDENTE (ver operacao/segundo_plano.py).
+
+Uso:
+    python manage.py verificar_uploads
+    python manage.py verificar_uploads --minutos 30 --threads 4
+"""
+from operacao.models import RequisicaoArquivo
+from operacao.segundo_plano import ComandoPendentes
+from operacao.verificacao_arquivos import LOTE, verificar_arquivos
+
+V = RequisicaoArquivo.Verificacao
+
+
+class Command(ComandoPendentes):
+    help = 'Verifica no bucket os arquivos de upload com verificação pendente'
+
+    threads_padrao = 4
+    lote_padrao = LOTE
+    descricao_minutos = 'Considera apenas arquivos confirmados há mais de N minutos (padrão: 5)'
+    mensagem_nenhum = '✅ Nenhum arquivo com verificação pendente.'
+    mensagem_inicio = '🔄 Verificando {total} arquivo(s) com {threads} thread(s)...'
+
+    def pendentes(self, limite, options):
+        return RequisicaoArquivo.objects.filter(
+            verificacao=V.PENDENTE,
+            data_upload__lte=limite,
+        ).values_list('id', flat=True)
+
+    def processar(self, ids):
+        return verificar_arquivos(ids)
+
+    def relatorio(self, totais):
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Verificação concluída\n'
+            f'   OK: {totais[V.OK]}\n'
+            f'   Não encontrados: {totais[V.AUSENTE]}\n'
+            f'   Tamanho divergente: {totais[V.TAMANHO_DIVERGENTE]}'
+        ))
+        if totais[V.PENDENTE]:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {totais[V.PENDENTE]} arquivo(s) não puderam ser verificados; continuam pendentes.'
+            ))
@@ -0,0 +1,35 @@
+# Sequence usada pelo gerador de códigos de requisição (cod_req)
+
+from django.db import migrations
+
+# Deve ser igual a GeradorCodigoRequisicao.TAMANHO_BLOCO (operacao/services.py):
+# cada nextval() reserva um bloco de códigos para o worker.
+TAMANHO_BLOCO = 100
+
+
+def criar_sequence(apps, schema_editor):
+    """Cria a sequence (somente PostgreSQL; demais bancos usam códigos aleatórios)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE SEQUENCE IF NOT EXISTS operacao_cod_req_seq '
+        f'INCREMENT BY {TAMANHO_BLOCO} MINVALUE 1 START WITH 1'
+    )
+
+
+def remover_sequence(apps, schema_editor):
+    """Remove a sequence."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP SEQUENCE IF EXISTS operacao_cod_req_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacao', '0037_add_status_automacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_sequence, remover_sequence),
+    ]
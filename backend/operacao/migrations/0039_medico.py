@@ -0,0 +1,67 @@
+# Diretório local de médicos (FEMME/Korus) com índice trigram no nome
+
+from django.db import migrations, models
+
+
+def criar_indice_trigram(apps, schema_editor):
+    """Índice trigram em medico.nome (somente PostgreSQL; acelera busca por nome com ILIKE)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        disponivel = cursor.fetchone() is not None
+    if not disponivel:
+        # Índice opcional: sem o contrib instalado a busca por nome apenas fica sem índice
+        print('\n  ⚠️  Extensão pg_trgm indisponível: índice trigram de medico.nome não criado.')
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_medico_nome_trgm ON medico USING gin (nome gin_trgm_ops)'
+    )
+
+
+def remover_indice_trigram(apps, schema_editor):
+    """Remove o índice trigram (a extensão pg_trgm é mantida)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS idx_medico_nome_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacao', '0038_cod_req_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Medico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('crm', models.CharField(help_text='CRM normalizado (sem pontuação)', max_length=20, verbose_name='CRM')),
+                ('uf', models.CharField(max_length=2, verbose_name='UF')),
+                ('fonte', models.CharField(choices=[('FEMME', 'FEMME'), ('KORUS', 'Korus')], max_length=10, verbose_name='Fonte')),
+                ('nome', models.CharField(blank=True, default='', max_length=200, verbose_name='Nome')),
+                ('endereco', models.CharField(blank=True, default='', max_length=255, verbose_name='Endereço')),
+                ('destino', models.CharField(blank=True, default='', max_length=100, verbose_name='Destino')),
+                ('dados', models.JSONField(blank=True, default=dict, help_text='Retorno da API de origem, usado para responder sem consultá-la', verbose_name='Dados da Fonte')),
+                ('sincronizado_em', models.DateTimeField(help_text='Data da última confirmação na API de origem', verbose_name='Sincronizado em')),
+            ],
+            options={
+                'verbose_name': 'Médico',
+                'verbose_name_plural': 'Médicos',
+                'db_table': 'medico',
+                'ordering': ('uf', 'crm', 'fonte'),
+                'indexes': [
+                    models.Index(fields=['crm', 'uf'], name='idx_medico_crm_uf'),
+                    models.Index(fields=['sincronizado_em'], name='idx_medico_sincronizado'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('crm', 'uf', 'fonte'), name='uniq_medico_crm_uf_fonte'),
+                ],
+            },
+        ),
+        migrations.RunPython(criar_indice_trigram, remover_indice_trigram),
+    ]
@@ -0,0 +1,49 @@
+# Tamanho informado no upload e verificação em segundo plano do arquivo no bucket
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacao', '0039_medico'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requisicaoarquivo',
+            name='tamanho_bytes',
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                help_text='Tamanho informado pelo cliente ao confirmar o upload',
+                null=True,
+                verbose_name='Tamanho (bytes)',
+            ),
+        ),
+        migrations.AddField(
+            model_name='requisicaoarquivo',
+            name='verificacao',
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ('PENDENTE', 'Pendente'),
+                    ('OK', 'Verificado'),
+                    ('AUSENTE', 'Não encontrado no bucket'),
+                    ('TAMANHO_DIVERGENTE', 'Tamanho divergente'),
+                ],
+                default='',
+                help_text='Resultado da verificação em segundo plano (vazio: arquivos anteriores à verificação)',
+                max_length=20,
+                verbose_name='Verificação no bucket',
+            ),
+        ),
+        migrations.AddField(
+            model_name='requisicaoarquivo',
+            name='verificado_em',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Verificado em'),
+        ),
+        migrations.AddIndex(
+            model_name='requisicaoarquivo',
+            index=models.Index(fields=['verificacao', 'data_upload'], name='idx_arquivo_verificacao'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Um arquivo (URL) por requisição: reenvios da confirmação de upload não duplicam registros
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remover_duplicados(apps, schema_editor):
+    """Mantém o registro mais antigo de cada (requisicao, url_arquivo) repetido."""
+    RequisicaoArquivo = apps.get_model('operacao', 'RequisicaoArquivo')
+    repetidos = (
+        RequisicaoArquivo.objects.values('requisicao_id', 'url_arquivo')
+        .annotate(total=Count('id'), primeiro=Min('id'))
+        .filter(total__gt=1)
+    )
+    for item in repetidos:
+        RequisicaoArquivo.objects.filter(
+            requisicao_id=item['requisicao_id'], url_arquivo=item['url_arquivo'],
+        ).exclude(id=item['primeiro']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operacao', '0040_requisicaoarquivo_verificacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='requisicaoarquivo',
+            constraint=models.UniqueConstraint(fields=('requisicao', 'url_arquivo'), name='uniq_arquivo_requisicao_url'),
+        ),
+    ]
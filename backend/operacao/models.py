@@ -2,7 +2,7 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
-from core.models import AuditModel, TimeStampedModel
+from core.models import AuditModel, ContadorDiario, TimeStampedModel
 
 
 class Unidade(TimeStampedModel):
@@ -898,6 +898,12 @@ class RequisicaoArquivo(AuditModel):
     Arquivos anexados a uma requisição.
     Armazena uploads de imagens, PDFs, documentos relacionados à requisição.
     """
+    class Verificacao(models.TextChoices):
+        PENDENTE = 'PENDENTE', 'Pendente'
+        OK = 'OK', 'Verificado'
+        AUSENTE = 'AUSENTE', 'Não encontrado no bucket'
+        TAMANHO_DIVERGENTE = 'TAMANHO_DIVERGENTE', 'Tamanho divergente'
+
     requisicao = models.ForeignKey(
         DadosRequisicao,
         on_delete=models.CASCADE,
@@ -939,23 +945,75 @@ class RequisicaoArquivo(AuditModel):
         auto_now_add=True,
         db_index=True,
     )
+    tamanho_bytes = models.PositiveBigIntegerField(
+        'Tamanho (bytes)',
+        null=True,
+        blank=True,
+        help_text='Tamanho informado pelo cliente ao confirmar o upload',
+    )
+    verificacao = models.CharField(
+        'Verificação no bucket',
+        max_length=20,
+        choices=Verificacao.choices,
+        blank=True,
+        default='',
+        help_text='Resultado da verificação em segundo plano (vazio: arquivos anteriores à verificação)',
+    )
+    verificado_em = models.DateTimeField(
+        'Verificado em',
+        null=True,
+        blank=True,
+    )
     
     class Meta:
         ordering = ('-data_upload',)
         verbose_name = 'Arquivo da Requisição'
         verbose_name_plural = 'Arquivos das Requisições'
         indexes = [
+            models.Index(fields=['verificacao', 'data_upload'], name='idx_arquivo_verificacao'),
             models.Index(fields=['requisicao', '-data_upload']),
             models.Index(fields=['cod_req', '-data_upload']),
             models.Index(fields=['tipo_arquivo', '-data_upload']),
             models.Index(fields=['cod_tipo_arquivo', '-data_upload']),
             models.Index(fields=['requisicao', 'cod_tipo_arquivo']),
         ]
+        constraints = [
+            # Reenvio da confirmação não duplica o arquivo
+            models.UniqueConstraint(fields=['requisicao', 'url_arquivo'], name='uniq_arquivo_requisicao_url'),
+        ]
     
     def __str__(self) -> str:
         return f'{self.cod_req} - {self.nome_arquivo}'
 
 
+def gerar_codigo_diario(model, sigla: str) -> str:
+    """
+    Gera código único no formato SIGLA-YYYYMMDD-XXXX para o model informado.
+    
+    O número é obtido atomicamente de core.ContadorDiario. Na primeira
+    emissão do dia o contador é reconciliado com o maior código já existente
+    na tabela (ex.: registros criados antes da adoção do contador).
+    """
+    from datetime import datetime
+    agora = datetime.now()
+    prefixo = f'{sigla}-{agora:%Y%m%d}-'
+    
+    def ultimo_numero_emitido():
+        ultimo = (
+            model.objects.filter(codigo__startswith=prefixo)
+            .order_by('-codigo')
+            .values_list('codigo', flat=True)
+            .first()
+        )
+        try:
+            return int(ultimo.split('-')[-1]) if ultimo else 0
+        except ValueError:
+            return 0
+    
+    numero = ContadorDiario.proximo(sigla, agora.date(), valor_inicial=ultimo_numero_emitido)
+    return f'{prefixo}{numero:04d}'
+
+
 class Protocolo(AuditModel):
     """
     Protocolo de cadastro de médico/requisição.
@@ -1070,25 +1128,7 @@ class Protocolo(AuditModel):
     @classmethod
     def _gerar_codigo(cls):
         """Gera código único no formato PROT-YYYYMMDD-XXXX"""
-        from datetime import datetime
-        hoje = datetime.now().strftime('%Y%m%d')
-        prefixo = f'PROT-{hoje}-'
-        
-        # Buscar último protocolo do dia
-        ultimo = cls.objects.filter(
-            codigo__startswith=prefixo
-        ).order_by('-codigo').first()
-        
-        if ultimo:
-            try:
-                ultimo_num = int(ultimo.codigo.split('-')[-1])
-                novo_num = ultimo_num + 1
-            except (ValueError, IndexError):
-                novo_num = 1
-        else:
-            novo_num = 1
-        
-        return f'{prefixo}{novo_num:04d}'
+        return gerar_codigo_diario(cls, 'PROT')
 
 
 # ============================================
@@ -1316,24 +1356,7 @@ class Tarefa(TimeStampedModel):
     @classmethod
     def _gerar_codigo(cls):
         """Gera código único no formato TAR-YYYYMMDD-XXXX"""
-        from datetime import datetime
-        hoje = datetime.now().strftime('%Y%m%d')
-        prefixo = f'TAR-{hoje}-'
-        
-        ultimo = cls.objects.filter(
-            codigo__startswith=prefixo
-        ).order_by('-codigo').first()
-        
-        if ultimo:
-            try:
-                ultimo_num = int(ultimo.codigo.split('-')[-1])
-                novo_num = ultimo_num + 1
-            except (ValueError, IndexError):
-                novo_num = 1
-        else:
-            novo_num = 1
-        
-        return f'{prefixo}{novo_num:04d}'
+        return gerar_codigo_diario(cls, 'TAR')
     
     @property
     def esta_atrasada(self) -> bool:
@@ -1664,3 +1687,51 @@ class RequisicaoExame(AuditModel):
 
     def __str__(self) -> str:
         return f'{self.cod_req} - {self.tipo_amostra.descricao} ({self.tipo_atendimento.descricao})'
+
+
+class Medico(TimeStampedModel):
+    """
+    Diretório local de médicos solicitantes (espelho de FEMME e Korus).
+
+    Cada linha guarda o resultado de uma consulta bem-sucedida a uma fonte
+    para um CRM/UF. É preenchido pelo comando `sincronizar_medicos` e a cada
+    consulta online bem-sucedida; as views de validação consultam o diretório
+    antes das APIs (ver diretorio_medicos.py).
+    """
+
+    class Fonte(models.TextChoices):
+        FEMME = 'FEMME', 'FEMME'
+        KORUS = 'KORUS', 'Korus'
+
+    crm = models.CharField('CRM', max_length=20, help_text='CRM normalizado (sem pontuação)')
+    uf = models.CharField('UF', max_length=2)
+    fonte = models.CharField('Fonte', max_length=10, choices=Fonte.choices)
+    nome = models.CharField('Nome', max_length=200, blank=True, default='')
+    endereco = models.CharField('Endereço', max_length=255, blank=True, default='')
+    destino = models.CharField('Destino', max_length=100, blank=True, default='')
+    dados = models.JSONField(
+        'Dados da Fonte',
+        default=dict,
+        blank=True,
+        help_text='Retorno da API de origem, usado para responder sem consultá-la',
+    )
+    sincronizado_em = models.DateTimeField(
+        'Sincronizado em',
+        help_text='Data da última confirmação na API de origem',
+    )
+
+    class Meta:
+        db_table = 'medico'
+        ordering = ('uf', 'crm', 'fonte')
+        verbose_name = 'Médico'
+        verbose_name_plural = 'Médicos'
+        constraints = [
+            models.UniqueConstraint(fields=['crm', 'uf', 'fonte'], name='uniq_medico_crm_uf_fonte'),
+        ]
+        indexes = [
+            models.Index(fields=['crm', 'uf'], name='idx_medico_crm_uf'),
+            models.Index(fields=['sincronizado_em'], name='idx_medico_sincronizado'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.crm}/{self.uf} - {self.nome} ({self.fonte})'
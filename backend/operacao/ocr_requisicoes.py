@@ -0,0 +1,169 @@
+"""
+OCR em segundo plano das requisições digitalizadas.
+
+A confirmação do upload de arquivos do tipo REQUISICAO (cod_tipo_arquivo=1)
+agenda o OCR da requisição depois do commit. O OCR roda fora da requisição
+HTTP (ver segundo_plano.py; OCR_THREADS threads por processo, padrão 2), em
+lotes de até OCR_LOTE requisições: sob carga, vários uploads seguidos viram
+poucas chamadas à API de OCR.
+
+- Os PDFs são baixados pela URL pública (url_arquivo) e enviados em lote a
+  core.services.ocr, que guarda o resultado pelo hash do conteúdo:
+  redigitalizações e arquivos duplicados não voltam à API.
+- Os dados extraídos preenchem apenas os campos ainda vazios de
+  DadosRequisicao (paciente e médico), e flag_ocr é marcada. A etapa 2 da
+  triagem já abre com os campos preenchidos; o que o operador digitou
+  nunca é sobrescrito.
+- Falhas (download ou API) mantêm a requisição com flag_ocr=False; o
+  comando `processar_ocr` as retoma.
+
+Sem OCR_API_URL configurada nada é agendado.
+
+Uso:
+    from .ocr_requisicoes import agendar_ocr
+
+    agendar_ocr([requisicao.id])
+"""
+import logging
+import os
+import re
+from datetime import date
+from typing import Iterable, Optional
+
+from django.db import transaction
+
+from core.services.http_pool import http_request
+from core.services.ocr import get_ocr_client, hash_conteudo
+
+from .models import DadosRequisicao, RequisicaoArquivo
+from .segundo_plano import TarefaSegundoPlano
+
+logger = logging.getLogger(__name__)
+
+COD_TIPO_REQUISICAO = 1
+LOTE = max(int(os.getenv('OCR_LOTE', '5')), 1)
+TIMEOUT_DOWNLOAD = float(os.getenv('OCR_DOWNLOAD_TIMEOUT', '30'))
+
+
+def agendar_ocr(ids: Iterable[int]) -> None:
+    """Agenda o OCR das requisições após o commit da transação corrente."""
+    if get_ocr_client().configurado:
+        _ocr.agendar(ids)
+
+
+def baixar_arquivo(url: str) -> Optional[bytes]:
+    """Conteúdo do arquivo pela URL pública, ou None em caso de falha."""
+    try:
+        response = http_request('GET', url, timeout=TIMEOUT_DOWNLOAD, idempotente=True)
+    except Exception as e:
+        logger.warning('OCR: erro ao baixar %s: %s', url, str(e))
+        return None
+    if response.status_code != 200:
+        logger.warning('OCR: HTTP %d ao baixar %s', response.status_code, url)
+        return None
+    return response.content
+
+
+def campos_ocr(dados: dict) -> dict:
+    """
+    Normaliza os dados devolvidos pelo OCR para os campos de DadosRequisicao.
+
+    Valores ilegíveis (CPF sem 11 dígitos, data inválida...) são descartados.
+    """
+    campos = {}
+    nome_paciente = str(dados.get('nome_paciente') or '').strip().upper()[:200]
+    if nome_paciente:
+        campos['nome_paciente'] = nome_paciente
+    cpf = re.sub(r'\D', '', str(dados.get('cpf_paciente') or ''))
+    if len(cpf) == 11:
+        campos['cpf_paciente'] = cpf
+    try:
+        campos['data_nasc_paciente'] = date.fromisoformat(str(dados.get('data_nasc_paciente') or ''))
+    except ValueError:
+        pass
+    crm = re.sub(r'\D', '', str(dados.get('crm') or ''))
+    if crm:
+        campos['crm'] = crm[:20]
+    uf = str(dados.get('uf_crm') or '').strip().upper()
+    if re.fullmatch(r'[A-Z]{2}', uf):
+        campos['uf_crm'] = uf
+    nome_medico = str(dados.get('nome_medico') or '').strip().upper()[:200]
+    if nome_medico:
+        campos['nome_medico'] = nome_medico
+    return campos
+
+
+def processar_requisicoes(ids: Iterable[int]) -> dict:
+    """
+    Executa o OCR das requisições ainda sem OCR entre os IDs informados.
+
+    Returns:
+        Contagem: processadas (flag_ocr marcada), pendentes (falha; nova
+        tentativa depois) e sem_arquivo (nenhum arquivo do tipo REQUISICAO)
+    """
+    resultados = {'processadas': 0, 'pendentes': 0, 'sem_arquivo': 0}
+    pendentes = list(
+        DadosRequisicao.objects.filter(id__in=list(ids), flag_ocr=False).values_list('id', flat=True)
+    )
+    arquivos = {}
+    for arquivo in (
+        RequisicaoArquivo.objects.filter(requisicao_id__in=pendentes, cod_tipo_arquivo=COD_TIPO_REQUISICAO)
+        .exclude(verificacao=RequisicaoArquivo.Verificacao.AUSENTE)
+        .order_by('id')
+        .only('id', 'requisicao_id', 'url_arquivo')
+    ):
+        arquivos.setdefault(arquivo.requisicao_id, []).append(arquivo)
+    resultados['sem_arquivo'] = len(pendentes) - len(arquivos)
+
+    # Baixa os arquivos do lote; o cliente de OCR envia à API só os que não estão no cache
+    documentos = {}
+    hashes = {}
+    for requisicao_id, lista in arquivos.items():
+        hashes[requisicao_id] = []
+        for arquivo in lista:
+            conteudo = baixar_arquivo(arquivo.url_arquivo)
+            if conteudo is None:
+                hashes[requisicao_id] = None
+                break
+            chave = hash_conteudo(conteudo)
+            documentos[chave] = conteudo
+            hashes[requisicao_id].append(chave)
+
+    extraidos = get_ocr_client().extrair(documentos) if documentos else {}
+    del documentos
+
+    for requisicao_id, chaves in hashes.items():
+        if chaves is None or any(extraidos.get(chave) is None for chave in chaves):
+            resultados['pendentes'] += 1
+            continue
+        # Várias páginas: vale o primeiro valor legível de cada campo
+        campos = {}
+        for chave in chaves:
+            for campo, valor in campos_ocr(extraidos[chave]).items():
+                campos.setdefault(campo, valor)
+        _aplicar(requisicao_id, campos)
+        resultados['processadas'] += 1
+
+    if resultados['pendentes']:
+        logger.warning('OCR: %d requisição(ões) continuam pendentes', resultados['pendentes'])
+    return resultados
+
+
+def _aplicar(requisicao_id: int, campos: dict) -> None:
+    """Preenche os campos vazios da requisição e marca flag_ocr."""
+    with transaction.atomic():
+        requisicao = DadosRequisicao.objects.select_for_update().get(id=requisicao_id)
+        preenchidos = [campo for campo, valor in campos.items() if not getattr(requisicao, campo)]
+        for campo in preenchidos:
+            setattr(requisicao, campo, campos[campo])
+        requisicao.flag_ocr = True
+        requisicao.save(update_fields=[*preenchidos, 'flag_ocr', 'updated_at'])
+    logger.info('OCR aplicado à requisição %s (%d campo(s) preenchido(s))', requisicao.cod_req, len(preenchidos))
+
+
+_ocr = TarefaSegundoPlano(
+    'ocr-requisicao',
+    processar_requisicoes,
+    threads=int(os.getenv('OCR_THREADS', '2')),
+    lote=LOTE,
+)
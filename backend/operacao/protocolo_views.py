@@ -10,6 +10,7 @@ import logging
 import uuid
 from datetime import datetime
 
+import requests
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import JsonResponse
@@ -19,9 +20,10 @@ from django.views.generic import TemplateView
 from django_ratelimit.decorators import ratelimit
 
 from core.config import get_aws_signed_url_api, get_file_url
-from core.services.external_api import get_korus_client
+from core.services.http_pool import http_request
 from core.services.email_service import get_email_service
 from core.models import ConfiguracaoEmail
+from .diretorio_medicos import buscar_medico_korus
 from .models import (
     Origem,
     PortadorRepresentante,
@@ -138,9 +140,8 @@ class ValidarMedicoProtocoloView(LoginRequiredMixin, View):
                     status=400
                 )
             
-            # Chamar API Korus para validar médico
-            korus_client = get_korus_client()
-            response = korus_client.buscar_medico_por_crm(crm, uf)
+            # Diretório local / API Korus para validar médico (com cache por CRM/UF)
+            response = buscar_medico_korus(crm, uf)
             
             logger.info(f"Validação médico CRM={crm}, UF={uf} - success={response.success}")
             
@@ -158,6 +159,14 @@ class ValidarMedicoProtocoloView(LoginRequiredMixin, View):
                     }
                 })
             
+            # API indisponível (circuit breaker aberto)
+            if response.degradado:
+                return JsonResponse({
+                    'status': 'error',
+                    'code': 'unavailable',
+                    'message': response.error
+                }, status=503)
+            
             # Verificar se é caso de múltiplos médicos
             if response.data and response.data.get('quantidade', 0) > 1:
                 return JsonResponse({
@@ -219,7 +228,6 @@ class ObterSignedUrlProtocoloView(LoginRequiredMixin, View):
             filename = f"PROT_{timestamp}_{unique_id}.pdf"
             
             # Obter signed URL da API Lambda
-            import requests
             
             aws_signed_url_api = get_aws_signed_url_api()
             
@@ -250,7 +258,8 @@ class ObterSignedUrlProtocoloView(LoginRequiredMixin, View):
             logger.info(f"[SignedURL] Payload: {lambda_payload}")
             
             try:
-                response = requests.post(
+                response = http_request(
+                    'POST',
                     aws_signed_url_api,
                     json=lambda_payload,
                     headers={
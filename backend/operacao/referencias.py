@@ -0,0 +1,315 @@
+"""
+Registro em memória das tabelas de referência do app operacao.
+
+Tabelas pequenas e quase estáticas (status, tipos de arquivo, tipos de
+pendência, unidades, portadores etc.) são consultadas em praticamente toda
+requisição. Este módulo mantém uma cópia por processo (worker do gunicorn)
+indexada por id/codigo.
+
+Invalidação entre workers:
+- Cada modelo registrado possui um "carimbo de versão" no Redis
+  ('referencias:versao:<app_label.model>').
+- Os signals post_save/post_delete (ver signals.py) incrementam a versão
+  após o commit da transação.
+- Cada worker compara sua versão local com a do Redis no máximo a cada
+  REFERENCIAS_INTERVALO_VERIFICACAO segundos e recarrega a tabela quando
+  a versão mudou. Uma chave não encontrada força a verificação imediata.
+- Se o Redis estiver indisponível, a cópia local expira após
+  REFERENCIAS_TTL_MAXIMO segundos (rede de segurança).
+
+Uso:
+    from .referencias import obter_referencia
+
+    status = obter_referencia(StatusRequisicao, codigo='1')
+    tipo = obter_referencia(TipoArquivo, codigo=1, ativo=True)
+
+As instâncias retornadas são compartilhadas pelo processo e devem ser
+tratadas como somente leitura.
+
+Payloads derivados (listas já serializadas para templates/JSON) usam os
+mesmos carimbos de versão através de obter_payload(): a chave do cache
+inclui as versões dos modelos de origem, então qualquer alteração gera uma
+chave nova sem necessidade de limpeza manual.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.services.redis_client import get_redis, make_key
+
+logger = logging.getLogger(__name__)
+
+VERSAO_CACHE_KEY = 'referencias:versao:{label}'
+PAYLOAD_CACHE_KEY = 'referencias:payload:{nome}:{versoes}'
+INTERVALO_VERIFICACAO = getattr(settings, 'REFERENCIAS_INTERVALO_VERIFICACAO', 2)
+TTL_MAXIMO = getattr(settings, 'REFERENCIAS_TTL_MAXIMO', 300)
+
+# Payloads: fração final do TTL em que um único worker recalcula antecipadamente
+PAYLOAD_JANELA_RECALCULO = 0.1
+PAYLOAD_LOCK_TIMEOUT = 30
+PAYLOAD_ESPERA_MAXIMA = 2.0
+
+
+class RegistroReferencias:
+    """
+    Cache por processo de modelos de referência, indexado pelos campos-chave
+    informados no registro (sempre inclui 'id').
+    """
+
+    def __init__(self):
+        self._modelos = {}
+        self._tabelas = {}
+        self._lock = threading.RLock()
+
+    def registrar(self, model, chaves=('id',)):
+        """Registra um modelo e os campos únicos usados para consulta."""
+        chaves = tuple(dict.fromkeys(('id',) + tuple(chaves)))
+        self._modelos[model._meta.label] = (model, chaves)
+
+    def modelos(self):
+        """Retorna os modelos registrados."""
+        return [model for model, _ in self._modelos.values()]
+
+    def esta_registrado(self, model) -> bool:
+        return model._meta.label in self._modelos
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def obter(self, model, **lookup):
+        """
+        Equivalente a model.objects.get(**lookup) usando a cópia em memória.
+
+        O primeiro campo-chave presente no lookup localiza a instância; os
+        demais campos são comparados como filtros adicionais.
+
+        Raises:
+            model.DoesNotExist: se nenhuma instância atender ao lookup
+        """
+        label = model._meta.label
+        if label not in self._modelos:
+            return model.objects.get(**lookup)
+
+        _, chaves = self._modelos[label]
+        campo_chave = next((campo for campo in chaves if campo in lookup), None)
+        if campo_chave is None:
+            raise ValueError(
+                f'Lookup {sorted(lookup)} não contém campo-chave de {label} {chaves}'
+            )
+
+        try:
+            valores = {
+                campo: model._meta.get_field(campo).to_python(valor)
+                for campo, valor in lookup.items()
+            }
+        except ValidationError:
+            raise model.DoesNotExist(f'{model.__name__} não encontrado: {lookup}')
+
+        valor_chave = valores.pop(campo_chave)
+        instancia = self._tabela(model)[campo_chave].get(valor_chave)
+        if instancia is None:
+            # Registro pode ter sido criado por outro worker dentro do intervalo
+            instancia = self._tabela(model, forcar_verificacao=True)[campo_chave].get(valor_chave)
+
+        if instancia is None or any(
+            getattr(instancia, campo) != valor for campo, valor in valores.items()
+        ):
+            raise model.DoesNotExist(f'{model.__name__} não encontrado: {lookup}')
+
+        return instancia
+
+    def obter_opcional(self, model, **lookup):
+        """Equivalente a model.objects.filter(**lookup).first()."""
+        try:
+            return self.obter(model, **lookup)
+        except model.DoesNotExist:
+            return None
+
+    # ------------------------------------------------------------------
+    # Carga e invalidação
+    # ------------------------------------------------------------------
+
+    def _tabela(self, model, forcar_verificacao=False):
+        label = model._meta.label
+        agora = time.monotonic()
+        entrada = self._tabelas.get(label)
+
+        if (
+            entrada
+            and not forcar_verificacao
+            and agora - entrada['verificado_em'] < INTERVALO_VERIFICACAO
+        ):
+            return entrada['indices']
+
+        versao = self._versao_remota(label)
+
+        if (
+            entrada
+            and entrada['versao'] == versao
+            and agora - entrada['carregado_em'] < TTL_MAXIMO
+        ):
+            entrada['verificado_em'] = agora
+            return entrada['indices']
+
+        with self._lock:
+            _, chaves = self._modelos[label]
+            instancias = list(model.objects.all())
+            indices = {
+                campo: {getattr(obj, campo): obj for obj in instancias}
+                for campo in chaves
+            }
+            self._tabelas[label] = {
+                'versao': versao,
+                'verificado_em': agora,
+                'carregado_em': agora,
+                'indices': indices,
+            }
+
+        logger.debug('Referências %s carregadas (versão %s, %d registros)', label, versao, len(instancias))
+        return indices
+
+    @staticmethod
+    def _versao_remota(label):
+        return cache.get(VERSAO_CACHE_KEY.format(label=label), 0)
+
+    def invalidar_local(self, model):
+        """Descarta a cópia local do modelo (somente neste processo)."""
+        self._tabelas.pop(model._meta.label, None)
+
+    def invalidar(self, model):
+        """
+        Invalida o modelo em todos os workers.
+
+        A cópia local é descartada imediatamente e o carimbo de versão no
+        Redis é incrementado após o commit da transação corrente, evitando
+        que outro worker recarregue dados ainda não commitados.
+        """
+        self.invalidar_local(model)
+
+        def incrementar_versao():
+            self.invalidar_local(model)
+            chave = VERSAO_CACHE_KEY.format(label=model._meta.label)
+            redis = get_redis()
+            try:
+                if redis is not None:
+                    # INCR cria a chave se necessário, sem corrida entre workers
+                    redis.incr(make_key(chave))
+                    return
+            except Exception as e:
+                logger.warning('Falha ao incrementar versão de %s: %s', model._meta.label, str(e))
+            cache.set(chave, int(time.time()), timeout=None)
+
+        transaction.on_commit(incrementar_versao)
+
+    def limpar(self):
+        """Descarta todas as cópias locais."""
+        self._tabelas.clear()
+
+
+registro = RegistroReferencias()
+
+
+def obter_payload(nome, modelos, construir, ttl=3600):
+    """
+    Retorna um payload derivado de modelos de referência, com cache versionado.
+
+    A chave inclui o carimbo de versão de cada modelo, portanto salvar ou
+    excluir qualquer registro desses modelos invalida o payload em todos os
+    workers. Proteção contra stampede:
+    - Na janela final do TTL, apenas o worker que obtiver o lock recalcula;
+      os demais continuam servindo o valor atual.
+    - Em caso de ausência (versão nova ou expiração), apenas o dono do lock
+      recalcula; os demais aguardam até PAYLOAD_ESPERA_MAXIMA segundos pelo
+      valor e, esgotado o prazo, calculam sem gravar.
+
+    Args:
+        nome: Identificador do payload (ex: 'recebimento')
+        modelos: Modelos cujos dados compõem o payload
+        construir: Callable sem argumentos que monta o payload (serializável)
+        ttl: Tempo de vida em segundos
+
+    Returns:
+        O payload construído (ou lido do cache)
+    """
+    chaves_versao = [VERSAO_CACHE_KEY.format(label=model._meta.label) for model in modelos]
+    versoes_atuais = cache.get_many(chaves_versao)
+    versoes = '-'.join(str(versoes_atuais.get(chave, 0)) for chave in chaves_versao)
+
+    chave = PAYLOAD_CACHE_KEY.format(nome=nome, versoes=versoes)
+    chave_lock = f'{chave}:lock'
+
+    def recalcular():
+        dados = construir()
+        cache.set(
+            chave,
+            {'dados': dados, 'recalcular_em': time.time() + ttl * (1 - PAYLOAD_JANELA_RECALCULO)},
+            ttl,
+        )
+        cache.delete(chave_lock)
+        return dados
+
+    entrada = cache.get(chave)
+    if entrada is not None:
+        if time.time() >= entrada['recalcular_em'] and cache.add(chave_lock, 1, PAYLOAD_LOCK_TIMEOUT):
+            logger.debug('Recalculando payload %s antecipadamente', nome)
+            return recalcular()
+        return entrada['dados']
+
+    if cache.add(chave_lock, 1, PAYLOAD_LOCK_TIMEOUT):
+        return recalcular()
+
+    # Outro worker está recalculando: aguardar o valor enquanto o lock existir
+    limite = time.monotonic() + PAYLOAD_ESPERA_MAXIMA
+    while time.monotonic() < limite and cache.get(chave_lock) is not None:
+        time.sleep(0.05)
+        entrada = cache.get(chave)
+        if entrada is not None:
+            return entrada['dados']
+
+    logger.debug('Payload %s calculado sem cache (lock indisponível)', nome)
+    return construir()
+
+
+def obter_referencia(model, **lookup):
+    """Atalho para registro.obter()."""
+    return registro.obter(model, **lookup)
+
+
+def obter_referencia_opcional(model, **lookup):
+    """Atalho para registro.obter_opcional()."""
+    return registro.obter_opcional(model, **lookup)
+
+
+def _registrar_modelos():
+    from .models import (
+        MotivoAlteracaoAmostra,
+        MotivoArmazenamentoInadequado,
+        Origem,
+        PortadorRepresentante,
+        StatusRequisicao,
+        TipoAmostra,
+        TipoArquivo,
+        TipoAtendimento,
+        TipoPendencia,
+        Unidade,
+    )
+
+    registro.registrar(StatusRequisicao, chaves=('codigo',))
+    registro.registrar(TipoArquivo, chaves=('codigo',))
+    registro.registrar(TipoPendencia, chaves=('codigo',))
+    registro.registrar(TipoAtendimento, chaves=('codigo',))
+    registro.registrar(MotivoArmazenamentoInadequado, chaves=('codigo',))
+    registro.registrar(MotivoAlteracaoAmostra)
+    registro.registrar(TipoAmostra)
+    registro.registrar(Unidade)
+    registro.registrar(PortadorRepresentante)
+    registro.registrar(Origem)
+
+
+_registrar_modelos()
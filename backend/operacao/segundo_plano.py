@@ -0,0 +1,138 @@
+"""
+Tarefas em segundo plano disparadas pela confirmação de upload.
+
+A verificação dos arquivos (verificacao_arquivos.py) e o OCR das requisições
+(ocr_requisicoes.py) rodam fora da requisição HTTP, com o mesmo mecanismo:
+
+- TarefaSegundoPlano: pool de threads limitado por processo. Os IDs são
+  enfileirados depois do commit da transação corrente e as tarefas do pool
+  esvaziam a fila em lotes de até `lote` IDs, de modo que vários uploads
+  seguidos viram poucas passadas. Erros são registrados no log e a conexão
+  com o banco é fechada ao fim de cada tarefa.
+- ComandoPendentes: base dos comandos de retomada. Tarefas perdidas em
+  reinícios do worker ou que falharam (rede, API fora do ar) ficam
+  pendentes no banco; o comando as busca, divide em lotes e processa em
+  paralelo. Pode ser agendado no cron (ex: a cada 10 minutos).
+
+Uso:
+    verificacao = TarefaSegundoPlano(
+        'verificacao-upload', verificar_arquivos,
+        threads=int(os.getenv('UPLOAD_VERIFICACAO_THREADS', '2')), lote=100,
+    )
+    verificacao.agendar([arquivo.id for arquivo in novos])
+"""
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+from typing import Callable, Iterable, List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class TarefaSegundoPlano:
+    """Processa IDs em lotes, em um pool de threads do processo, após o commit."""
+
+    def __init__(self, nome: str, processar: Callable[[List[int]], dict], threads: int, lote: int):
+        self.nome = nome
+        self.processar = processar
+        self.lote = max(lote, 1)
+        self._executor = ThreadPoolExecutor(max_workers=max(threads, 1), thread_name_prefix=nome)
+        # IDs aguardando processamento (dict como conjunto ordenado)
+        self._fila = {}
+        self._fila_lock = threading.Lock()
+
+    def agendar(self, ids: Iterable[int]) -> None:
+        """Processa os IDs em segundo plano após o commit da transação corrente."""
+        ids = list(ids)
+        if ids:
+            transaction.on_commit(lambda: self._enfileirar(ids))
+
+    def _enfileirar(self, ids) -> None:
+        with self._fila_lock:
+            self._fila.update(dict.fromkeys(ids))
+        self._executor.submit(self._processar_fila)
+
+    def _processar_fila(self) -> None:
+        try:
+            # Esvazia a fila: um agendamento pode trazer mais IDs que um lote
+            while ids := self._retirar_lote():
+                try:
+                    self.processar(ids)
+                except Exception:
+                    logger.exception('Erro em %s (%d item(ns))', self.nome, len(ids))
+        finally:
+            # A thread do pool não passa pelo ciclo de requisição que fecha a conexão
+            connections.close_all()
+
+    def _retirar_lote(self) -> List[int]:
+        with self._fila_lock:
+            ids = list(islice(self._fila, self.lote))
+            for id_ in ids:
+                del self._fila[id_]
+        return ids
+
+
+class ComandoPendentes(BaseCommand):
+    """
+    Base dos comandos que retomam tarefas de segundo plano pendentes.
+
+    Subclasses definem pendentes() (IDs a processar), processar() (um lote,
+    retorna contagem por resultado) e relatorio() (resumo dos totais).
+    """
+
+    threads_padrao = 2
+    lote_padrao = 100
+    descricao_minutos = 'Considera apenas itens enviados há mais de N minutos (padrão: 5)'
+    mensagem_nenhum = '✅ Nada pendente.'
+    mensagem_inicio = '🔄 Processando {total} item(ns) com {threads} thread(s)...'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutos', type=int, default=5, help=self.descricao_minutos)
+        parser.add_argument(
+            '--threads', type=int, default=self.threads_padrao,
+            help=f'Lotes simultâneos (padrão: {self.threads_padrao})',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=self.lote_padrao,
+            help=f'Itens por lote (padrão: {self.lote_padrao})',
+        )
+
+    def pendentes(self, limite, options) -> List[int]:
+        raise NotImplementedError
+
+    def processar(self, ids: List[int]) -> dict:
+        raise NotImplementedError
+
+    def relatorio(self, totais: Counter) -> None:
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['lote'] < 1:
+            raise CommandError('❌ --threads e --lote devem ser maiores que zero.')
+
+        limite = timezone.now() - timedelta(minutes=options['minutos'])
+        ids = list(self.pendentes(limite, options))
+        if not ids:
+            self.stdout.write(self.style.SUCCESS(self.mensagem_nenhum))
+            return
+
+        self.stdout.write(self.mensagem_inicio.format(total=len(ids), threads=options['threads']))
+        lotes = [ids[i:i + options['lote']] for i in range(0, len(ids), options['lote'])]
+        totais = Counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            for resultados in executor.map(self._processar_lote, lotes):
+                totais.update(resultados)
+        self.relatorio(totais)
+
+    def _processar_lote(self, ids):
+        try:
+            return self.processar(ids)
+        finally:
+            connections.close_all()
@@ -1,10 +1,14 @@
 import logging
+import os
 import secrets
 import string
+import threading
 from typing import Dict, List, Optional
 
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, connections, transaction
+
+from core.services.redis_client import get_redis, make_key
 
 from .models import (
     DadosRequisicao,
@@ -16,6 +20,7 @@ from .models import (
     PortadorRepresentante,
     Origem,
 )
+from .referencias import obter_referencia
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +39,253 @@ STATUS_BLOQUEIO_RECEBIMENTO = [
     '99',  # REJEITADA - Requisição foi rejeitada
 ]
 
+# Quantidade máxima de códigos de barras por chamada da localização em lote
+LIMITE_LOCALIZACAO_LOTE = 100
+
+
+class BloqueioRecebimentoCache:
+    """
+    Set no Redis com os cod_barras_req em STATUS_BLOQUEIO_RECEBIMENTO.
+    
+    Permite responder "já recebida" na bipagem sem consultar o Postgres.
+    Somente respostas positivas são usadas como atalho: se o código não
+    estiver no set (ou o Redis estiver indisponível), a busca segue para o
+    banco normalmente, que continua sendo a fonte da verdade.
+    
+    Manutenção:
+    - signals.py adiciona/remove o código a cada save()/delete() de DadosRequisicao
+    - operações em lote via queryset.update() chamam adicionar() explicitamente
+    - comando `reconstruir_bloqueio_recebimento` recria o set a partir do banco
+    
+    Durante a reconstrução (marcador CHAVE:reconstruindo), cada alteração
+    feita pelos signals também é registrada em CHAVE:delta; ao final, o set
+    novo substitui o antigo e as alterações registradas são reaplicadas na
+    ordem, no mesmo script Lua (atômico). Assim um código bloqueado durante a
+    reconstrução não se perde no RENAME.
+    """
+    
+    CHAVE = 'recebimento:bloqueados'
+    # Validade (s) do marcador/delta caso a reconstrução seja interrompida
+    TTL_RECONSTRUCAO = 3600
+    
+    # KEYS: set, marcador, delta; ARGV: operação (sadd/srem), ttl, códigos...
+    _SCRIPT_ALTERAR = """
+    local registrar = redis.call('exists', KEYS[2]) == 1
+    for i = 3, #ARGV do
+        redis.call(ARGV[1], KEYS[1], ARGV[i])
+        if registrar then
+            redis.call('rpush', KEYS[3], ARGV[1] .. ':' .. ARGV[i])
+        end
+    end
+    if registrar then
+        redis.call('expire', KEYS[3], ARGV[2])
+    end
+    """
+    
+    # KEYS: set temporário, set, marcador, delta
+    _SCRIPT_CONCLUIR = """
+    if redis.call('exists', KEYS[1]) == 1 then
+        redis.call('rename', KEYS[1], KEYS[2])
+    else
+        redis.call('del', KEYS[2])
+    end
+    local alteracoes = redis.call('lrange', KEYS[4], 0, -1)
+    for _, item in ipairs(alteracoes) do
+        local separador = string.find(item, ':', 1, true)
+        redis.call(string.sub(item, 1, separador - 1), KEYS[2], string.sub(item, separador + 1))
+    end
+    redis.call('del', KEYS[3], KEYS[4])
+    return #alteracoes
+    """
+    
+    @classmethod
+    def contem(cls, cod_barras: str) -> bool:
+        conn = get_redis()
+        if conn is None:
+            return False
+        try:
+            return bool(conn.sismember(make_key(cls.CHAVE), cod_barras))
+        except Exception as e:
+            logger.warning('Falha ao consultar bloqueio de recebimento no Redis: %s', str(e))
+            return False
+    
+    @classmethod
+    def filtrar_bloqueados(cls, cod_barras: List[str]) -> set:
+        """Retorna o subconjunto de códigos presentes no set (uma ida ao Redis)."""
+        conn = get_redis()
+        if conn is None or not cod_barras:
+            return set()
+        try:
+            chave = make_key(cls.CHAVE)
+            pipe = conn.pipeline(transaction=False)
+            for cod in cod_barras:
+                pipe.sismember(chave, cod)
+            return {cod for cod, membro in zip(cod_barras, pipe.execute()) if membro}
+        except Exception as e:
+            logger.warning('Falha ao consultar bloqueio de recebimento no Redis: %s', str(e))
+            return set()
+    
+    @classmethod
+    def adicionar(cls, *cod_barras: str) -> None:
+        """Adiciona códigos ao set após o commit da transação corrente."""
+        cls._apos_commit('sadd', cod_barras)
+    
+    @classmethod
+    def remover(cls, *cod_barras: str) -> None:
+        """Remove códigos do set após o commit da transação corrente."""
+        cls._apos_commit('srem', cod_barras)
+    
+    @classmethod
+    def _apos_commit(cls, operacao: str, cod_barras) -> None:
+        cod_barras = [cod for cod in cod_barras if cod]
+        if not cod_barras:
+            return
+        
+        def executar():
+            conn = get_redis()
+            if conn is None:
+                return
+            chave = make_key(cls.CHAVE)
+            try:
+                conn.eval(
+                    cls._SCRIPT_ALTERAR, 3, chave, f'{chave}:reconstruindo', f'{chave}:delta',
+                    operacao, cls.TTL_RECONSTRUCAO, *cod_barras
+                )
+            except Exception as e:
+                logger.warning(
+                    'Falha ao atualizar bloqueio de recebimento no Redis (%s, %d códigos): %s',
+                    operacao, len(cod_barras), str(e)
+                )
+        
+        transaction.on_commit(executar)
+    
+    @classmethod
+    def reconstruir(cls, tamanho_lote: int = 5000) -> int:
+        """
+        Recria o set a partir do banco de forma atômica (set temporário + RENAME),
+        reaplicando as alterações feitas pelos signals durante a leitura.
+        
+        Returns:
+            Quantidade de códigos bloqueados carregados
+        
+        Raises:
+            RuntimeError: se o Redis estiver indisponível ou outra reconstrução
+                estiver em andamento
+        """
+        conn = get_redis()
+        if conn is None:
+            raise RuntimeError('Redis indisponível')
+        
+        chave = make_key(cls.CHAVE)
+        chave_temp = f'{chave}:reconstrucao'
+        marcador, delta = f'{chave}:reconstruindo', f'{chave}:delta'
+        # O marcador vem antes da leitura do banco: toda alteração posterior entra no delta
+        if not conn.set(marcador, 1, nx=True, ex=cls.TTL_RECONSTRUCAO):
+            raise RuntimeError('Reconstrução já em andamento')
+        try:
+            conn.delete(chave_temp, delta)
+            total = cls._carregar(conn, chave_temp, tamanho_lote)
+            reaplicadas = conn.eval(cls._SCRIPT_CONCLUIR, 4, chave_temp, chave, marcador, delta)
+        except BaseException:
+            conn.delete(marcador, delta, chave_temp)
+            raise
+        
+        logger.info(
+            'Set de bloqueio de recebimento reconstruído: %d códigos (%d alterações reaplicadas)',
+            total, reaplicadas
+        )
+        return total
+    
+    @staticmethod
+    def _carregar(conn, chave_temp: str, tamanho_lote: int) -> int:
+        codigos = (
+            DadosRequisicao.objects.filter(status__codigo__in=STATUS_BLOQUEIO_RECEBIMENTO)
+            .values_list('cod_barras_req', flat=True)
+            .iterator(chunk_size=tamanho_lote)
+        )
+        
+        total = 0
+        lote = []
+        for cod in codigos:
+            lote.append(cod)
+            if len(lote) >= tamanho_lote:
+                conn.sadd(chave_temp, *lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            conn.sadd(chave_temp, *lote)
+            total += len(lote)
+        return total
+
+
+class GeradorCodigoRequisicao:
+    """
+    Gera códigos de requisição (cod_req) únicos sem consultar a tabela.
+    
+    Em PostgreSQL cada worker reserva blocos de TAMANHO_BLOCO números na
+    sequence `operacao_cod_req_seq` (migration 0038) e os entrega localmente,
+    sem nenhuma query adicional até o bloco acabar. Cada número é embaralhado
+    por uma permutação de [0, 36^10) e codificado no mesmo alfabeto de 10
+    caracteres usado historicamente, de modo que números distintos geram
+    códigos distintos e códigos consecutivos não são previsíveis à primeira vista.
+    
+    Em outros bancos (SQLite de desenvolvimento) usa código aleatório. Em ambos
+    os casos, a constraint UNIQUE de cod_req é a garantia final: colisões com
+    códigos legados são tratadas como nova tentativa na inserção.
+    """
+    
+    ALFABETO = string.ascii_uppercase + string.digits
+    TAMANHO = 10
+    TAMANHO_BLOCO = 100  # Deve ser igual ao INCREMENT BY da sequence (migration 0038)
+    SEQUENCE = 'operacao_cod_req_seq'
+    
+    _MODULO = len(ALFABETO) ** TAMANHO
+    _MULTIPLICADOR = 2253933089146961  # Coprimo com 36: (n * M + D) mod 36^10 é uma permutação
+    _DESLOCAMENTO = 1103515245
+    
+    _lock = threading.Lock()
+    _pid = None
+    _proximo = 0
+    _limite = 0
+    
+    @classmethod
+    def proximo(cls, using: str = 'default') -> str:
+        """Retorna o próximo código de requisição."""
+        conexao = connections[using]
+        if conexao.vendor != 'postgresql':
+            return cls.aleatorio()
+        
+        with cls._lock:
+            # Blocos não são compartilhados entre processos (fork do gunicorn)
+            if cls._pid != os.getpid() or cls._proximo >= cls._limite:
+                with conexao.cursor() as cursor:
+                    cursor.execute('SELECT nextval(%s)', [cls.SEQUENCE])
+                    inicio = cursor.fetchone()[0]
+                cls._pid = os.getpid()
+                cls._proximo = inicio
+                cls._limite = inicio + cls.TAMANHO_BLOCO
+                logger.debug('Bloco de códigos reservado: %d-%d', inicio, cls._limite - 1)
+            
+            numero = cls._proximo
+            cls._proximo += 1
+        
+        return cls.codificar(numero)
+    
+    @classmethod
+    def codificar(cls, numero: int) -> str:
+        """Embaralha o número e o codifica em TAMANHO caracteres do ALFABETO."""
+        valor = (numero * cls._MULTIPLICADOR + cls._DESLOCAMENTO) % cls._MODULO
+        base = len(cls.ALFABETO)
+        caracteres = []
+        for _ in range(cls.TAMANHO):
+            valor, resto = divmod(valor, base)
+            caracteres.append(cls.ALFABETO[resto])
+        return ''.join(reversed(caracteres))
+    
+    @classmethod
+    def aleatorio(cls) -> str:
+        return ''.join(secrets.choice(cls.ALFABETO) for _ in range(cls.TAMANHO))
+
 
 class RequisicaoService:
     """
@@ -44,27 +296,38 @@ class RequisicaoService:
     """
     
     @staticmethod
-    def gerar_codigo_requisicao(tamanho: int = 10, max_tentativas: int = 10) -> str:
+    def gerar_codigo_requisicao() -> str:
         """
-        Gera código único alfanumérico para requisição.
+        Gera código alfanumérico para requisição (ver GeradorCodigoRequisicao).
+        """
+        return GeradorCodigoRequisicao.proximo()
+    
+    @classmethod
+    def inserir_requisicao(cls, max_tentativas: int = 5, **campos) -> DadosRequisicao:
         """
-        chars = string.ascii_uppercase + string.digits
+        Cria DadosRequisicao gerando o cod_req sem pré-verificação.
         
-        for tentativa in range(max_tentativas):
-            codigo = ''.join(secrets.choice(chars) for _ in range(tamanho))
-            
-            # Verificar se código já existe
-            if not DadosRequisicao.objects.filter(cod_req=codigo).exists():
-                logger.debug(
-                    'Código gerado com sucesso: %s (tentativa %d/%d)',
-                    codigo, tentativa + 1, max_tentativas
+        Colisões de cod_req (ex.: com códigos aleatórios legados) são detectadas
+        pela constraint UNIQUE e repetidas com um novo código dentro de um savepoint.
+        
+        Raises:
+            IntegrityError: se cod_barras_req já existir (bipagem concorrente)
+            ValueError: se não houver código livre após max_tentativas
+        """
+        for tentativa in range(1, max_tentativas + 1):
+            cod_req = cls.gerar_codigo_requisicao()
+            try:
+                with transaction.atomic():
+                    return DadosRequisicao.objects.create(cod_req=cod_req, **campos)
+            except IntegrityError:
+                if DadosRequisicao.objects.filter(cod_barras_req=campos.get('cod_barras_req')).exists():
+                    raise
+                logger.warning(
+                    'Colisão de cod_req %s (tentativa %d/%d)',
+                    cod_req, tentativa, max_tentativas
                 )
-                return codigo
         
-        logger.error(
-            'Falha ao gerar código único após %d tentativas',
-            max_tentativas
-        )
+        logger.error('Falha ao gerar código único após %d tentativas', max_tentativas)
         raise ValueError(
             f'Não foi possível gerar código único após {max_tentativas} tentativas'
         )
@@ -98,14 +361,18 @@ class RequisicaoService:
         portador_representante_id: int,
         origem_id: Optional[int] = None
     ) -> Dict[str, any]:
+        """
+        Resolve as FKs da nova requisição pelo registro em memória
+        (operacao.referencias), sem queries quando o registro está carregado.
+        """
         try:
-            unidade = Unidade.objects.get(id=unidade_id)
+            unidade = obter_referencia(Unidade, id=unidade_id)
         except Unidade.DoesNotExist:
             logger.error('Unidade não encontrada: ID=%s', unidade_id)
             raise ValidationError(f'Unidade com ID {unidade_id} não encontrada')
         
         try:
-            portador_representante = PortadorRepresentante.objects.get(id=portador_representante_id)
+            portador_representante = obter_referencia(PortadorRepresentante, id=portador_representante_id)
         except PortadorRepresentante.DoesNotExist:
             logger.error('Portador/Representante não encontrado: ID=%s', portador_representante_id)
             raise ValidationError(
@@ -115,13 +382,13 @@ class RequisicaoService:
         origem = None
         if origem_id:
             try:
-                origem = Origem.objects.get(id=origem_id)
+                origem = obter_referencia(Origem, id=origem_id)
             except Origem.DoesNotExist:
                 logger.error('Origem não encontrada: ID=%s', origem_id)
                 raise ValidationError(f'Origem com ID {origem_id} não encontrada')
         
         try:
-            status_inicial = StatusRequisicao.objects.get(codigo='1') # 1 = ABERTO NTO
+            status_inicial = obter_referencia(StatusRequisicao, codigo='1') # 1 = ABERTO NTO
         except StatusRequisicao.DoesNotExist:
             logger.critical('Status 1 (ABERTO_NTO) não encontrado no banco de dados!')
             raise ValidationError(
@@ -174,36 +441,41 @@ class RequisicaoService:
                 'message': str(e),
             }
         
-        try:
-            cod_req = cls.gerar_codigo_requisicao()
-        except ValueError as e:
-            logger.exception('Erro ao gerar código de requisição')
-            return {
-                'status': 'error',
-                'message': 'Erro ao gerar código. Tente novamente.',
-            }
-        
         try:
             from django.utils import timezone
             
             # 1. Criar DadosRequisicao (Tabela Principal)
             # NOTA: LogRecebimento será criado apenas ao finalizar kit (status RECEBIDO)
-            requisicao = DadosRequisicao.objects.create(
-                cod_req=cod_req,
-                cod_barras_req=cod_barras_req,
-                unidade=fks['unidade'],
-                status=fks['status_inicial'],
-                portador_representante=fks['portador_representante'],
-                origem=fks['origem'],
-                recebido_por=user,
-                created_by=user,
-                updated_by=user,
-            )
+            try:
+                requisicao = cls.inserir_requisicao(
+                    cod_barras_req=cod_barras_req,
+                    unidade=fks['unidade'],
+                    status=fks['status_inicial'],
+                    portador_representante=fks['portador_representante'],
+                    origem=fks['origem'],
+                    recebido_por=user,
+                    created_by=user,
+                    updated_by=user,
+                )
+            except ValueError:
+                logger.exception('Erro ao gerar código de requisição')
+                return {
+                    'status': 'error',
+                    'message': 'Erro ao gerar código. Tente novamente.',
+                }
+            except IntegrityError:
+                logger.warning('Código de barras já registrado (bipagem concorrente): %s', cod_barras_req)
+                return {
+                    'status': 'error',
+                    'message': 'Este código de barras já foi registrado em outra requisição. Bipe novamente para verificar.',
+                }
             
-            # 2. Criar RequisicaoAmostras
+            cod_req = requisicao.cod_req
+            
+            # 2. Criar RequisicaoAmostras (um único INSERT)
             data_atual = timezone.now()
-            for idx, cod_amostra in enumerate(cod_barras_amostras, start=1):
-                RequisicaoAmostra.objects.create(
+            RequisicaoAmostra.objects.bulk_create([
+                RequisicaoAmostra(
                     requisicao=requisicao,
                     cod_barras_amostra=cod_amostra,
                     data_hora_bipagem=data_atual,
@@ -211,6 +483,8 @@ class RequisicaoService:
                     created_by=user,
                     updated_by=user
                 )
+                for idx, cod_amostra in enumerate(cod_barras_amostras, start=1)
+            ])
             
             # 3. Histórico
             RequisicaoStatusHistorico.objects.create(
@@ -320,7 +594,7 @@ class RequisicaoService:
             
             # Buscar status "Aberto NTO" (código 1)
             try:
-                status_aberto = StatusRequisicao.objects.get(codigo='1')
+                status_aberto = obter_referencia(StatusRequisicao, codigo='1')
             except StatusRequisicao.DoesNotExist:
                 logger.error('Status 1 (ABERTO NTO) não encontrado')
                 return {
@@ -371,46 +645,76 @@ class RequisicaoService:
     @classmethod
     @transaction.atomic
     def finalizar_kit_recebimento(cls, user) -> Dict[str, any]:
+        """
+        Finaliza em lote todas as requisições abertas (status 1) do usuário.
+        
+        Executa em volume constante de queries, independente do tamanho do kit:
+        uma leitura das requisições (com lock), uma das amostras, uma dos logs
+        já existentes, um UPDATE de status e dois bulk_create (log e histórico).
+        
+        Requisições que não podem ser finalizadas (ex.: LogRecebimento já
+        existente para o código de barras) são reportadas individualmente em
+        'falhas' e não impedem a finalização das demais.
+        """
         from django.utils import timezone
         
         try:
-            status_aberto = StatusRequisicao.objects.get(codigo='1')
-            status_recebido = StatusRequisicao.objects.get(codigo='2') 
+            status_aberto = obter_referencia(StatusRequisicao, codigo='1')
+            status_recebido = obter_referencia(StatusRequisicao, codigo='2') 
         except StatusRequisicao.DoesNotExist:
             logger.error('Status 1 (ABERTO) ou 2 (RECEBIDO) não encontrados')
             return {
                 'status': 'error',
                 'message': 'Erro de configuração de status. Contate o suporte.',
             }
-            
-        requisicoes = DadosRequisicao.objects.filter(
-            recebido_por=user,
-            status=status_aberto
+        
+        requisicoes = list(
+            DadosRequisicao.objects.select_for_update()
+            .filter(recebido_por=user, status=status_aberto)
+            .only('id', 'cod_req', 'cod_barras_req')
+            .order_by('id')
         )
         
-        count = requisicoes.count()
-        if count == 0:
+        if not requisicoes:
             return {
                 'status': 'success',
                 'message': 'Nenhuma requisição pendente para finalizar.',
-                'count': 0
+                'count': 0,
+                'failed': 0,
+                'falhas': [],
             }
-            
+        
         agora = timezone.now()
+        ids = [req.id for req in requisicoes]
+        
+        # Amostras de todas as requisições em uma única query (ordem de bipagem)
+        amostras_por_requisicao = {}
+        for requisicao_id, cod_amostra in (
+            RequisicaoAmostra.objects.filter(requisicao_id__in=ids)
+            .order_by('requisicao_id', 'ordem')
+            .values_list('requisicao_id', 'cod_barras_amostra')
+        ):
+            amostras_por_requisicao.setdefault(requisicao_id, []).append(cod_amostra)
+        
+        # LogRecebimento é único por código de barras: detectar conflitos antes do bulk
+        logs_existentes = set(
+            LogRecebimento.objects.filter(
+                cod_barras_req__in=[req.cod_barras_req for req in requisicoes]
+            ).values_list('cod_barras_req', flat=True)
+        )
         
-        sucesso_count = 0
+        processadas = []
+        logs = []
+        historicos = []
+        falhas = []
         
         for req in requisicoes:
             try:
-                # Atualizar status da requisição
-                req.status = status_recebido
-                req.data_recebimento_nto = agora
-                req.updated_by = user
-                req.save()
+                if req.cod_barras_req in logs_existentes:
+                    raise ValueError('Log de recebimento já existe para este código de barras.')
                 
-                # Criar LogRecebimento (marca como recebido definitivamente)
-                amostras = list(req.amostras.values_list('cod_barras_amostra', flat=True))
-                LogRecebimento.objects.create(
+                amostras = amostras_por_requisicao.get(req.id, [])
+                logs.append(LogRecebimento(
                     cod_barras_req=req.cod_barras_req,
                     dados={
                         'cod_barras_amostras': amostras,
@@ -418,26 +722,61 @@ class RequisicaoService:
                         'cod_req': req.cod_req,
                         'finalizado_em': agora.isoformat(),
                     },
-                )
-                
-                # Registrar no histórico
-                RequisicaoStatusHistorico.objects.create(
-                    requisicao=req,
+                ))
+                historicos.append(RequisicaoStatusHistorico(
+                    requisicao_id=req.id,
                     cod_req=req.cod_req,
                     status=status_recebido,
                     usuario=user,
-                    observacao='Recebimento finalizado em lote (kit)'
-                )
-                
-                sucesso_count += 1
+                    observacao='Recebimento finalizado em lote (kit)',
+                ))
+                processadas.append(req)
             except Exception as e:
-                logger.exception('Erro ao finalizar requisição %s', req.cod_req)
-                continue
-                
+                logger.warning('Requisição %s não finalizada: %s', req.cod_req, str(e))
+                falhas.append({
+                    'requisicao_id': req.id,
+                    'cod_req': req.cod_req,
+                    'cod_barras_req': req.cod_barras_req,
+                    'erro': str(e),
+                })
+        
+        if processadas:
+            DadosRequisicao.objects.filter(
+                id__in=[req.id for req in processadas]
+            ).update(
+                status=status_recebido,
+                data_recebimento_nto=agora,
+                updated_by=user,
+                updated_at=agora,
+            )
+            LogRecebimento.objects.bulk_create(logs)
+            RequisicaoStatusHistorico.objects.bulk_create(historicos)
+            
+            # queryset.update() não dispara signals: atualizar o set de bloqueio aqui
+            BloqueioRecebimentoCache.adicionar(*[req.cod_barras_req for req in processadas])
+        
+        sucesso_count = len(processadas)
+        falha_count = len(falhas)
+        
+        logger.info(
+            'Kit finalizado por %s: %d requisições processadas, %d falhas',
+            user.username, sucesso_count, falha_count
+        )
+        
+        if falha_count:
+            message = (
+                f'Recebimento finalizado com sucesso! {sucesso_count} requisições processadas. '
+                f'{falha_count} não puderam ser finalizadas.'
+            )
+        else:
+            message = f'Recebimento finalizado com sucesso! {sucesso_count} requisições processadas.'
+        
         return {
             'status': 'success',
-            'message': f'Recebimento finalizado com sucesso! {sucesso_count} requisições processadas.',
-            'count': sucesso_count
+            'message': message,
+            'count': sucesso_count,
+            'failed': falha_count,
+            'falhas': falhas,
         }
 
 
@@ -447,6 +786,11 @@ class BuscaService:
         """
         Busca código de barras e retorna status apropriado.
         
+        Códigos presentes no set de bloqueio do Redis retornam 'found' sem
+        consultar o banco. Caso contrário, executa uma única query (requisição
+        + status + recebido_por + FKs exibidas) e decide o resultado em Python. As amostras só são
+        carregadas para requisições em trânsito (segunda query).
+        
         Args:
             cod_barras: Código de barras a ser buscado
             user: Usuário fazendo a busca (opcional, para verificar transferências)
@@ -458,27 +802,113 @@ class BuscaService:
         - already_started: Código existe com status 1 de outro usuário (transferência)
         - already_yours: Código existe com status 1 do mesmo usuário
         """
-        # Verificar se já foi recebido ou está em processamento
-        requisicao_bloqueada = DadosRequisicao.objects.filter(
-            cod_barras_req=cod_barras,
-            status__codigo__in=STATUS_BLOQUEIO_RECEBIMENTO
-        ).exists()
+        # Atalho: código já recebido/em processamento (set no Redis)
+        if BloqueioRecebimentoCache.contem(cod_barras):
+            logger.info('Código de barras com status bloqueado (cache): %s', cod_barras)
+            return {'status': 'found'}
+
+        requisicao = (
+            DadosRequisicao.objects.select_related(
+                'unidade', 'origem', 'status', 'recebido_por', 'portador_representante'
+            )
+            .filter(cod_barras_req=cod_barras)
+            .first()
+        )
         
-        if requisicao_bloqueada:
+        if requisicao is None:
+            logger.debug('Código de barras não encontrado: %s', cod_barras)
+            return {'status': 'not_found'}
+        
+        return BuscaService._resultado_busca(requisicao, user)
+    
+    @staticmethod
+    def buscar_codigos_barras(cod_barras_lista: List[str], user=None) -> List[Dict[str, any]]:
+        """
+        Versão em lote de buscar_codigo_barras (bipagem de uma caixa inteira).
+        
+        Resolve todos os códigos com uma consulta ao set de bloqueio no Redis,
+        uma query por cod_barras_req__in e, se houver requisições em trânsito,
+        uma query para as amostras delas.
+        
+        Args:
+            cod_barras_lista: Códigos de barras (duplicados são ignorados)
+            user: Usuário fazendo a busca
+        
+        Returns:
+            Lista na ordem de entrada com {'cod_barras': ..., **resultado}, onde
+            resultado tem o mesmo formato de buscar_codigo_barras
+        """
+        codigos = list(dict.fromkeys(cod_barras_lista))
+        
+        bloqueados = BloqueioRecebimentoCache.filtrar_bloqueados(codigos)
+        pendentes = [cod for cod in codigos if cod not in bloqueados]
+        
+        requisicoes = {}
+        if pendentes:
+            requisicoes = {
+                req.cod_barras_req: req
+                for req in DadosRequisicao.objects.select_related(
+                    'unidade', 'origem', 'status', 'recebido_por', 'portador_representante'
+                ).filter(cod_barras_req__in=pendentes)
+            }
+        
+        # Amostras apenas das requisições em trânsito, em uma única query
+        ids_transito = [req.id for req in requisicoes.values() if req.status.codigo == '10']
+        amostras_por_requisicao = {requisicao_id: [] for requisicao_id in ids_transito}
+        if ids_transito:
+            for requisicao_id, cod_amostra in (
+                RequisicaoAmostra.objects.filter(requisicao_id__in=ids_transito)
+                .order_by('requisicao_id', 'ordem')
+                .values_list('requisicao_id', 'cod_barras_amostra')
+            ):
+                amostras_por_requisicao[requisicao_id].append(cod_amostra)
+        
+        resultados = []
+        for cod in codigos:
+            requisicao = requisicoes.get(cod)
+            if cod in bloqueados:
+                resultado = {'status': 'found'}
+            elif requisicao is None:
+                resultado = {'status': 'not_found'}
+            else:
+                resultado = BuscaService._resultado_busca(
+                    requisicao, user, amostras=amostras_por_requisicao.get(requisicao.id)
+                )
+            resultados.append({'cod_barras': cod, **resultado})
+        
+        logger.info(
+            'Localização em lote: %d códigos (%d bloqueados via cache, %d encontrados no banco)',
+            len(codigos), len(bloqueados), len(requisicoes)
+        )
+        
+        return resultados
+    
+    @staticmethod
+    def _resultado_busca(requisicao, user=None, amostras: Optional[List[str]] = None) -> Dict[str, any]:
+        """
+        Decide o resultado da busca para uma requisição já carregada.
+        
+        Args:
+            requisicao: DadosRequisicao com select_related de status, recebido_por,
+                unidade, origem e portador_representante
+            user: Usuário fazendo a busca
+            amostras: Códigos das amostras já carregados (evita nova query
+                quando a requisição está em trânsito)
+        """
+        cod_barras = requisicao.cod_barras_req
+        codigo_status = requisicao.status.codigo
+        
+        # Já foi recebido ou está em processamento
+        if codigo_status in STATUS_BLOQUEIO_RECEBIMENTO:
             logger.info('Código de barras com status bloqueado: %s', cod_barras)
             return {'status': 'found'}
         
-        # Verificar se está em trânsito (status 10)
-        try:
-            requisicao = DadosRequisicao.objects.select_related(
-                'unidade', 'origem', 'status', 'recebido_por', 'portador_representante'
-            ).get(
-                cod_barras_req=cod_barras,
-                status__codigo='10'  # EM TRÂNSITO
-            )
-            
-            # Buscar amostras da requisição
-            amostras = list(requisicao.amostras.values_list('cod_barras_amostra', flat=True))
+        # Em trânsito (status 10)
+        if codigo_status == '10':
+            if amostras is None:
+                amostras = list(
+                    requisicao.amostras.order_by('ordem').values_list('cod_barras_amostra', flat=True)
+                )
             
             logger.info(
                 'Requisição em trânsito encontrada: %s (ID: %d, %d amostras)',
@@ -498,18 +928,9 @@ class BuscaService:
                 'qtd_amostras': len(amostras),
                 'cod_barras_amostras': amostras,
             }
-        except DadosRequisicao.DoesNotExist:
-            pass
         
-        # Verificar se existe com status ABERTO NTO (status 1)
-        try:
-            requisicao = DadosRequisicao.objects.select_related(
-                'recebido_por', 'status'
-            ).get(
-                cod_barras_req=cod_barras,
-                status__codigo='1'  # ABERTO NTO
-            )
-            
+        # ABERTO NTO (status 1)
+        if codigo_status == '1':
             # Verificar se é do mesmo usuário
             if user and requisicao.recebido_por and requisicao.recebido_por == user:
                 logger.info('Requisição já iniciada pelo mesmo usuário: %s', cod_barras)
@@ -535,10 +956,8 @@ class BuscaService:
                 'usuario_anterior_nome': usuario_anterior_nome,
                 'created_at': requisicao.created_at.strftime('%d/%m/%Y %H:%M'),
             }
-        except DadosRequisicao.DoesNotExist:
-            pass
         
-        # Não encontrado em nenhum status
+        # Demais status não bloqueiam nem permitem retomada
         logger.debug('Código de barras não encontrado: %s', cod_barras)
         return {'status': 'not_found'}
     
@@ -2,14 +2,17 @@
 Signals para o app operacao.
 
 Gerencia ações automáticas em resposta a eventos do Django,
-como deleção em cascata de registros relacionados.
+como deleção em cascata de registros relacionados e invalidação
+do registro em memória das tabelas de referência.
 """
 import logging
 
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import DadosRequisicao, LogRecebimento
+from .models import DadosRequisicao, LogRecebimento, StatusRequisicao
+from .referencias import obter_referencia_opcional, registro as registro_referencias
+from .services import STATUS_BLOQUEIO_RECEBIMENTO, BloqueioRecebimentoCache
 
 logger = logging.getLogger(__name__)
 
@@ -58,3 +61,46 @@ def deletar_log_recebimento(sender, instance, **kwargs):
             instance.cod_req,
             str(e)
         )
+
+
+@receiver(post_save, sender=DadosRequisicao)
+def atualizar_bloqueio_recebimento(sender, instance, **kwargs):
+    """
+    Mantém o set de bloqueio de recebimento (Redis) em sincronia com o status.
+    
+    Requisições que entram em STATUS_BLOQUEIO_RECEBIMENTO são adicionadas;
+    as que saem (ex.: TRIAGEM1-OK -> PENDÊNCIA) são removidas.
+    """
+    status = obter_referencia_opcional(StatusRequisicao, id=instance.status_id)
+    if status and status.codigo in STATUS_BLOQUEIO_RECEBIMENTO:
+        BloqueioRecebimentoCache.adicionar(instance.cod_barras_req)
+    else:
+        BloqueioRecebimentoCache.remover(instance.cod_barras_req)
+
+
+@receiver(post_delete, sender=DadosRequisicao)
+def remover_bloqueio_recebimento(sender, instance, **kwargs):
+    """Remove do set de bloqueio o código de uma requisição excluída."""
+    BloqueioRecebimentoCache.remover(instance.cod_barras_req)
+
+
+def invalidar_referencia(sender, **kwargs):
+    """
+    Invalida o registro em memória do modelo de referência alterado.
+    
+    Conectado via post_save/post_delete a todos os modelos registrados em
+    operacao.referencias; a nova versão é propagada aos demais workers
+    através do carimbo de versão no Redis.
+    """
+    registro_referencias.invalidar(sender)
+
+
+for _model in registro_referencias.modelos():
+    post_save.connect(
+        invalidar_referencia, sender=_model,
+        dispatch_uid=f'invalidar_referencia_save_{_model._meta.label}',
+    )
+    post_delete.connect(
+        invalidar_referencia, sender=_model,
+        dispatch_uid=f'invalidar_referencia_delete_{_model._meta.label}',
+    )
@@ -1,3 +1,394 @@
-from django.test import TestCase
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import IntegrityError, connection, connections, transaction
+from django.http import JsonResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.management.commands.simular_apis import Comportamento
+from core.models import ContadorDiario
+from core.services.external_api import APIResponse, SignedUrlAPIClient
+from core.services.http_pool import http_request
+from core.services.ocr import OCRClient, hash_conteudo
+from core.tests import servidor_simulado
+
+from .models import (
+    DadosRequisicao,
+    Medico,
+    Protocolo,
+    RequisicaoAmostra,
+    RequisicaoArquivo,
+    StatusRequisicao,
+    Tarefa,
+    TipoArquivo,
+    Unidade,
+    gerar_codigo_diario,
+)
+from .async_views import ValidarMedicoCompletoView
+from .diretorio_medicos import VALIDADE, ConsultaDiretorio
+from .idempotencia import idempotente
+from .ocr_requisicoes import campos_ocr
+from .services import BuscaService
+from .upload_views import ConfirmarUploadLoteView, arquivo_lambda, nomes_arquivo_lote, resposta_signed_urls
+from .verificacao_arquivos import consultar_objeto
+
+
+class BuscaCodigoBarrasTests(TestCase):
+    """Orçamento de queries da busca por código de barras (bipagem do recebimento)."""
+
+    MAX_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.operador = User.objects.create_user(username='operador', password='x')
+        cls.outro = User.objects.create_user(username='outro', password='x')
+        cls.unidade = Unidade.objects.create(codigo='01', nome='Unidade Teste')
+        cls.status = {
+            codigo: StatusRequisicao.objects.get_or_create(
+                codigo=codigo, defaults={'descricao': f'STATUS {codigo}', 'ordem': int(codigo)}
+            )[0]
+            for codigo in ('1', '2', '10')
+        }
+
+    def criar_requisicao(self, cod_barras, status, recebido_por=None, amostras=1):
+        requisicao = DadosRequisicao.objects.create(
+            cod_req=f'REQ{cod_barras}',
+            cod_barras_req=cod_barras,
+            unidade=self.unidade,
+            status=self.status[status],
+            recebido_por=recebido_por,
+        )
+        for ordem in range(1, amostras + 1):
+            RequisicaoAmostra.objects.create(
+                requisicao=requisicao,
+                cod_barras_amostra=cod_barras,
+                data_hora_bipagem=timezone.now(),
+                ordem=ordem,
+            )
+        return requisicao
+
+    def buscar(self, cod_barras, user=None):
+        with CaptureQueriesContext(connection) as queries:
+            resultado = BuscaService.buscar_codigo_barras(cod_barras, user=user)
+        self.assertLessEqual(
+            len(queries), self.MAX_QUERIES,
+            f'buscar_codigo_barras executou {len(queries)} queries',
+        )
+        return resultado
+
+    def test_nao_encontrado(self):
+        self.assertEqual(self.buscar('NAOEXISTE')['status'], 'not_found')
+
+    def test_bloqueado(self):
+        self.criar_requisicao('111', '2', recebido_por=self.operador)
+        self.assertEqual(self.buscar('111', self.operador)['status'], 'found')
+
+    def test_em_transito_com_amostras(self):
+        requisicao = self.criar_requisicao('222', '10', amostras=3)
+        resultado = self.buscar('222', self.operador)
+        self.assertEqual(resultado['status'], 'in_transit')
+        self.assertEqual(resultado['requisicao_id'], requisicao.id)
+        self.assertEqual(resultado['unidade_nome'], 'Unidade Teste')
+        self.assertEqual(resultado['qtd_amostras'], 3)
+        self.assertEqual(resultado['cod_barras_amostras'], ['222', '222', '222'])
+
+    def test_iniciada_pelo_mesmo_usuario(self):
+        self.criar_requisicao('333', '1', recebido_por=self.operador)
+        self.assertEqual(self.buscar('333', self.operador)['status'], 'already_yours')
+
+    def test_iniciada_por_outro_usuario(self):
+        requisicao = self.criar_requisicao('444', '1', recebido_por=self.outro)
+        resultado = self.buscar('444', self.operador)
+        self.assertEqual(resultado['status'], 'already_started')
+        self.assertEqual(resultado['requisicao_id'], requisicao.id)
+        self.assertEqual(resultado['usuario_anterior'], 'outro')
+
+    def test_lote_mesmo_formato_da_busca_individual(self):
+        self.criar_requisicao('111', '2', recebido_por=self.operador)
+        self.criar_requisicao('222', '10', amostras=2)
+        self.criar_requisicao('333', '1', recebido_por=self.operador)
+        codigos = ['111', '222', '333', 'NAOEXISTE', '222']
+
+        esperado = [
+            {'cod_barras': cod, **BuscaService.buscar_codigo_barras(cod, user=self.operador)}
+            for cod in dict.fromkeys(codigos)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            resultados = BuscaService.buscar_codigos_barras(codigos, user=self.operador)
+
+        self.assertEqual(resultados, esperado)
+        self.assertLessEqual(len(queries), self.MAX_QUERIES)
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite não suporta escritas concorrentes entre conexões')
+class CodigoDiarioConcorrenciaTests(TransactionTestCase):
+    """Códigos PROT/TAR gerados em paralelo não podem se repetir."""
+
+    THREADS = 8
+    POR_THREAD = 25
+
+    def gerar_em_paralelo(self, gerar):
+        def trabalhar(_):
+            try:
+                return [gerar() for _ in range(self.POR_THREAD)]
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            return [codigo for lote in executor.map(trabalhar, range(self.THREADS)) for codigo in lote]
+
+    def test_contador_sem_duplicados(self):
+        numeros = self.gerar_em_paralelo(lambda: ContadorDiario.proximo('TESTE'))
+        total = self.THREADS * self.POR_THREAD
+        self.assertEqual(sorted(numeros), list(range(1, total + 1)))
+
+    def test_codigos_protocolo_e_tarefa_sem_duplicados(self):
+        for model, sigla in ((Protocolo, 'PROT'), (Tarefa, 'TAR')):
+            codigos = self.gerar_em_paralelo(lambda: gerar_codigo_diario(model, sigla))
+            self.assertEqual(len(codigos), len(set(codigos)), f'{sigla}: códigos duplicados')
+            self.assertTrue(all(codigo.startswith(f'{sigla}-') for codigo in codigos))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class IdempotenciaTests(TestCase):
+    """Reenvios com o mesmo Idempotency-Key não executam a view novamente."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user(username='bipador', password='x')
+
+    def setUp(self):
+        cache.clear()
+        self.chamadas = 0
+
+        @idempotente()
+        def view(request):
+            self.chamadas += 1
+            return JsonResponse({'status': 'success', 'chamada': self.chamadas})
+
+        self.view = view
+
+    def post(self, corpo='{"cod_barras_req": "123"}', chave='chave-1'):
+        headers = {'Idempotency-Key': chave} if chave else {}
+        request = RequestFactory().post(
+            '/operacao/recebimento/validar/', corpo, content_type='application/json', headers=headers
+        )
+        request.user = self.usuario
+        return self.view(request)
+
+    def test_reenvio_retorna_resposta_armazenada(self):
+        primeira = self.post()
+        repetida = self.post()
+        self.assertEqual(self.chamadas, 1)
+        self.assertEqual(repetida.content, primeira.content)
+        self.assertEqual(repetida['Idempotent-Replayed'], 'true')
+
+    def test_chave_reutilizada_com_outro_corpo(self):
+        self.post()
+        self.assertEqual(self.post(corpo='{"cod_barras_req": "456"}').status_code, 422)
+        self.assertEqual(self.chamadas, 1)
+
+    def test_sem_cabecalho_executa_sempre(self):
+        self.post(chave=None)
+        self.post(chave=None)
+        self.assertEqual(self.chamadas, 2)
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class AsyncViewsTests(TestCase):
+    """Autenticação das views assíncronas (servidor ASGI)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user(username='operador', password='x')
+
+    def _request(self, url, usuario):
+        request = AsyncRequestFactory().get(url)
+
+        async def auser():
+            return usuario
+
+        request.auser = auser
+        return request
+
+    async def test_anonimo_redirecionado_para_login(self):
+        request = self._request('/operacao/triagem/validar-medico-completo/?crm=1', AnonymousUser())
+        response = await ValidarMedicoCompletoView.as_view()(request)
+        self.assertEqual(response.status_code, 302)
+
+    async def test_usuario_autenticado_acessa_view(self):
+        request = self._request('/operacao/triagem/validar-medico-completo/?crm=123', self.usuario)
+        response = await ValidarMedicoCompletoView.as_view()(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(request.user, self.usuario)
+
+
+class SignedUrlsLoteTests(TestCase):
+    """URLs de upload de vários arquivos em uma chamada à API Lambda."""
+
+    def test_lote_com_nomes_distintos_em_uma_chamada(self):
+        servidor = servidor_simulado(self, **{'lambda': Comportamento(latencia=0, variacao=0)})
+        cliente = SignedUrlAPIClient()
+        cliente.url = f'{servidor.url_base}/lambda'
+        requisicao = SimpleNamespace(id=7, cod_req='ABC123')
+
+        nomes = nomes_arquivo_lote(requisicao, 3)
+        resposta = resposta_signed_urls(requisicao, nomes, cliente.gerar('7', [arquivo_lambda(n) for n in nomes]))
+
+        arquivos = json.loads(resposta.content)['arquivos']
+        self.assertEqual([a['original_filename'] for a in arquivos], nomes)
+        self.assertEqual(len({a['file_key'] for a in arquivos}), 3)
+        self.assertTrue(nomes[0].startswith('IDREQ_ABC123_') and nomes[0].endswith('_01.pdf'))
+        self.assertEqual(servidor.estatisticas()['lambda'], {'200': 1})
+
+        # Lambda sem URL para algum arquivo: o lote inteiro falha
+        incompleta = APIResponse(success=True, data={nomes[0]: {'url': 'https://s3/x'}})
+        self.assertEqual(resposta_signed_urls(requisicao, nomes, incompleta).status_code, 500)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class VerificacaoUploadTests(TestCase):
+    """Consulta de existência/tamanho dos uploads (verificação em segundo plano)."""
+
+    def test_consulta_objeto_no_bucket(self):
+        servidor = servidor_simulado(self, s3=Comportamento(latencia=0, variacao=0))
+        url = f'{servidor.url_base}/s3/processing/9/IDREQ_REQ900_20261018120000_01.pdf'
+        http_request('PUT', url, data=b'%PDF-1.4 teste', timeout=2)
+
+        self.assertEqual(consultar_objeto(url), (True, 14))
+        self.assertEqual(consultar_objeto(url.replace('_01.pdf', '_02.pdf')), (False, None))
+
+
+def colunas_fora_das_migrations():
+    """
+    Cria no banco de teste as colunas TipoArquivo.codigo e
+    RequisicaoArquivo.cod_tipo_arquivo, existentes nos bancos em uso mas
+    ausentes do histórico de migrations. Chamar em setUpTestData: a
+    alteração é desfeita com a transação da classe.
+    """
+    with connection.cursor() as cursor:
+        for model, coluna, padrao in ((TipoArquivo, 'codigo', 0), (RequisicaoArquivo, 'cod_tipo_arquivo', 1)):
+            tabela = model._meta.db_table
+            if coluna not in {c.name for c in connection.introspection.get_table_description(cursor, tabela)}:
+                cursor.execute(f'ALTER TABLE {tabela} ADD COLUMN {coluna} integer NOT NULL DEFAULT {padrao}')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+@mock.patch('operacao.upload_views.get_file_url', lambda chave: f'https://cdn.teste/{chave}')
+class ConfirmarUploadLoteTests(TestCase):
+    """Reenvio da confirmação em lote (sem Idempotency-Key) não duplica arquivos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        colunas_fora_das_migrations()
+        cls.usuario = get_user_model().objects.create_user(username='scanner', password='x')
+        cls.requisicao = DadosRequisicao.objects.create(
+            cod_req='REQ700', cod_barras_req='700',
+            unidade=Unidade.objects.create(codigo='07', nome='Unidade Teste'),
+            status=StatusRequisicao.objects.get_or_create(codigo='2', defaults={'descricao': 'RECEBIDO', 'ordem': 2})[0],
+        )
+        TipoArquivo.objects.create(codigo=2, descricao='OUTROS')
+
+    def setUp(self):
+        cache.clear()
+
+    def confirmar(self, arquivos):
+        request = RequestFactory().post(
+            '/operacao/upload/confirmar-lote/',
+            json.dumps({'requisicao_id': self.requisicao.id, 'tipo_arquivo_codigo': 2, 'arquivos': arquivos}),
+            content_type='application/json',
+        )
+        request.user = self.usuario
+        return json.loads(ConfirmarUploadLoteView.as_view()(request).content)
+
+    def test_reenvio_do_mesmo_lote(self):
+        lote = [
+            {'file_key': f'processing/700/IDREQ_REQ700_20261018120000_0{n}.pdf',
+             'filename': f'IDREQ_REQ700_20261018120000_0{n}.pdf', 'file_size': 1000}
+            for n in (1, 2)
+        ]
+        primeira = self.confirmar(lote)
+        repetida = self.confirmar(lote + [{**lote[0], 'file_key': lote[0]['file_key'].replace('_01', '_03')}])
+
+        self.assertEqual((len(primeira['arquivos']), primeira['ignorados']), (2, 0))
+        self.assertEqual((len(repetida['arquivos']), repetida['ignorados']), (1, 2))
+        self.assertEqual(RequisicaoArquivo.objects.filter(requisicao=self.requisicao).count(), 3)
+        # Garantia final para inserções concorrentes
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RequisicaoArquivo.objects.create(
+                requisicao=self.requisicao, cod_req='REQ700', tipo_arquivo=TipoArquivo.objects.get(codigo=2),
+                nome_arquivo='x.pdf', url_arquivo=primeira['arquivos'][0]['url'],
+            )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OCRTests(TestCase):
+    """Cliente de OCR em lote com cache pelo hash do conteúdo."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_documentos_repetidos_nao_voltam_a_api(self):
+        servidor = servidor_simulado(self, ocr=Comportamento(latencia=0, variacao=0, taxa_nao_encontrado=0))
+        cliente = OCRClient()
+        cliente.url, cliente.token, cliente.lote = f'{servidor.url_base}/ocr', 'simulado', 2
+        paginas = [b'%PDF-1.4 pagina 1', b'%PDF-1.4 pagina 2', b'%PDF-1.4 pagina 3']
+
+        primeira = cliente.extrair({hash_conteudo(p): p for p in paginas})
+        self.assertEqual(servidor.estatisticas()['ocr'], {'200': 2})
+        # Redigitalização: mesmo conteúdo sai do cache
+        segunda = cliente.extrair({hash_conteudo(p): p for p in paginas[:2]})
+        self.assertEqual(servidor.estatisticas()['ocr'], {'200': 2})
+        self.assertEqual(segunda, {h: primeira[h] for h in segunda})
+
+        campos = campos_ocr(primeira[hash_conteudo(paginas[0])])
+        self.assertEqual(len(campos['cpf_paciente']), 11)
+        self.assertEqual(set(campos), {
+            'nome_paciente', 'cpf_paciente', 'data_nasc_paciente', 'crm', 'uf_crm', 'nome_medico',
+        })
+        self.assertEqual(campos_ocr({'cpf_paciente': '123', 'data_nasc_paciente': '31/02'}), {})
+
+
+class DiretorioMedicosTests(TestCase):
+    """Diretório local de médicos consultado antes das APIs."""
+
+    FEMME = APIResponse(
+        success=True,
+        status_code=200,
+        data=[{'id_medico': 7, 'nome_medico': 'ANA', 'crm': '12345', 'uf_crm': 'SP', 'destino': 'INTERNET'}],
+    )
+
+    def test_sucesso_da_api_grava_e_responde_pelo_diretorio(self):
+        diretorio = ConsultaDiretorio.carregar('12.345', 'sp')
+        self.assertIsNone(diretorio.fresco(Medico.Fonte.FEMME))
+        diretorio.resolver(Medico.Fonte.FEMME, self.FEMME)
+
+        medico = Medico.objects.get(crm='12345', uf='SP', fonte=Medico.Fonte.FEMME)
+        self.assertEqual((medico.nome, medico.destino), ('ANA', 'INTERNET'))
+
+        response = ConsultaDiretorio.carregar('12345', 'SP').fresco(Medico.Fonte.FEMME)
+        self.assertEqual(response.data, self.FEMME.data)
+
+    def test_entrada_expirada_usada_quando_api_falha(self):
+        ConsultaDiretorio.carregar('12345', 'SP').resolver(Medico.Fonte.FEMME, self.FEMME)
+        Medico.objects.update(sincronizado_em=timezone.now() - VALIDADE - timedelta(hours=1))
+
+        diretorio = ConsultaDiretorio.carregar('12345', 'SP')
+        self.assertIsNone(diretorio.fresco(Medico.Fonte.FEMME))
+        response = diretorio.resolver(Medico.Fonte.FEMME, APIResponse(success=False, error='Timeout', status_code=504))
+        self.assertTrue(response.success)
+        # Erro 5xx repassado sem interpretação (corpo em lista)
+        erro = APIResponse(success=False, error='Erro', status_code=502, data=['Bad Gateway'])
+        self.assertTrue(diretorio.resolver(Medico.Fonte.FEMME, erro).success)
+
+        diretorio.resolver(Medico.Fonte.FEMME, APIResponse(success=False, error='Médico não encontrado.', status_code=404))
+        self.assertFalse(Medico.objects.exists())
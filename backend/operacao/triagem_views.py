@@ -2,8 +2,12 @@
 Views para o processo de triagem de requisições.
 Etapa 1: Validação de amostras com verificação de impeditivos.
 """
+import contextvars
 import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
 
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -13,13 +17,17 @@ from django.utils.decorators import method_decorator
 from django.views import View
 from django_ratelimit.decorators import ratelimit
 
-from core.services.external_api import get_korus_client, get_receita_client, get_femme_client
+from core.services import cache_consultas
+from core.services.external_api import get_korus_client, get_receita_client
 
+from .diretorio_medicos import ConsultaDiretorio, buscar_medico_femme
+from .idempotencia import idempotente
 from .models import (
     AmostraMotivoArmazenamentoInadequado,
     DadosRequisicao,
     EventoTarefa,
     LogAlteracaoAmostra,
+    Medico,
     MotivoArmazenamentoInadequado,
     MotivoAlteracaoAmostra,
     Notificacao,
@@ -31,9 +39,17 @@ from .models import (
     TipoPendencia,
     TipoPendenciaEtapa,
 )
+from .referencias import obter_referencia, obter_referencia_opcional
 
 logger = logging.getLogger(__name__)
 
+# Validação de médico: consultas FEMME/KORUS em paralelo (pool limitado por processo)
+VALIDACAO_MEDICO_PRAZO = float(os.getenv('VALIDACAO_MEDICO_PRAZO', '20'))
+_executor_validacao_medico = ThreadPoolExecutor(
+    max_workers=int(os.getenv('VALIDACAO_MEDICO_THREADS', '8')),
+    thread_name_prefix='validacao-medico',
+)
+
 
 @method_decorator(ratelimit(key='user', rate='60/m', method='GET'), name='dispatch')
 class ListarMotivosInadequadosView(LoginRequiredMixin, View):
@@ -100,7 +116,7 @@ class VerificarArquivoRequisicaoView(LoginRequiredMixin, View):
             from .models import RequisicaoArquivo, TipoArquivo
             
             # Buscar tipo de arquivo REQUISICAO (código 1)
-            tipo_requisicao = TipoArquivo.objects.filter(codigo=1).first()
+            tipo_requisicao = obter_referencia_opcional(TipoArquivo, codigo=1)
             
             tem_arquivo = False
             if tipo_requisicao:
@@ -206,6 +222,7 @@ class ListarAmostrasRequisicaoView(LoginRequiredMixin, View):
 
 
 @method_decorator(ratelimit(key='user', rate='30/m', method='POST'), name='dispatch')
+@method_decorator(idempotente(), name='post')
 class SalvarAmostraTriagemView(LoginRequiredMixin, View):
     """
     Salva dados da amostra na triagem etapa 1 e valida impeditivos.
@@ -274,7 +291,7 @@ class SalvarAmostraTriagemView(LoginRequiredMixin, View):
             from .models import RequisicaoArquivo, TipoArquivo
             
             # Buscar tipo de arquivo REQUISICAO (código 1)
-            tipo_requisicao = TipoArquivo.objects.filter(codigo=1).first()
+            tipo_requisicao = obter_referencia_opcional(TipoArquivo, codigo=1)
             
             if tipo_requisicao:
                 tem_arquivo = RequisicaoArquivo.objects.filter(
@@ -437,7 +454,7 @@ class SalvarAmostraTriagemView(LoginRequiredMixin, View):
             todas_validadas = not proxima_amostra
             if todas_validadas:
                 # Buscar status TRIAGEM1-OK (código 7)
-                status_triagem1_ok = StatusRequisicao.objects.filter(codigo=7).first()
+                status_triagem1_ok = obter_referencia_opcional(StatusRequisicao, codigo=7)
                 
                 if status_triagem1_ok:
                     status_anterior = amostra.requisicao.status
@@ -520,7 +537,7 @@ class RejeitarRequisicaoView(LoginRequiredMixin, View):
             requisicao = DadosRequisicao.objects.select_related('status').get(id=requisicao_id)
             
             # Buscar status
-            status_rejeicao = StatusRequisicao.objects.get(id=status_rejeicao_id)
+            status_rejeicao = obter_referencia(StatusRequisicao, id=status_rejeicao_id)
             
             # Alterar status
             status_anterior = requisicao.status
@@ -629,6 +646,7 @@ class ListarTiposPendenciaView(LoginRequiredMixin, View):
 
 
 @method_decorator(ratelimit(key='user', rate='30/m', method='POST'), name='dispatch')
+@method_decorator(idempotente(), name='post')
 class FinalizarTriagemView(LoginRequiredMixin, View):
     """
     Finaliza a triagem (Etapa 2) registrando pendências e atualizando status.
@@ -680,18 +698,18 @@ class FinalizarTriagemView(LoginRequiredMixin, View):
             # Determinar novo status baseado nas pendências
             if pendencias:
                 # Tem pendências - status PENDÊNCIA (código 6)
-                novo_status = StatusRequisicao.objects.get(codigo='6')
+                novo_status = obter_referencia(StatusRequisicao, codigo='6')
                 status_msg = 'Triagem finalizada com pendências registradas.'
             else:
                 # Sem pendências - status TRIAGEM2-OK (código 8)
-                novo_status = StatusRequisicao.objects.get(codigo='8')
+                novo_status = obter_referencia(StatusRequisicao, codigo='8')
                 status_msg = 'Triagem finalizada com sucesso!'
             
             # Registrar pendências (se houver)
             for pend in pendencias:
                 tipo_pendencia_id = pend.get('tipo_pendencia_id')
                 if tipo_pendencia_id:
-                    tipo = TipoPendencia.objects.get(id=tipo_pendencia_id)
+                    tipo = obter_referencia(TipoPendencia, id=tipo_pendencia_id)
                     RequisicaoPendencia.objects.create(
                         requisicao=requisicao,
                         codigo_barras=requisicao.cod_barras_req,
@@ -845,7 +863,7 @@ class AtualizarTipoAmostraView(LoginRequiredMixin, View):
             amostra = RequisicaoAmostra.objects.get(id=amostra_id)
             
             if tipo_amostra_id:
-                tipo = TipoAmostra.objects.get(id=tipo_amostra_id)
+                tipo = obter_referencia(TipoAmostra, id=tipo_amostra_id)
                 amostra.tipo_amostra = tipo
             else:
                 amostra.tipo_amostra = None
@@ -921,7 +939,7 @@ class ExcluirAmostraView(LoginRequiredMixin, View):
                 )
             
             # Buscar motivo de exclusão
-            motivo = MotivoAlteracaoAmostra.objects.get(id=motivo_exclusao_id, tipo='EXCLUSAO', ativo=True)
+            motivo = obter_referencia(MotivoAlteracaoAmostra, id=motivo_exclusao_id, tipo='EXCLUSAO', ativo=True)
             
             amostra = RequisicaoAmostra.objects.select_related('requisicao').get(id=amostra_id)
             cod_barras_amostra = amostra.cod_barras_amostra
@@ -1022,7 +1040,7 @@ class AdicionarAmostraView(LoginRequiredMixin, View):
                 )
             
             # Buscar motivo de adição
-            motivo = MotivoAlteracaoAmostra.objects.get(id=motivo_adicao_id, tipo='ADICAO', ativo=True)
+            motivo = obter_referencia(MotivoAlteracaoAmostra, id=motivo_adicao_id, tipo='ADICAO', ativo=True)
             
             requisicao = DadosRequisicao.objects.get(id=requisicao_id)
             
@@ -1175,12 +1193,12 @@ class CadastrarRequisicaoView(LoginRequiredMixin, View):
             # Determinar novo status
             if flag_problema_cpf or flag_problema_medico:
                 # Enviar para PENDÊNCIA (código 6)
-                novo_status = StatusRequisicao.objects.get(codigo='6')
+                novo_status = obter_referencia(StatusRequisicao, codigo='6')
                 mensagem = 'Requisição enviada para fila de pendências!'
                 
                 # Criar registros de pendência
                 if flag_problema_cpf:
-                    tipo_pend_cpf = TipoPendencia.objects.get(codigo=17)  # CPF em branco ou inválido
+                    tipo_pend_cpf = obter_referencia(TipoPendencia, codigo=17)  # CPF em branco ou inválido
                     RequisicaoPendencia.objects.get_or_create(
                         requisicao=requisicao,
                         tipo_pendencia=tipo_pend_cpf,
@@ -1192,7 +1210,7 @@ class CadastrarRequisicaoView(LoginRequiredMixin, View):
                     )
                 
                 if flag_problema_medico:
-                    tipo_pend_medico = TipoPendencia.objects.get(codigo=18)  # Dados médico incompletos
+                    tipo_pend_medico = obter_referencia(TipoPendencia, codigo=18)  # Dados médico incompletos
                     RequisicaoPendencia.objects.get_or_create(
                         requisicao=requisicao,
                         tipo_pendencia=tipo_pend_medico,
@@ -1204,7 +1222,7 @@ class CadastrarRequisicaoView(LoginRequiredMixin, View):
                     )
             else:
                 # Cadastrar normalmente - CADASTRADA (código 12)
-                novo_status = StatusRequisicao.objects.get(codigo='12')
+                novo_status = obter_referencia(StatusRequisicao, codigo='12')
                 mensagem = 'Requisição cadastrada com sucesso!'
             
             requisicao.status = novo_status
@@ -1303,41 +1321,13 @@ class ConsultarCPFKorusView(LoginRequiredMixin, View):
                 status=400
             )
         
-        # ZERAR campos ANTES de consultar API (evita mistura de dados antigos)
-        # Nota: alguns campos não permitem NULL, então usamos string vazia
         if requisicao_id:
-            try:
-                requisicao = DadosRequisicao.objects.get(id=requisicao_id)
-                cpf_formatado = cpf.replace('.', '').replace('-', '').strip()
-                requisicao.cpf_paciente = cpf_formatado
-                requisicao.nome_paciente = ''  # null=False, usar string vazia
-                requisicao.data_nasc_paciente = None  # null=True, pode ser None
-                requisicao.sexo_paciente = ''  # null=False
-                requisicao.email_paciente = ''  # null=False
-                requisicao.telefone_paciente = ''  # null=False
-                requisicao.matricula_paciente = ''  # null=False
-                requisicao.convenio_paciente = ''  # null=False
-                requisicao.plano_paciente = ''  # null=False
-                requisicao.updated_by = request.user
-                requisicao.save()
-                logger.info(f"Campos do paciente zerados antes de consultar API - Requisição ID: {requisicao_id}")
-            except DadosRequisicao.DoesNotExist:
-                logger.warning(f"Requisição {requisicao_id} não encontrada para zerar campos")
-            except Exception as e:
-                logger.error(f"Erro ao zerar campos do paciente: {str(e)}", exc_info=True)
+            zerar_dados_paciente(requisicao_id, cpf, request.user, 'Korus')
         
         try:
             # Consultar API Korus
             korus_client = get_korus_client()
             response = korus_client.buscar_paciente_por_cpf(cpf)
-            
-            if not response.success:
-                error_msg = response.error or 'Erro ao consultar CPF.'
-                logger.warning(f"Erro na consulta CPF Korus: {error_msg}")
-                return JsonResponse(
-                    {'status': 'error', 'message': error_msg},
-                    status=404 if 'não encontrado' in error_msg.lower() else 500
-                )
         except Exception as e:
             logger.error(f"Exceção ao consultar API Korus: {str(e)}", exc_info=True)
             return JsonResponse(
@@ -1345,105 +1335,14 @@ class ConsultarCPFKorusView(LoginRequiredMixin, View):
                 status=500
             )
         
-        # Extrair dados do paciente da resposta
-        # A estrutura pode variar, então tratamos diferentes formatos
-        dados_api = response.data
-        
-        # Log para debug - ver estrutura real da resposta
-        logger.info(f"Resposta API Korus (tipo={type(dados_api).__name__}): {dados_api}")
-        
-        # Se for lista, pegar primeiro item
-        if isinstance(dados_api, list) and len(dados_api) > 0:
-            dados_api = dados_api[0]
-            logger.info(f"Primeiro item da lista: {dados_api}")
-        
-        # Mapear campos da API Korus para nosso formato
-        # Estrutura real: pessoaFisica contém nome, cpf, dataNascimento, sexo
-        # contato contém email
-        # campos raiz: matricula, convenio, plano
-        pessoa_fisica = dados_api.get('pessoaFisica', {}) or {}
-        contato = dados_api.get('contato', {}) or {}
-        telefones = dados_api.get('telefones', []) or []
-        
-        # Extrair telefone com preferência para celular
-        telefone = ''
-        telefone_celular = None
-        telefone_outro = None
-        for tel in telefones:
-            ddd = tel.get('ddd', '')
-            numero = tel.get('numero', '')
-            tipo = tel.get('tipoTelefone', '').lower()
-            if ddd and numero:
-                tel_formatado = f"({ddd}) {numero}"
-                if 'celular' in tipo:
-                    telefone_celular = tel_formatado
-                elif not telefone_outro:
-                    telefone_outro = tel_formatado
-        telefone = telefone_celular or telefone_outro or ''
-        
-        paciente = {
-            'nome': pessoa_fisica.get('nome', '') or '',
-            'data_nascimento': pessoa_fisica.get('dataNascimento', '') or '',
-            'email': contato.get('email', '') or '',
-            'sexo': pessoa_fisica.get('sexo', '') or '',
-            'telefone': telefone,
-            'matricula': dados_api.get('matricula', '') or '',
-            'convenio': dados_api.get('convenio', '') or '',
-            'plano': dados_api.get('plano', '') or '',
-        }
+        if not response.success:
+            return resposta_erro_consulta_cpf(response, 'Korus')
         
-        logger.info(f"Dados mapeados do paciente: {paciente}")
+        paciente = mapear_paciente_korus(response.data)
         
         # Se requisicao_id foi informado, atualizar com dados da API (campos já foram zerados antes)
         if requisicao_id:
-            try:
-                requisicao = DadosRequisicao.objects.get(id=requisicao_id)
-                
-                # Atualizar campos do paciente com dados da API
-                if paciente['nome']:
-                    requisicao.nome_paciente = paciente['nome']
-                if paciente['data_nascimento']:
-                    # Converter data se necessário
-                    try:
-                        from datetime import datetime
-                        if isinstance(paciente['data_nascimento'], str):
-                            # Tentar diferentes formatos
-                            for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S']:
-                                try:
-                                    requisicao.data_nasc_paciente = datetime.strptime(
-                                        paciente['data_nascimento'].split('T')[0], 
-                                        fmt.split('T')[0]
-                                    ).date()
-                                    break
-                                except ValueError:
-                                    continue
-                    except Exception as e:
-                        logger.warning(f"Erro ao converter data de nascimento: {e}")
-                if paciente['email']:
-                    requisicao.email_paciente = paciente['email']
-                if paciente['sexo']:
-                    requisicao.sexo_paciente = paciente['sexo']
-                if paciente['telefone']:
-                    requisicao.telefone_paciente = paciente['telefone']
-                if paciente['matricula']:
-                    requisicao.matricula_paciente = paciente['matricula']
-                if paciente['convenio']:
-                    requisicao.convenio_paciente = paciente['convenio']
-                if paciente['plano']:
-                    requisicao.plano_paciente = paciente['plano']
-                
-                requisicao.updated_by = request.user
-                requisicao.save()
-                
-                logger.info(
-                    f"Dados do paciente atualizados via Korus - Requisição: {requisicao.cod_req}, "
-                    f"CPF: {cpf[:3]}***{cpf[-2:]}, Usuário: {request.user.username}"
-                )
-                
-            except DadosRequisicao.DoesNotExist:
-                logger.warning(f"Requisição {requisicao_id} não encontrada para atualização")
-            except Exception as e:
-                logger.error(f"Erro ao salvar dados do paciente: {str(e)}", exc_info=True)
+            salvar_paciente_korus(requisicao_id, paciente, cpf, request.user)
         
         return JsonResponse({
             'status': 'success',
@@ -1486,41 +1385,13 @@ class ConsultarCPFReceitaView(LoginRequiredMixin, View):
                 status=400
             )
         
-        # ZERAR campos ANTES de consultar API (evita mistura de dados antigos)
-        # Nota: alguns campos não permitem NULL, então usamos string vazia
         if requisicao_id:
-            try:
-                requisicao = DadosRequisicao.objects.get(id=requisicao_id)
-                cpf_formatado = cpf.replace('.', '').replace('-', '').strip()
-                requisicao.cpf_paciente = cpf_formatado
-                requisicao.nome_paciente = ''  # null=False, usar string vazia
-                requisicao.data_nasc_paciente = None  # null=True, pode ser None
-                requisicao.sexo_paciente = ''  # null=False
-                requisicao.email_paciente = ''  # null=False
-                requisicao.telefone_paciente = ''  # null=False
-                requisicao.matricula_paciente = ''  # null=False
-                requisicao.convenio_paciente = ''  # null=False
-                requisicao.plano_paciente = ''  # null=False
-                requisicao.updated_by = request.user
-                requisicao.save()
-                logger.info(f"Campos do paciente zerados antes de consultar API Receita - Requisição ID: {requisicao_id}")
-            except DadosRequisicao.DoesNotExist:
-                logger.warning(f"Requisição {requisicao_id} não encontrada para zerar campos")
-            except Exception as e:
-                logger.error(f"Erro ao zerar campos do paciente: {str(e)}", exc_info=True)
+            zerar_dados_paciente(requisicao_id, cpf, request.user, 'Receita')
         
         try:
             # Consultar API Receita
             receita_client = get_receita_client()
             response = receita_client.buscar_cpf(cpf)
-            
-            if not response.success:
-                error_msg = response.error or 'Erro ao consultar CPF.'
-                logger.warning(f"Erro na consulta CPF Receita: {error_msg}")
-                return JsonResponse(
-                    {'status': 'error', 'message': error_msg},
-                    status=404 if 'não encontrado' in error_msg.lower() else 500
-                )
         except Exception as e:
             logger.error(f"Exceção ao consultar API Receita: {str(e)}", exc_info=True)
             return JsonResponse(
@@ -1528,58 +1399,14 @@ class ConsultarCPFReceitaView(LoginRequiredMixin, View):
                 status=500
             )
         
-        # Extrair dados do CPF da resposta
-        dados_api = response.data
+        if not response.success:
+            return resposta_erro_consulta_cpf(response, 'Receita')
         
-        # Log para debug
-        logger.info(f"Resposta API Receita: {dados_api}")
-        
-        # Mapear campos da API Receita para nosso formato
-        # Campos disponíveis: nome_da_pf, data_nascimento, situacao_cadastral
-        paciente = {
-            'nome': dados_api.get('nome_da_pf', '') or '',
-            'data_nascimento': dados_api.get('data_nascimento', '') or '',
-            'situacao_cadastral': dados_api.get('situacao_cadastral', '') or '',
-        }
-        
-        logger.info(f"Dados mapeados do paciente (Receita): {paciente}")
+        paciente = mapear_paciente_receita(response.data)
         
         # Se requisicao_id foi informado, atualizar com dados da API (campos já foram zerados antes)
         if requisicao_id:
-            try:
-                requisicao = DadosRequisicao.objects.get(id=requisicao_id)
-                
-                # Atualizar campos do paciente com dados da API
-                if paciente['nome']:
-                    requisicao.nome_paciente = paciente['nome']
-                if paciente['data_nascimento']:
-                    # Converter data de DD/MM/YYYY para date
-                    try:
-                        from datetime import datetime
-                        if isinstance(paciente['data_nascimento'], str):
-                            # Formato esperado: DD/MM/YYYY
-                            data_str = paciente['data_nascimento'].replace('\\/', '/')
-                            requisicao.data_nasc_paciente = datetime.strptime(
-                                data_str, '%d/%m/%Y'
-                            ).date()
-                    except Exception as e:
-                        logger.warning(f"Erro ao converter data de nascimento: {e}")
-                
-                # Nota: API Receita não retorna sexo, email, matricula, convenio, plano
-                # Esses campos permanecem vazios
-                
-                requisicao.updated_by = request.user
-                requisicao.save()
-                
-                logger.info(
-                    f"Dados do paciente atualizados via Receita - Requisição: {requisicao.cod_req}, "
-                    f"CPF: {cpf[:3]}***{cpf[-2:]}, Usuário: {request.user.username}"
-                )
-                
-            except DadosRequisicao.DoesNotExist:
-                logger.warning(f"Requisição {requisicao_id} não encontrada para atualização")
-            except Exception as e:
-                logger.error(f"Erro ao salvar dados do paciente: {str(e)}", exc_info=True)
+            salvar_paciente_receita(requisicao_id, paciente, cpf, request.user)
         
         return JsonResponse({
             'status': 'success',
@@ -1587,6 +1414,185 @@ class ConsultarCPFReceitaView(LoginRequiredMixin, View):
         })
 
 
+def zerar_dados_paciente(requisicao_id, cpf, usuario, api):
+    """
+    Zera os dados do paciente ANTES de consultar a API (evita mistura de dados antigos).
+    
+    Nota: alguns campos não permitem NULL, então usamos string vazia.
+    """
+    try:
+        requisicao = DadosRequisicao.objects.get(id=requisicao_id)
+        cpf_formatado = cpf.replace('.', '').replace('-', '').strip()
+        requisicao.cpf_paciente = cpf_formatado
+        requisicao.nome_paciente = ''  # null=False, usar string vazia
+        requisicao.data_nasc_paciente = None  # null=True, pode ser None
+        requisicao.sexo_paciente = ''  # null=False
+        requisicao.email_paciente = ''  # null=False
+        requisicao.telefone_paciente = ''  # null=False
+        requisicao.matricula_paciente = ''  # null=False
+        requisicao.convenio_paciente = ''  # null=False
+        requisicao.plano_paciente = ''  # null=False
+        requisicao.updated_by = usuario
+        requisicao.save()
+        logger.info(f"Campos do paciente zerados antes de consultar API {api} - Requisição ID: {requisicao_id}")
+    except DadosRequisicao.DoesNotExist:
+        logger.warning(f"Requisição {requisicao_id} não encontrada para zerar campos")
+    except Exception as e:
+        logger.error(f"Erro ao zerar campos do paciente: {str(e)}", exc_info=True)
+
+
+def resposta_erro_consulta_cpf(response, api):
+    """Resposta de erro de uma consulta de CPF (404 não encontrado, 503 degradado, 500 demais)."""
+    error_msg = response.error or 'Erro ao consultar CPF.'
+    logger.warning(f"Erro na consulta CPF {api}: {error_msg}")
+    return JsonResponse(
+        {'status': 'error', 'message': error_msg},
+        status=404 if 'não encontrado' in error_msg.lower() else (503 if response.degradado else 500)
+    )
+
+
+def mapear_paciente_korus(dados_api):
+    """Mapeia a resposta da API Korus para o formato do paciente."""
+    # Log para debug - apenas a estrutura (sem dados pessoais/CPF)
+    logger.info(f"Resposta API Korus (tipo={type(dados_api).__name__})")
+    
+    # Se for lista, pegar primeiro item
+    if isinstance(dados_api, list) and len(dados_api) > 0:
+        dados_api = dados_api[0]
+        logger.info(f"Primeiro item da lista: {dados_api}")
+    
+    # Estrutura real: pessoaFisica contém nome, cpf, dataNascimento, sexo
+    # contato contém email
+    # campos raiz: matricula, convenio, plano
+    pessoa_fisica = dados_api.get('pessoaFisica', {}) or {}
+    contato = dados_api.get('contato', {}) or {}
+    telefones = dados_api.get('telefones', []) or []
+    
+    # Extrair telefone com preferência para celular
+    telefone_celular = None
+    telefone_outro = None
+    for tel in telefones:
+        ddd = tel.get('ddd', '')
+        numero = tel.get('numero', '')
+        tipo = tel.get('tipoTelefone', '').lower()
+        if ddd and numero:
+            tel_formatado = f"({ddd}) {numero}"
+            if 'celular' in tipo:
+                telefone_celular = tel_formatado
+            elif not telefone_outro:
+                telefone_outro = tel_formatado
+    telefone = telefone_celular or telefone_outro or ''
+    
+    paciente = {
+        'nome': pessoa_fisica.get('nome', '') or '',
+        'data_nascimento': pessoa_fisica.get('dataNascimento', '') or '',
+        'email': contato.get('email', '') or '',
+        'sexo': pessoa_fisica.get('sexo', '') or '',
+        'telefone': telefone,
+        'matricula': dados_api.get('matricula', '') or '',
+        'convenio': dados_api.get('convenio', '') or '',
+        'plano': dados_api.get('plano', '') or '',
+    }
+    
+    logger.info(f"Dados mapeados do paciente: campos={sorted(k for k, v in paciente.items() if v)}")
+    return paciente
+
+
+def salvar_paciente_korus(requisicao_id, paciente, cpf, usuario):
+    """Atualiza a requisição com os dados do paciente retornados pela Korus."""
+    try:
+        requisicao = DadosRequisicao.objects.get(id=requisicao_id)
+        
+        # Atualizar campos do paciente com dados da API
+        if paciente['nome']:
+            requisicao.nome_paciente = paciente['nome']
+        if paciente['data_nascimento'] and isinstance(paciente['data_nascimento'], str):
+            # Tentar diferentes formatos
+            for fmt in ['%Y-%m-%d', '%d/%m/%Y']:
+                try:
+                    requisicao.data_nasc_paciente = datetime.strptime(
+                        paciente['data_nascimento'].split('T')[0], fmt
+                    ).date()
+                    break
+                except ValueError:
+                    continue
+        if paciente['email']:
+            requisicao.email_paciente = paciente['email']
+        if paciente['sexo']:
+            requisicao.sexo_paciente = paciente['sexo']
+        if paciente['telefone']:
+            requisicao.telefone_paciente = paciente['telefone']
+        if paciente['matricula']:
+            requisicao.matricula_paciente = paciente['matricula']
+        if paciente['convenio']:
+            requisicao.convenio_paciente = paciente['convenio']
+        if paciente['plano']:
+            requisicao.plano_paciente = paciente['plano']
+        
+        requisicao.updated_by = usuario
+        requisicao.save()
+        
+        logger.info(
+            f"Dados do paciente atualizados via Korus - Requisição: {requisicao.cod_req}, "
+            f"CPF: {cpf[:3]}***{cpf[-2:]}, Usuário: {usuario.username}"
+        )
+        
+    except DadosRequisicao.DoesNotExist:
+        logger.warning(f"Requisição {requisicao_id} não encontrada para atualização")
+    except Exception as e:
+        logger.error(f"Erro ao salvar dados do paciente: {str(e)}", exc_info=True)
+
+
+def mapear_paciente_receita(dados_api):
+    """Mapeia a resposta da API Receita para o formato do paciente."""
+    logger.info("Resposta API Receita recebida")
+    
+    # Campos disponíveis: nome_da_pf, data_nascimento, situacao_cadastral
+    paciente = {
+        'nome': dados_api.get('nome_da_pf', '') or '',
+        'data_nascimento': dados_api.get('data_nascimento', '') or '',
+        'situacao_cadastral': dados_api.get('situacao_cadastral', '') or '',
+    }
+    
+    logger.info(f"Dados mapeados do paciente (Receita): campos={sorted(k for k, v in paciente.items() if v)}")
+    return paciente
+
+
+def salvar_paciente_receita(requisicao_id, paciente, cpf, usuario):
+    """Atualiza a requisição com os dados do paciente retornados pela Receita."""
+    try:
+        requisicao = DadosRequisicao.objects.get(id=requisicao_id)
+        
+        # Atualizar campos do paciente com dados da API
+        if paciente['nome']:
+            requisicao.nome_paciente = paciente['nome']
+        if paciente['data_nascimento']:
+            # Converter data de DD/MM/YYYY para date
+            try:
+                data_str = paciente['data_nascimento'].replace('\\/', '/')
+                requisicao.data_nasc_paciente = datetime.strptime(
+                    data_str, '%d/%m/%Y'
+                ).date()
+            except Exception as e:
+                logger.warning(f"Erro ao converter data de nascimento: {e}")
+        
+        # Nota: API Receita não retorna sexo, email, matricula, convenio, plano
+        # Esses campos permanecem vazios
+        
+        requisicao.updated_by = usuario
+        requisicao.save()
+        
+        logger.info(
+            f"Dados do paciente atualizados via Receita - Requisição: {requisicao.cod_req}, "
+            f"CPF: {cpf[:3]}***{cpf[-2:]}, Usuário: {usuario.username}"
+        )
+        
+    except DadosRequisicao.DoesNotExist:
+        logger.warning(f"Requisição {requisicao_id} não encontrada para atualização")
+    except Exception as e:
+        logger.error(f"Erro ao salvar dados do paciente: {str(e)}", exc_info=True)
+
+
 @method_decorator(ratelimit(key='user', rate='30/m', method='GET'), name='dispatch')
 class ValidarMedicoView(LoginRequiredMixin, View):
     """
@@ -1626,16 +1632,15 @@ class ValidarMedicoView(LoginRequiredMixin, View):
             )
         
         try:
-            # Consultar API FEMME
-            femme_client = get_femme_client()
-            response = femme_client.buscar_medico(crm, uf_crm)
+            # Consultar diretório local / API FEMME (com cache por CRM/UF)
+            response = buscar_medico_femme(crm, uf_crm)
             
             if not response.success:
                 error_msg = response.error or 'Erro ao consultar médico.'
                 logger.warning(f"Erro na consulta médico FEMME: {error_msg}")
                 return JsonResponse(
                     {'status': 'error', 'message': error_msg},
-                    status=404 if 'não encontrado' in error_msg.lower() else 500
+                    status=404 if 'não encontrado' in error_msg.lower() else (503 if response.degradado else 500)
                 )
         except Exception as e:
             logger.error(f"Exceção ao consultar API FEMME: {str(e)}", exc_info=True)
@@ -1895,7 +1900,7 @@ class RetornarEtapaView(LoginRequiredMixin, View):
             
             if etapa_destino == 1:
                 # Retornar para Etapa 1 (Status 2 - RECEBIDO)
-                novo_status = StatusRequisicao.objects.get(codigo='2')
+                novo_status = obter_referencia(StatusRequisicao, codigo='2')
                 observacao = "Retorno para Etapa 1 - Correção de amostras"
                 
                 # Zerar validação das amostras (para serem reavaliadas)
@@ -1910,7 +1915,7 @@ class RetornarEtapaView(LoginRequiredMixin, View):
                         {'status': 'error', 'message': 'Só é possível voltar para Etapa 2 a partir da Etapa 3.'},
                         status=400
                     )
-                novo_status = StatusRequisicao.objects.get(codigo='7')
+                novo_status = obter_referencia(StatusRequisicao, codigo='7')
                 observacao = "Retorno para Etapa 2 - Identificação de pendência"
                 
             else:
@@ -1970,8 +1975,9 @@ class ValidarMedicoCompletoView(LoginRequiredMixin, View):
     Validação completa de médico com fallback.
     
     Fluxo:
-    1. Tenta API FEMME (retorna destino)
-    2. Se falhar, tenta API KORUS (verifica se médico existe)
+    1. Consulta API FEMME (retorna destino) e API KORUS (verifica se médico
+       existe) em paralelo, com prazo total VALIDACAO_MEDICO_PRAZO
+    2. Usa o resultado da FEMME; se falhar, o da KORUS
     3. Retorna código específico do erro
     
     GET /operacao/triagem/validar-medico-completo/?crm=XXX&uf_crm=YY
@@ -2027,92 +2033,126 @@ class ValidarMedicoCompletoView(LoginRequiredMixin, View):
                 status=400
             )
         
-        # ETAPA 1: Tentar API FEMME (retorna destino)
-        try:
-            femme_client = get_femme_client()
-            response_femme = femme_client.buscar_medico(crm, uf_crm)
-            
-            if response_femme.success and response_femme.data:
-                medicos = response_femme.data
-                if medicos and len(medicos) > 0:
-                    med = medicos[0]
-                    destino = med.get('destino', '')
-                    
-                    # Verificar se tem destino
-                    if destino:
-                        # Sucesso completo - médico com destino
-                        logger.info(f"Médico validado com destino - CRM: {crm}-{uf_crm}, Destino: {destino}")
-                        return JsonResponse({
-                            'status': 'success',
-                            'medico': {
-                                'id_medico': med.get('id_medico', ''),
-                                'nome_medico': med.get('nome_medico', ''),
-                                'crm': med.get('crm', crm),
-                                'uf_crm': med.get('uf_crm', uf_crm).upper(),
-                                'endereco': med.get('logradouro', ''),
-                                'destino': destino,
-                            }
-                        })
-                    else:
-                        # Médico existe na FEMME mas sem destino
-                        logger.warning(f"Médico sem destino - CRM: {crm}-{uf_crm}")
-                        return JsonResponse({
-                            'status': 'error',
-                            'code': 'medico_sem_destino',
-                            'message': 'Médico encontrado na base, mas sem destino configurado.',
-                            'medico': {
-                                'id_medico': med.get('id_medico', ''),
-                                'nome_medico': med.get('nome_medico', ''),
-                                'crm': med.get('crm', crm),
-                                'uf_crm': med.get('uf_crm', uf_crm).upper(),
-                                'endereco': med.get('logradouro', ''),
-                            }
-                        }, status=200)  # 200 pois não é erro de servidor
-        except Exception as e:
-            logger.warning(f"Erro ao consultar API FEMME: {str(e)}")
-            # Continua para tentar API KORUS
+        # Diretório local primeiro: com entrada fresca a fonte não é consultada.
+        # As APIs restantes (FEMME e KORUS) são consultadas em paralelo, com um único prazo total.
+        # A precedência continua: FEMME com destino > FEMME sem destino > KORUS > não encontrado.
+        diretorio = ConsultaDiretorio.carregar(crm, uf_crm)
+        response_femme = diretorio.fresco(Medico.Fonte.FEMME)
+        response_korus = diretorio.fresco(Medico.Fonte.KORUS)
+        futuro_korus = None
+        
+        # ETAPA 1: Resultado da API FEMME (retorna destino)
+        if response_femme is None:
+            limite = time.monotonic() + VALIDACAO_MEDICO_PRAZO
+            # Cópia do contexto: o prazo da requisição (retry.py) vale nas threads do pool
+            futuro_femme = _executor_validacao_medico.submit(
+                contextvars.copy_context().run, cache_consultas.buscar_medico_femme, crm, uf_crm
+            )
+            if response_korus is None:
+                futuro_korus = _executor_validacao_medico.submit(
+                    contextvars.copy_context().run, cache_consultas.buscar_medico_korus, crm, uf_crm
+                )
+            response_femme = diretorio.resolver(
+                Medico.Fonte.FEMME, self._aguardar(futuro_femme, limite, 'FEMME')
+            )
+        resposta = resposta_medico_femme(response_femme, crm, uf_crm)
+        if resposta is not None:
+            if futuro_korus:
+                futuro_korus.cancel()
+            return resposta
         
-        # ETAPA 2: API FEMME falhou - tentar API KORUS para verificar se médico existe
+        # ETAPA 2: API FEMME falhou - usar API KORUS para verificar se médico existe
+        if futuro_korus is not None:
+            response_korus = diretorio.resolver(
+                Medico.Fonte.KORUS, self._aguardar(futuro_korus, limite, 'KORUS')
+            )
+        return resposta_medico_korus(response_korus, crm, uf_crm)
+
+    @staticmethod
+    def _aguardar(futuro, limite, api):
+        """Aguarda o resultado de uma consulta até o prazo total (None em erro/timeout)."""
         try:
-            korus_client = get_korus_client()
-            response_korus = korus_client.buscar_medico_por_crm(crm, uf_crm)
-            
-            if response_korus.success:
-                medico_korus = response_korus.data.get('medico', {})
-                # Médico existe na KORUS mas não na FEMME (ou sem destino)
-                logger.warning(f"Médico encontrado na KORUS mas não na FEMME - CRM: {crm}-{uf_crm}")
-                return JsonResponse({
-                    'status': 'error',
-                    'code': 'medico_sem_destino',
-                    'message': 'Médico encontrado na base, mas sem destino configurado.',
-                    'medico': {
-                        'id': medico_korus.get('id', ''),
-                        'nome_medico': medico_korus.get('nome', ''),
-                        'crm': medico_korus.get('crm', crm),
-                        'uf_crm': medico_korus.get('uf', uf_crm).upper(),
-                    }
-                }, status=200)
-            
-            # Verificar se é caso de múltiplos médicos
-            if response_korus.data and response_korus.data.get('quantidade', 0) > 1:
-                return JsonResponse({
-                    'status': 'error',
-                    'code': 'medico_duplicado',
-                    'message': response_korus.error,
-                    'medicos': response_korus.data.get('medicos', []),
-                    'quantidade': response_korus.data.get('quantidade', 0)
-                }, status=200)
-                
+            return futuro.result(timeout=max(limite - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            logger.warning(f"Prazo de {VALIDACAO_MEDICO_PRAZO}s esgotado aguardando API {api}")
         except Exception as e:
-            logger.error(f"Erro ao consultar API KORUS: {str(e)}", exc_info=True)
-        
-        # ETAPA 3: Médico não encontrado em nenhuma base
-        logger.warning(f"Médico não encontrado - CRM: {crm}-{uf_crm}")
+            logger.error(f"Erro ao consultar API {api}: {str(e)}", exc_info=True)
+        return None
+
+
+def resposta_medico_femme(response_femme, crm, uf_crm):
+    """
+    Resposta de ValidarMedicoCompletoView a partir do resultado da FEMME.
+    
+    Returns:
+        JsonResponse se a FEMME encontrou o médico; None para seguir para a KORUS
+    """
+    if not (response_femme and response_femme.success and response_femme.data):
+        return None
+    
+    med = response_femme.data[0]
+    destino = med.get('destino', '')
+    medico = {
+        'id_medico': med.get('id_medico', ''),
+        'nome_medico': med.get('nome_medico', ''),
+        'crm': med.get('crm', crm),
+        'uf_crm': med.get('uf_crm', uf_crm).upper(),
+        'endereco': med.get('logradouro', ''),
+    }
+    
+    if destino:
+        # Sucesso completo - médico com destino
+        logger.info(f"Médico validado com destino - CRM: {crm}-{uf_crm}, Destino: {destino}")
+        return JsonResponse({
+            'status': 'success',
+            'medico': {**medico, 'destino': destino},
+        })
+    
+    # Médico existe na FEMME mas sem destino
+    logger.warning(f"Médico sem destino - CRM: {crm}-{uf_crm}")
+    return JsonResponse({
+        'status': 'error',
+        'code': 'medico_sem_destino',
+        'message': 'Médico encontrado na base, mas sem destino configurado.',
+        'medico': medico,
+    }, status=200)  # 200 pois não é erro de servidor
+
+
+def resposta_medico_korus(response_korus, crm, uf_crm):
+    """Resposta de ValidarMedicoCompletoView quando a FEMME não encontrou o médico."""
+    if response_korus and response_korus.success:
+        medico_korus = response_korus.data.get('medico', {})
+        # Médico existe na KORUS mas não na FEMME (ou sem destino)
+        logger.warning(f"Médico encontrado na KORUS mas não na FEMME - CRM: {crm}-{uf_crm}")
         return JsonResponse({
             'status': 'error',
-            'code': 'medico_nao_encontrado',
-            'message': 'Médico não encontrado na base.'
-        }, status=404)
+            'code': 'medico_sem_destino',
+            'message': 'Médico encontrado na base, mas sem destino configurado.',
+            'medico': {
+                'id': medico_korus.get('id', ''),
+                'nome_medico': medico_korus.get('nome', ''),
+                'crm': medico_korus.get('crm', crm),
+                'uf_crm': medico_korus.get('uf', uf_crm).upper(),
+            }
+        }, status=200)
+    
+    # Verificar se é caso de múltiplos médicos
+    if response_korus and response_korus.data and response_korus.data.get('quantidade', 0) > 1:
+        return JsonResponse({
+            'status': 'error',
+            'code': 'medico_duplicado',
+            'message': response_korus.error,
+            'medicos': response_korus.data.get('medicos', []),
+            'quantidade': response_korus.data.get('quantidade', 0)
+        }, status=200)
+    
+    # ETAPA 3: Médico não encontrado em nenhuma base
+    logger.warning(f"Médico não encontrado - CRM: {crm}-{uf_crm}")
+    return JsonResponse({
+        'status': 'error',
+        'code': 'medico_nao_encontrado',
+        'message': 'Médico não encontrado na base.'
+    }, status=404)
 
 
 @method_decorator(ratelimit(key='user', rate='10/m', method='POST'), name='dispatch')
@@ -2181,7 +2221,7 @@ class RegistrarPendenciaMedicoView(LoginRequiredMixin, View):
             )
         
         try:
-            tipo_pendencia = TipoPendencia.objects.get(id=tipo_pendencia_id)
+            tipo_pendencia = obter_referencia(TipoPendencia, id=tipo_pendencia_id)
         except TipoPendencia.DoesNotExist:
             return JsonResponse(
                 {'status': 'error', 'message': 'Tipo de pendência não encontrado no sistema.'},
@@ -2212,7 +2252,7 @@ class RegistrarPendenciaMedicoView(LoginRequiredMixin, View):
         
         # 4. Alterar status para PENDÊNCIA (ID 6)
         try:
-            status_pendencia = StatusRequisicao.objects.get(id=6)  # PENDÊNCIA
+            status_pendencia = obter_referencia(StatusRequisicao, id=6)  # PENDÊNCIA
             requisicao.status = status_pendencia
         except StatusRequisicao.DoesNotExist:
             logger.warning("Status PENDÊNCIA (ID 6) não encontrado")
@@ -5,8 +5,14 @@ Processo em 2 etapas:
 1. GET signed URL - Gera URL pré-assinada para upload direto ao S3
 2. POST confirmar upload - Registra arquivo no banco após upload bem-sucedido
 
-@version 1.0.0
-@date 2024-12-11
+Ambas as etapas têm variante em lote (signed-urls/ e confirmar-lote/), usadas
+pelo scanner para enviar todas as páginas com uma chamada por etapa. A
+existência e o tamanho dos arquivos no bucket são verificados em segundo
+plano (verificacao_arquivos.py). Arquivos do tipo REQUISICAO agendam o OCR
+da requisição, que preenche os dados para a etapa 2 (ocr_requisicoes.py).
+
+@version 1.2.0
+@date 2026-10-18
 """
 
 import json
@@ -17,16 +23,25 @@ from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.http import JsonResponse
 from django.utils.decorators import method_decorator
 from django.views import View
 from django_ratelimit.decorators import ratelimit
 
-from core.config import get_aws_signed_url_api, get_file_url
+from core.config import get_file_url
+from core.services.external_api import get_signed_url_client
+from .idempotencia import idempotente
 from .models import DadosRequisicao, RequisicaoArquivo, TipoArquivo
+from .ocr_requisicoes import COD_TIPO_REQUISICAO, agendar_ocr
+from .referencias import obter_referencia
+from .verificacao_arquivos import agendar_verificacao
 
 logger = logging.getLogger(__name__)
 
+# Máximo de arquivos por chamada de ObterSignedUrlsLoteView e ConfirmarUploadLoteView
+MAX_ARQUIVOS_LOTE = int(os.getenv('UPLOAD_MAX_ARQUIVOS_LOTE', '50'))
+
 
 @method_decorator(ratelimit(key='user', rate='30/m', method='GET'), name='dispatch')
 class ObterSignedUrlView(LoginRequiredMixin, View):
@@ -52,9 +67,7 @@ class ObterSignedUrlView(LoginRequiredMixin, View):
     
     def get(self, request, *args, **kwargs):
         try:
-            # Obter parâmetros
             requisicao_id = request.GET.get('requisicao_id')
-            content_type = request.GET.get('content_type', 'application/pdf')
             
             # Validações
             if not requisicao_id:
@@ -63,8 +76,6 @@ class ObterSignedUrlView(LoginRequiredMixin, View):
                     status=400
                 )
             
-            # Filename será gerado automaticamente no padrão IDREQ_{cod_req}_{timestamp}.pdf
-            
             # Verificar se requisição existe e usuário tem acesso
             try:
                 requisicao = DadosRequisicao.objects.get(id=requisicao_id)
@@ -74,114 +85,212 @@ class ObterSignedUrlView(LoginRequiredMixin, View):
                     status=404
                 )
             
-            # Gerar nome do arquivo no padrão estabelecido
-            # Formato: IDREQ_{cod_req}_{YYYYMMDDHHMMSS}.pdf
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            filename_padrao = f"IDREQ_{requisicao.cod_req}_{timestamp}.pdf"
-            
             # O file_key será gerado pela API Lambda usando process_id
             # Formato: processing/{process_id}/{filename}
+            # IMPORTANTE: process_id deve ser o ID numérico da tabela dados_requisicao
+            filename_padrao = nome_arquivo_padrao(requisicao)
+            response = get_signed_url_client().gerar(
+                str(requisicao.id),
+                [arquivo_lambda(filename_padrao)]
+            )
+            return resposta_signed_url(requisicao, filename_padrao, response)
             
-            # Obter signed URL da API Lambda
-            import requests
-            
-            aws_signed_url_api = get_aws_signed_url_api()
+        except Exception as e:
+            logger.error(f"Erro ao gerar signed URL: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
+                status=500
+            )
+
+
+def nome_arquivo_padrao(requisicao) -> str:
+    """Nome do arquivo no padrão IDREQ_{cod_req}_{YYYYMMDDHHMMSS}.pdf."""
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    return f"IDREQ_{requisicao.cod_req}_{timestamp}.pdf"
+
+
+def nomes_arquivo_lote(requisicao, quantidade: int) -> list:
+    """
+    Nomes de um lote no padrão IDREQ_{cod_req}_{YYYYMMDDHHMMSS}_{NN}.pdf.
+    
+    Todas as páginas compartilham o timestamp; o sufixo NN (01, 02, ...)
+    evita nomes repetidos dentro do mesmo segundo.
+    """
+    base = nome_arquivo_padrao(requisicao).removesuffix('.pdf')
+    return [f"{base}_{indice:02d}.pdf" for indice in range(1, quantidade + 1)]
+
+
+def quantidade_lote(request):
+    """
+    Lê e valida o parâmetro quantidade de um pedido de URLs em lote.
+    
+    Returns:
+        (quantidade, None) ou (None, JsonResponse de erro)
+    """
+    try:
+        quantidade = int(request.GET.get('quantidade', ''))
+    except ValueError:
+        quantidade = 0
+    if not 1 <= quantidade <= MAX_ARQUIVOS_LOTE:
+        return None, JsonResponse(
+            {'status': 'error', 'message': f'Informe a quantidade de arquivos (1 a {MAX_ARQUIVOS_LOTE}).'},
+            status=400
+        )
+    return quantidade, None
+
+
+def arquivo_lambda(filename: str) -> dict:
+    """Item da lista 'files' enviada à API Lambda."""
+    return {
+        'name': filename.replace('.pdf', ''),
+        'type': 'application/pdf',
+        'filename': filename
+    }
+
+
+def resposta_signed_url(requisicao, filename_padrao, response) -> JsonResponse:
+    """
+    Monta a resposta de ObterSignedUrlView a partir do retorno da API Lambda.
+    
+    Compartilhado com a variante assíncrona (async_views.py).
+    """
+    if not response.success:
+        return JsonResponse(
+            {'status': 'error', 'message': response.error},
+            status=500
+        )
+    
+    # A API retorna um objeto com o nome do arquivo como chave
+    # Formato: { "filename": { "key": "...", "url": "...", "name": "..." } }
+    file_data = next(iter(response.data.values()))
+    signed_url = file_data.get('url')
+    
+    if not signed_url:
+        logger.error("URL não encontrada na resposta da API Lambda")
+        return JsonResponse(
+            {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
+            status=500
+        )
+    
+    # Extrair file_key da resposta (ou construir se não vier)
+    file_key = file_data.get('key') or f"processing/{requisicao.id}/{filename_padrao}"
+    
+    logger.info(f"Signed URL gerada: {requisicao.cod_req} - {filename_padrao}")
+    
+    return JsonResponse({
+        'status': 'success',
+        'signed_url': signed_url,
+        'file_key': file_key,
+        'original_filename': filename_padrao,
+        'expires_in': 3600,
+        'requisicao_cod': requisicao.cod_req
+    })
+
+
+def resposta_signed_urls(requisicao, nomes, response) -> JsonResponse:
+    """
+    Monta a resposta de ObterSignedUrlsLoteView a partir do retorno da API Lambda.
+    
+    O lote só é devolvido se a Lambda retornar URL para todos os arquivos.
+    Compartilhado com a variante assíncrona (async_views.py).
+    """
+    if not response.success:
+        return JsonResponse(
+            {'status': 'error', 'message': response.error},
+            status=500
+        )
+    
+    arquivos = []
+    for nome in nomes:
+        file_data = response.data.get(nome) or {}
+        if not file_data.get('url'):
+            logger.error(f"URL não encontrada na resposta da API Lambda para {nome}")
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
+                status=500
+            )
+        arquivos.append({
+            'signed_url': file_data['url'],
+            'file_key': file_data.get('key') or f"processing/{requisicao.id}/{nome}",
+            'original_filename': nome
+        })
+    
+    logger.info(f"Signed URLs geradas: {requisicao.cod_req} - {len(arquivos)} arquivo(s)")
+    
+    return JsonResponse({
+        'status': 'success',
+        'arquivos': arquivos,
+        'expires_in': 3600,
+        'requisicao_cod': requisicao.cod_req
+    })
+
+
+@method_decorator(ratelimit(key='user', rate='30/m', method='GET'), name='dispatch')
+class ObterSignedUrlsLoteView(LoginRequiredMixin, View):
+    """
+    Gera URLs pré-assinadas para vários arquivos em uma única chamada à API Lambda.
+    
+    GET /operacao/upload/signed-urls/
+    Query params:
+        - requisicao_id: ID da requisição
+        - quantidade: Número de arquivos (obrigatório; 1 a UPLOAD_MAX_ARQUIVOS_LOTE)
+    
+    Response:
+        {
+            "status": "success",
+            "arquivos": [
+                {
+                    "signed_url": "https://s3...",
+                    "file_key": "processing/123/IDREQ_ABC123_20241211120000_01.pdf",
+                    "original_filename": "IDREQ_ABC123_20241211120000_01.pdf"
+                }
+            ],
+            "expires_in": 3600,
+            "requisicao_cod": "ABC123"
+        }
+    """
+    
+    login_url = 'admin:login'
+    
+    def get(self, request, *args, **kwargs):
+        try:
+            requisicao_id = request.GET.get('requisicao_id')
             
-            if not aws_signed_url_api:
-                logger.error("AWS_SIGNED_URL_API não configurada para o ambiente atual")
+            if not requisicao_id:
                 return JsonResponse(
-                    {'status': 'error', 'message': 'Configuração de upload não encontrada.'},
-                    status=500
+                    {'status': 'error', 'message': 'ID da requisição não informado.'},
+                    status=400
                 )
             
-            # Chamar API Lambda para obter signed URL
-            # Formato esperado pela API conforme documentação
-            # IMPORTANTE: process_id deve ser o ID numérico da tabela dados_requisicao
-            
-            # Preparar payload para API Lambda
-            lambda_payload = {
-                'process_id': str(requisicao.id),
-                'files': [
-                    {
-                        'name': filename_padrao.replace('.pdf', ''),
-                        'type': 'application/pdf',
-                        'filename': filename_padrao
-                    }
-                ]
-            }
+            quantidade, erro = quantidade_lote(request)
+            if erro:
+                return erro
             
             try:
-                lambda_response = requests.post(
-                    aws_signed_url_api,
-                    json=lambda_payload,
-                    headers={
-                        'Content-Type': 'application/json',
-                        'User-Agent': 'FEMME-Integra/1.0'
-                    },
-                    timeout=10
-                )
-                
-                if lambda_response.status_code != 200:
-                    logger.error(f"Erro ao obter signed URL: {lambda_response.text}")
-                    return JsonResponse(
-                        {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
-                        status=500
-                    )
-                
-                lambda_data = lambda_response.json()
-                
-                # A API retorna um objeto com o nome do arquivo como chave
-                # Formato: { "filename": { "key": "...", "url": "...", "name": "..." } }
-                if not lambda_data or len(lambda_data) == 0:
-                    logger.error("Nenhum arquivo retornado pela API Lambda")
-                    return JsonResponse(
-                        {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
-                        status=500
-                    )
-                
-                # Extrair dados do primeiro arquivo
-                file_name_key = list(lambda_data.keys())[0]
-                file_data = lambda_data[file_name_key]
-                signed_url = file_data.get('url')
-                
-                if not signed_url:
-                    logger.error("URL não encontrada na resposta da API Lambda")
-                    return JsonResponse(
-                        {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
-                        status=500
-                    )
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro ao chamar API Lambda: {str(e)}")
+                requisicao = DadosRequisicao.objects.get(id=requisicao_id)
+            except DadosRequisicao.DoesNotExist:
                 return JsonResponse(
-                    {'status': 'error', 'message': 'Erro ao conectar com serviço de upload.'},
-                    status=500
+                    {'status': 'error', 'message': 'Requisição não encontrada.'},
+                    status=404
                 )
             
-            # Extrair file_key da resposta (ou construir se não vier)
-            file_key = file_data.get('key') or f"processing/{requisicao.id}/{filename_padrao}"
-            
-            logger.info(f"Signed URL gerada: {requisicao.cod_req} - {filename_padrao}")
-            
-            return JsonResponse({
-                'status': 'success',
-                'signed_url': signed_url,
-                'file_key': file_key,
-                'original_filename': filename_padrao,
-                'expires_in': 3600,
-                'requisicao_cod': requisicao.cod_req
-            })
+            nomes = nomes_arquivo_lote(requisicao, quantidade)
+            response = get_signed_url_client().gerar(
+                str(requisicao.id),
+                [arquivo_lambda(nome) for nome in nomes]
+            )
+            return resposta_signed_urls(requisicao, nomes, response)
             
         except Exception as e:
-            logger.error(f"Erro ao gerar signed URL: {str(e)}", exc_info=True)
+            logger.error(f"Erro ao gerar signed URLs: {str(e)}", exc_info=True)
             return JsonResponse(
-                {'status': 'error', 'message': 'Erro ao gerar URL de upload.'},
+                {'status': 'error', 'message': 'Erro ao gerar URLs de upload.'},
                 status=500
             )
 
 
 @method_decorator(ratelimit(key='user', rate='30/m', method='POST'), name='dispatch')
+@method_decorator(idempotente(), name='post')
 class ConfirmarUploadView(LoginRequiredMixin, View):
     """
     Confirma upload e registra arquivo no banco de dados.
@@ -247,7 +356,7 @@ class ConfirmarUploadView(LoginRequiredMixin, View):
             # Obter tipo de arquivo (padrão: REQUISICAO codigo=1, ou OUTROS codigo=2)
             tipo_arquivo_codigo = data.get('tipo_arquivo_codigo', 1)
             try:
-                tipo_arquivo = TipoArquivo.objects.get(codigo=tipo_arquivo_codigo, ativo=True)
+                tipo_arquivo = obter_referencia(TipoArquivo, codigo=tipo_arquivo_codigo, ativo=True)
             except TipoArquivo.DoesNotExist:
                 logger.error(f"Tipo de arquivo (codigo={tipo_arquivo_codigo}) não encontrado")
                 return JsonResponse(
@@ -265,33 +374,39 @@ class ConfirmarUploadView(LoginRequiredMixin, View):
                     status=500
                 )
             
-            # Criar registro do arquivo
-            arquivo = RequisicaoArquivo.objects.create(
-                requisicao=requisicao,
-                cod_req=requisicao.cod_req,
-                tipo_arquivo=tipo_arquivo,
-                cod_tipo_arquivo=tipo_arquivo_codigo,
-                nome_arquivo=filename,
-                url_arquivo=file_url,
-                created_by=request.user,
-                updated_by=request.user
-            )
+            # Criar registro do arquivo (existência/tamanho verificados em segundo plano).
+            # O lock da requisição serializa confirmações simultâneas; o reenvio
+            # de um arquivo já registrado devolve o registro existente.
+            with transaction.atomic():
+                requisicao = DadosRequisicao.objects.select_for_update().get(id=requisicao.id)
+                arquivo, criado = RequisicaoArquivo.objects.get_or_create(
+                    requisicao=requisicao,
+                    url_arquivo=file_url,
+                    defaults={
+                        'cod_req': requisicao.cod_req,
+                        'tipo_arquivo': tipo_arquivo,
+                        'cod_tipo_arquivo': tipo_arquivo_codigo,
+                        'nome_arquivo': filename,
+                        'tamanho_bytes': tamanho_informado(file_size),
+                        'verificacao': RequisicaoArquivo.Verificacao.PENDENTE,
+                        'created_by': request.user,
+                        'updated_by': request.user,
+                    }
+                )
+                if criado:
+                    agendar_verificacao([arquivo.id])
+                    if tipo_arquivo.codigo == COD_TIPO_REQUISICAO:
+                        agendar_ocr([requisicao.id])
             
             logger.info(
-                f"Arquivo registrado: {filename} para requisição {requisicao.cod_req} "
-                f"(ID: {arquivo.id})"
+                f"Arquivo {'registrado' if criado else 'já registrado'}: {filename} "
+                f"para requisição {requisicao.cod_req} (ID: {arquivo.id})"
             )
             
             return JsonResponse({
                 'status': 'success',
                 'message': 'Arquivo enviado e registrado com sucesso!',
-                'arquivo': {
-                    'id': arquivo.id,
-                    'nome': arquivo.nome_arquivo,
-                    'url': arquivo.url_arquivo,
-                    'data_upload': arquivo.data_upload.isoformat(),
-                    'tipo': tipo_arquivo.descricao
-                }
+                'arquivo': dados_arquivo(arquivo, tipo_arquivo)
             })
             
         except json.JSONDecodeError:
@@ -307,6 +422,177 @@ class ConfirmarUploadView(LoginRequiredMixin, View):
             )
 
 
+def tamanho_informado(file_size):
+    """Tamanho enviado pelo cliente (None se ausente ou inválido)."""
+    try:
+        tamanho = int(file_size)
+    except (TypeError, ValueError):
+        return None
+    return tamanho if tamanho > 0 else None
+
+
+def dados_arquivo(arquivo, tipo_arquivo) -> dict:
+    """Representação de um RequisicaoArquivo registrado nas respostas de confirmação."""
+    return {
+        'id': arquivo.id,
+        'nome': arquivo.nome_arquivo,
+        'url': arquivo.url_arquivo,
+        'data_upload': arquivo.data_upload.isoformat(),
+        'tipo': tipo_arquivo.descricao
+    }
+
+
+@method_decorator(ratelimit(key='user', rate='30/m', method='POST'), name='dispatch')
+@method_decorator(idempotente(), name='post')
+class ConfirmarUploadLoteView(LoginRequiredMixin, View):
+    """
+    Confirma vários uploads de uma requisição em uma única chamada.
+    
+    Os arquivos são registrados em uma transação (bulk_create). A existência
+    e o tamanho de cada objeto no bucket são verificados em segundo plano
+    (verificacao_arquivos.py). A requisição fica bloqueada (select_for_update)
+    durante o registro e chaves já registradas são ignoradas; a constraint
+    única (requisicao, url_arquivo) garante que reenvios, mesmo simultâneos,
+    não dupliquem arquivos.
+    
+    POST /operacao/upload/confirmar-lote/
+    Body:
+        {
+            "requisicao_id": 123,
+            "tipo_arquivo_codigo": 1,
+            "arquivos": [
+                {"file_key": "processing/123/IDREQ_ABC123_20241211120000_01.pdf",
+                 "filename": "IDREQ_ABC123_20241211120000_01.pdf",
+                 "file_size": 1024000}
+            ]
+        }
+    
+    Response:
+        {
+            "status": "success",
+            "message": "2 arquivo(s) registrado(s) com sucesso!",
+            "arquivos": [{"id": 456, "nome": "...", "url": "...", "data_upload": "...", "tipo": "..."}],
+            "ignorados": 0
+        }
+    """
+    
+    login_url = 'admin:login'
+    
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            
+            requisicao_id = data.get('requisicao_id')
+            arquivos = data.get('arquivos')
+            
+            if not requisicao_id:
+                return JsonResponse(
+                    {'status': 'error', 'message': 'ID da requisição não informado.'},
+                    status=400
+                )
+            
+            if not isinstance(arquivos, list) or not 1 <= len(arquivos) <= MAX_ARQUIVOS_LOTE:
+                return JsonResponse(
+                    {'status': 'error', 'message': f'Informe de 1 a {MAX_ARQUIVOS_LOTE} arquivos.'},
+                    status=400
+                )
+            
+            if not all(isinstance(a, dict) and a.get('file_key') and a.get('filename') for a in arquivos):
+                return JsonResponse(
+                    {'status': 'error', 'message': 'Informações do arquivo incompletas.'},
+                    status=400
+                )
+            
+            try:
+                requisicao = DadosRequisicao.objects.get(id=requisicao_id)
+            except DadosRequisicao.DoesNotExist:
+                return JsonResponse(
+                    {'status': 'error', 'message': 'Requisição não encontrada.'},
+                    status=404
+                )
+            
+            tipo_arquivo_codigo = data.get('tipo_arquivo_codigo', 1)
+            try:
+                tipo_arquivo = obter_referencia(TipoArquivo, codigo=tipo_arquivo_codigo, ativo=True)
+            except TipoArquivo.DoesNotExist:
+                logger.error(f"Tipo de arquivo (codigo={tipo_arquivo_codigo}) não encontrado")
+                return JsonResponse(
+                    {'status': 'error', 'message': 'Tipo de arquivo não configurado.'},
+                    status=500
+                )
+            
+            urls = {}
+            for item in arquivos:
+                file_url = get_file_url(item['file_key'])
+                if not file_url or file_url == f"/{item['file_key']}":
+                    logger.error("Erro ao construir URL do arquivo no CloudFront")
+                    return JsonResponse(
+                        {'status': 'error', 'message': 'Configuração de armazenamento não encontrada.'},
+                        status=500
+                    )
+                urls.setdefault(file_url, item)
+            
+            with transaction.atomic():
+                # Lock da requisição: confirmações simultâneas (reenvio do scanner
+                # antes da primeira resposta) esperam e veem os arquivos já gravados
+                requisicao = DadosRequisicao.objects.select_for_update().get(id=requisicao.id)
+                registradas = set(
+                    RequisicaoArquivo.objects.filter(requisicao=requisicao, url_arquivo__in=urls)
+                    .values_list('url_arquivo', flat=True)
+                )
+                a_registrar = [file_url for file_url in urls if file_url not in registradas]
+                # ignore_conflicts: a constraint única (requisicao, url_arquivo) é a garantia final
+                RequisicaoArquivo.objects.bulk_create([
+                    RequisicaoArquivo(
+                        requisicao=requisicao,
+                        cod_req=requisicao.cod_req,
+                        tipo_arquivo=tipo_arquivo,
+                        cod_tipo_arquivo=tipo_arquivo_codigo,
+                        nome_arquivo=item['filename'],
+                        url_arquivo=file_url,
+                        tamanho_bytes=tamanho_informado(item.get('file_size')),
+                        verificacao=RequisicaoArquivo.Verificacao.PENDENTE,
+                        created_by=request.user,
+                        updated_by=request.user
+                    )
+                    for file_url, item in urls.items()
+                    if file_url not in registradas
+                ], ignore_conflicts=True)
+                # Com ignore_conflicts o banco não devolve os IDs gerados
+                novos = list(
+                    RequisicaoArquivo.objects.filter(requisicao=requisicao, url_arquivo__in=a_registrar)
+                    .order_by('id')
+                )
+                agendar_verificacao([arquivo.id for arquivo in novos])
+                if novos and tipo_arquivo.codigo == COD_TIPO_REQUISICAO:
+                    agendar_ocr([requisicao.id])
+            
+            ignorados = len(arquivos) - len(novos)
+            logger.info(
+                f"Arquivos registrados em lote: {len(novos)} para requisição {requisicao.cod_req} "
+                f"({ignorados} ignorado(s))"
+            )
+            
+            return JsonResponse({
+                'status': 'success',
+                'message': f'{len(novos)} arquivo(s) registrado(s) com sucesso!',
+                'arquivos': [dados_arquivo(arquivo, tipo_arquivo) for arquivo in novos],
+                'ignorados': ignorados
+            })
+            
+        except json.JSONDecodeError:
+            return JsonResponse(
+                {'status': 'error', 'message': 'JSON inválido.'},
+                status=400
+            )
+        except Exception as e:
+            logger.error(f"Erro ao confirmar uploads em lote: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {'status': 'error', 'message': 'Erro ao registrar arquivos.'},
+                status=500
+            )
+
+
 @method_decorator(ratelimit(key='user', rate='60/m', method='GET'), name='dispatch')
 class VerificarArquivoExistenteView(LoginRequiredMixin, View):
     """
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
@@ -9,6 +10,15 @@ from . import cadastro_views
 
 app_name = 'operacao'
 
+if settings.ASYNC_VIEWS:
+    # Servidor ASGI: consultas a APIs externas sem bloquear o worker
+    from . import async_views
+
+    consultas_views = signed_url_views = async_views
+else:
+    consultas_views = triagem_views
+    signed_url_views = upload_views
+
 urlpatterns = [
     path('triagem/', views.TriagemView.as_view(), name='triagem'),
     path(
@@ -86,12 +96,12 @@ urlpatterns = [
     ),
     path(
         'triagem/consultar-cpf-korus/',
-        triagem_views.ConsultarCPFKorusView.as_view(),
+        consultas_views.ConsultarCPFKorusView.as_view(),
         name='triagem-consultar-cpf-korus',
     ),
     path(
         'triagem/consultar-cpf-receita/',
-        triagem_views.ConsultarCPFReceitaView.as_view(),
+        consultas_views.ConsultarCPFReceitaView.as_view(),
         name='triagem-consultar-cpf-receita',
     ),
     path(
@@ -116,7 +126,7 @@ urlpatterns = [
     ),
     path(
         'triagem/validar-medico-completo/',
-        triagem_views.ValidarMedicoCompletoView.as_view(),
+        consultas_views.ValidarMedicoCompletoView.as_view(),
         name='triagem-validar-medico-completo',
     ),
     path(
@@ -127,14 +137,24 @@ urlpatterns = [
     # Upload de arquivos
     path(
         'upload/signed-url/',
-        upload_views.ObterSignedUrlView.as_view(),
+        signed_url_views.ObterSignedUrlView.as_view(),
         name='upload-signed-url',
     ),
+    path(
+        'upload/signed-urls/',
+        signed_url_views.ObterSignedUrlsLoteView.as_view(),
+        name='upload-signed-urls',
+    ),
     path(
         'upload/confirmar/',
         upload_views.ConfirmarUploadView.as_view(),
         name='upload-confirmar',
     ),
+    path(
+        'upload/confirmar-lote/',
+        upload_views.ConfirmarUploadLoteView.as_view(),
+        name='upload-confirmar-lote',
+    ),
     path(
         'upload/verificar-existente/',
         upload_views.VerificarArquivoExistenteView.as_view(),
@@ -161,6 +181,11 @@ urlpatterns = [
         views.RecebimentoLocalizarView.as_view(),
         name='recebimento-localizar',
     ),
+    path(
+        'recebimento/localizar-lote/',
+        views.RecebimentoLocalizarLoteView.as_view(),
+        name='recebimento-localizar-lote',
+    ),
     path(
         'recebimento/validar/',
         views.RecebimentoValidarView.as_view(),
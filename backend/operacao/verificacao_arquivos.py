@@ -0,0 +1,113 @@
+"""
+Verificação em segundo plano dos arquivos confirmados pelo upload.
+
+A confirmação do upload (ConfirmarUploadView / ConfirmarUploadLoteView)
+apenas registra os arquivos, com verificacao=PENDENTE. Depois do commit a
+existência e o tamanho de cada objeto são conferidos fora da requisição
+(ver segundo_plano.py; UPLOAD_VERIFICACAO_THREADS threads por processo,
+padrão 2):
+
+- HEAD na URL pública do arquivo (CloudFront, mesma URL gravada em
+  url_arquivo): 200 → OK, ou TAMANHO_DIVERGENTE se o Content-Length não
+  bate com o tamanho informado pelo cliente; 403/404 → AUSENTE (o
+  CloudFront responde 403 para objetos inexistentes no S3).
+- Outras respostas e erros de conexão mantêm o arquivo PENDENTE.
+
+Arquivos que continuam pendentes são retomados pelo comando
+`verificar_uploads`.
+
+Uso:
+    from .verificacao_arquivos import agendar_verificacao
+
+    arquivos = RequisicaoArquivo.objects.bulk_create(...)
+    agendar_verificacao([a.id for a in arquivos])
+"""
+import logging
+import os
+from typing import Iterable, Optional, Tuple
+
+from django.utils import timezone
+
+from core.services.http_pool import http_request
+
+from .models import RequisicaoArquivo
+from .segundo_plano import TarefaSegundoPlano
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = float(os.getenv('UPLOAD_VERIFICACAO_TIMEOUT', '10'))
+STATUS_AUSENTE = (403, 404)
+LOTE = 100
+
+
+def agendar_verificacao(ids: Iterable[int]) -> None:
+    """Verifica os arquivos em segundo plano após o commit da transação corrente."""
+    _verificacao.agendar(ids)
+
+
+def consultar_objeto(url: str) -> Tuple[Optional[bool], Optional[int]]:
+    """
+    Consulta a existência e o tamanho de um arquivo pela URL pública.
+
+    Returns:
+        (True, tamanho) se existe; (False, None) se não existe;
+        (None, None) se não foi possível verificar
+    """
+    try:
+        response = http_request('HEAD', url, timeout=TIMEOUT, idempotente=True)
+    except Exception as e:
+        logger.warning('Verificação de upload: erro ao consultar %s: %s', url, str(e))
+        return None, None
+
+    if response.status_code == 200:
+        tamanho = response.headers.get('Content-Length')
+        return True, int(tamanho) if tamanho and tamanho.isdigit() else None
+    if response.status_code in STATUS_AUSENTE:
+        return False, None
+    logger.warning('Verificação de upload: HTTP %d em %s', response.status_code, url)
+    return None, None
+
+
+def verificar_arquivos(ids: Iterable[int]) -> dict:
+    """
+    Verifica os arquivos pendentes entre os IDs informados.
+
+    Returns:
+        Contagem por resultado (OK, AUSENTE, TAMANHO_DIVERGENTE, PENDENTE)
+    """
+    resultados = dict.fromkeys(RequisicaoArquivo.Verificacao.values, 0)
+    pendentes = RequisicaoArquivo.objects.filter(
+        id__in=list(ids),
+        verificacao=RequisicaoArquivo.Verificacao.PENDENTE,
+    ).only('id', 'cod_req', 'nome_arquivo', 'url_arquivo', 'tamanho_bytes')
+
+    for arquivo in pendentes:
+        existe, tamanho = consultar_objeto(arquivo.url_arquivo)
+        if existe is None:
+            resultados[RequisicaoArquivo.Verificacao.PENDENTE] += 1
+            continue
+
+        if not existe:
+            resultado = RequisicaoArquivo.Verificacao.AUSENTE
+            logger.warning('Upload não encontrado no bucket: %s - %s', arquivo.cod_req, arquivo.nome_arquivo)
+        elif arquivo.tamanho_bytes and tamanho is not None and tamanho != arquivo.tamanho_bytes:
+            resultado = RequisicaoArquivo.Verificacao.TAMANHO_DIVERGENTE
+            logger.warning(
+                'Upload com tamanho divergente: %s - %s (informado %d, bucket %d)',
+                arquivo.cod_req, arquivo.nome_arquivo, arquivo.tamanho_bytes, tamanho
+            )
+        else:
+            resultado = RequisicaoArquivo.Verificacao.OK
+
+        RequisicaoArquivo.objects.filter(id=arquivo.id).update(verificacao=resultado, verificado_em=timezone.now())
+        resultados[resultado] += 1
+
+    return resultados
+
+
+_verificacao = TarefaSegundoPlano(
+    'verificacao-upload',
+    verificar_arquivos,
+    threads=int(os.getenv('UPLOAD_VERIFICACAO_THREADS', '2')),
+    lote=LOTE,
+)
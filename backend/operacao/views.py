@@ -3,7 +3,6 @@ import logging
 from datetime import date
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
 from django.http import JsonResponse
@@ -14,6 +13,7 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.generic import TemplateView
 from django_ratelimit.decorators import ratelimit
 
+from .idempotencia import idempotente
 from .models import (
     DadosRequisicao,
     Notificacao,
@@ -22,7 +22,8 @@ from .models import (
     StatusRequisicao,
     Unidade,
 )
-from .services import RequisicaoService, BuscaService
+from .referencias import obter_payload
+from .services import LIMITE_LOCALIZACAO_LOTE, RequisicaoService, BuscaService
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +150,8 @@ class TriagemLocalizarView(LoginRequiredMixin, View):
                     # Flags de problema
                     'flag_problema_cpf': requisicao.flag_problema_cpf,
                     'flag_problema_medico': requisicao.flag_problema_medico,
+                    # Campos vazios preenchidos pelo OCR em segundo plano
+                    'flag_ocr': requisicao.flag_ocr,
                     # Amostras
                     'amostras': [
                         {
@@ -180,38 +183,16 @@ class RecebimentoView(LoginRequiredMixin, TemplateView):
     login_url = 'admin:login'
 
     def get_context_data(self, **kwargs):
-        from django.conf import settings
         context = super().get_context_data(**kwargs)
         
-        # Em desenvolvimento, desabilita cache completamente
-        # Em produção, usa cache de 1 hora
-        use_cache = not settings.DEBUG
-        
-        # Cache de unidades (raramente muda)
-        if use_cache:
-            unidades = cache.get('recebimento:unidades')
-            if unidades is None:
-                unidades = list(Unidade.objects.order_by('codigo', 'nome'))
-                cache.set('recebimento:unidades', unidades, 3600)
-        else:
-            unidades = list(Unidade.objects.order_by('codigo', 'nome'))
-        
-        # Cache de portadores (raramente muda)
-        if use_cache:
-            portadores = cache.get('recebimento:portadores')
-            if portadores is None:
-                portadores = list(
-                    PortadorRepresentante.objects.filter(ativo=True)
-                    .select_related('origem', 'unidade')
-                    .order_by('nome')
-                )
-                cache.set('recebimento:portadores', portadores, 3600)
-        else:
-            portadores = list(
-                PortadorRepresentante.objects.filter(ativo=True)
-                .select_related('origem', 'unidade')
-                .order_by('nome')
-            )
+        # Unidades e portadores já serializados (cache versionado: invalidado
+        # automaticamente ao salvar/excluir Unidade, Portador ou Origem)
+        referencias = obter_payload(
+            'recebimento',
+            [Unidade, PortadorRepresentante, Origem],
+            self._montar_referencias,
+        )
+        unidades = referencias['unidades']
         
         # Requisições recebidas pelo usuário logado com status 1 (ABERTO_NTO)
         requisicoes = (
@@ -228,27 +209,41 @@ class RecebimentoView(LoginRequiredMixin, TemplateView):
             {
                 'unidades': unidades,
                 'unidade_padrao': unidades[0] if unidades else None,
-                'portadores': portadores,
-                'portadores_json': json.dumps(
-                    [
-                        {
-                            'id': portador.id,
-                            'nome': portador.nome,
-                            'unidade_id': portador.unidade_id,
-                            'origem': portador.origem.descricao if portador.origem else '',
-                            'origem_id': portador.origem_id,
-                            'tipo': portador.get_tipo_display(),
-                        }
-                        for portador in portadores
-                    ],
-                    ensure_ascii=False,
-                ),
+                'portadores': referencias['portadores'],
+                'portadores_json': referencias['portadores_json'],
                 'requisicoes_recent': requisicoes,
                 'active_page': 'recebimento',
             }
         )
         return context
 
+    @staticmethod
+    def _montar_referencias():
+        """Monta unidades e portadores ativos como dicts + JSON pré-serializado."""
+        unidades = list(
+            Unidade.objects.order_by('codigo', 'nome').values('id', 'codigo', 'nome')
+        )
+        portadores = [
+            {
+                'id': portador.id,
+                'nome': portador.nome,
+                'unidade_id': portador.unidade_id,
+                'origem': portador.origem.descricao if portador.origem else '',
+                'origem_id': portador.origem_id,
+                'tipo': portador.get_tipo_display(),
+            }
+            for portador in (
+                PortadorRepresentante.objects.filter(ativo=True)
+                .select_related('origem')
+                .order_by('nome')
+            )
+        ]
+        return {
+            'unidades': unidades,
+            'portadores': portadores,
+            'portadores_json': json.dumps(portadores, ensure_ascii=False),
+        }
+
 
 @method_decorator(ratelimit(key='user', rate='30/m', method='POST'), name='dispatch')
 class RecebimentoLocalizarView(LoginRequiredMixin, View):
@@ -277,7 +272,56 @@ class RecebimentoLocalizarView(LoginRequiredMixin, View):
         return JsonResponse(resultado)
 
 
+@method_decorator(ratelimit(key='user', rate='30/m', method='POST'), name='dispatch')
+class RecebimentoLocalizarLoteView(LoginRequiredMixin, View):
+    """View para localizar vários códigos de barras em uma única chamada."""
+    
+    login_url = 'admin:login'
+
+    def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body or '{}')
+        except json.JSONDecodeError:
+            return JsonResponse(
+                {'status': 'error', 'message': 'Formato de dados inválido.'},
+                status=400,
+            )
+
+        cod_barras_lista = payload.get('cod_barras', [])
+        if not isinstance(cod_barras_lista, list):
+            return JsonResponse(
+                {'status': 'error', 'message': 'Envie os códigos de barras em uma lista.'},
+                status=400,
+            )
+
+        cod_barras_lista = [
+            str(cod).strip() for cod in cod_barras_lista if str(cod or '').strip()
+        ]
+        if not cod_barras_lista:
+            return JsonResponse(
+                {'status': 'error', 'message': 'Informe ao menos um código de barras.'},
+                status=400,
+            )
+
+        if len(cod_barras_lista) > LIMITE_LOCALIZACAO_LOTE:
+            return JsonResponse(
+                {
+                    'status': 'error',
+                    'message': f'Máximo de {LIMITE_LOCALIZACAO_LOTE} códigos de barras por consulta.',
+                },
+                status=400,
+            )
+
+        resultados = BuscaService.buscar_codigos_barras(cod_barras_lista, user=request.user)
+        return JsonResponse({
+            'status': 'success',
+            'total': len(resultados),
+            'resultados': resultados,
+        })
+
+
 @method_decorator(ratelimit(key='user', rate='20/m', method='POST'), name='dispatch')
+@method_decorator(idempotente(), name='post')
 class RecebimentoValidarView(LoginRequiredMixin, View):
     """View para validar e criar requisições."""
     
@@ -0,0 +1,54 @@
+# Gunicorn configuration file - servidor ASGI
+# Atende apenas as consultas a APIs externas (ver nginx.conf e
+# backend/operacao/async_views.py); demais rotas seguem no servidor WSGI.
+import logging
+import multiprocessing
+
+# Bind
+bind = "127.0.0.1:8004"
+
+# Workers: cada processo roda um event loop e mantém centenas de
+# consultas em andamento, então poucos processos bastam
+workers = max(multiprocessing.cpu_count() // 2, 2)
+worker_class = "uvicorn_worker.UvicornWorker"
+max_requests = 5000
+max_requests_jitter = 250
+
+# Timeouts
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Logging
+accesslog = "/var/log/femme_integra/gunicorn_asgi_access.log"
+errorlog = "/var/log/femme_integra/gunicorn_asgi_error.log"
+loglevel = "info"
+
+
+class SemQueryString(logging.Filter):
+    """Remove a query string do log de acesso do uvicorn (consultas de CPF usam ?cpf=)."""
+
+    def filter(self, record):
+        if isinstance(record.args, tuple) and len(record.args) >= 3:
+            args = list(record.args)
+            args[2] = str(args[2]).split('?', 1)[0]
+            record.args = tuple(args)
+        return True
+
+
+def post_worker_init(worker):
+    logging.getLogger("uvicorn.access").addFilter(SemQueryString())
+
+# Process naming
+proc_name = "femme_integra_asgi"
+
+# Server mechanics
+daemon = False
+pidfile = "/var/run/femme_integra/gunicorn_asgi.pid"
+user = "femme"
+group = "femme"
+
+# Security
+limit_request_line = 4096
+limit_request_fields = 100
+limit_request_field_size = 8190
@@ -1,5 +1,6 @@
 # Gunicorn configuration file
 import multiprocessing
+import os
 
 # Bind
 bind = "127.0.0.1:8003"
@@ -12,7 +13,9 @@ max_requests = 1000
 max_requests_jitter = 50
 
 # Timeouts
-timeout = 30
+# Mesmo valor usado pelo Django para o prazo das chamadas externas
+# (settings.PRAZO_REQUISICAO = GUNICORN_TIMEOUT - PRAZO_REQUISICAO_MARGEM)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
 graceful_timeout = 30
 keepalive = 2
 
@@ -20,7 +23,8 @@ keepalive = 2
 accesslog = "/var/log/femme_integra/gunicorn_access.log"
 errorlog = "/var/log/femme_integra/gunicorn_error.log"
 loglevel = "info"
-access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+# Sem query string (%(U)s em vez de %(r)s): consultas de CPF usam ?cpf=
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
 
 # Process naming
 proc_name = "femme_integra"
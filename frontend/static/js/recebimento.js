@@ -229,8 +229,8 @@ const RecebimentoModule = (() => {
         throw new Error('Endpoint de validação não configurado.');
       }
       
-      const response = await fetch(url, {
-        method: 'POST',
+      // Uma Idempotency-Key por validação: reenvios após falha de rede não duplicam a requisição
+      const response = await FemmeUtils.postIdempotente(url, {
         headers: {
           'Content-Type': 'application/json',
           'X-CSRFToken': csrfToken,
@@ -391,46 +391,43 @@ const DynamosoftScanner = (function() {
       const totalImagens = DWTObject.HowManyImagesInBuffer;
       log(`Iniciando envio de ${totalImagens} imagem(ns)...`);
       
-      const arquivosEnviados = [];
-      
-      // Processar cada imagem
+      // Converter imagens para PDF
+      const blobs = [];
       for (let i = 0; i < totalImagens; i++) {
+        log(`Processando imagem ${i + 1}/${totalImagens}...`);
+        blobs.push(await obterImagemComoBlob(i));
+      }
+      
+      // Etapa 1: Obter signed URLs de todas as imagens em uma única chamada
+      const signedUrls = await obterSignedUrls(requisicaoAtual.id, totalImagens);
+      
+      // Etapa 2: Upload para S3 em paralelo
+      let enviadas = 0;
+      if (btnEnviar && totalImagens > 1) {
+        btnEnviar.innerHTML = `<span class="btn-spinner"></span> Enviando 0/${totalImagens}...`;
+      }
+      await Promise.all(blobs.map(async (blob, i) => {
         try {
-          // Atualizar progresso no botão
-          if (btnEnviar && totalImagens > 1) {
-            btnEnviar.innerHTML = `<span class="btn-spinner"></span> Enviando ${i + 1}/${totalImagens}...`;
-          }
-          
-          log(`Processando imagem ${i + 1}/${totalImagens}...`);
-          
-          // Converter imagem para PDF
-          const blob = await obterImagemComoBlob(i);
-          
-          // Etapa 1: Obter signed URL
-          const signedUrlData = await obterSignedUrl(
-            requisicaoAtual.id,
-            blob.type
-          );
-          
-          // Etapa 2: Upload para S3
-          await uploadParaS3(signedUrlData.signed_url, blob, blob.type);
-          
-          // Etapa 3: Confirmar no backend
-          const arquivo = await confirmarUpload({
-            requisicao_id: requisicaoAtual.id,
-            file_key: signedUrlData.file_key,
-            filename: signedUrlData.original_filename,
-            file_size: blob.size
-          });
-          
-          arquivosEnviados.push(arquivo);
-          log(`✅ Imagem ${i + 1} enviada com sucesso!`);
-          
+          await uploadParaS3(signedUrls[i].signed_url, blob, blob.type);
         } catch (error) {
           logError(`Erro ao enviar imagem ${i + 1}:`, error);
           throw new Error(`Falha ao enviar imagem ${i + 1}: ${error.message}`);
         }
-      }
+        enviadas++;
+        if (btnEnviar && totalImagens > 1) {
+          btnEnviar.innerHTML = `<span class="btn-spinner"></span> Enviando ${enviadas}/${totalImagens}...`;
+        }
+      }));
+      
+      // Etapa 3: Confirmar todas as imagens no backend em uma única chamada
+      const arquivosEnviados = await confirmarUploads(
+        requisicaoAtual.id,
+        signedUrls.map((signedUrl, i) => ({
+          file_key: signedUrl.file_key,
+          filename: signedUrl.original_filename,
+          file_size: blobs[i].size
+        }))
+      );
       
       log(`✅ Todas as ${totalImagens} imagens enviadas com sucesso!`);
       
@@ -486,16 +483,16 @@ const DynamosoftScanner = (function() {
   }
   
   /**
-   * Obtém signed URL do backend
+   * Obtém signed URLs de várias imagens em uma única chamada ao backend
    * @param {number} requisicaoId - ID da requisição
-   * @param {string} contentType - Tipo MIME
-   * @returns {Promise<Object>}
+   * @param {number} quantidade - Número de imagens
+   * @returns {Promise<Array<Object>>} Lista de {signed_url, file_key, original_filename}
    */
-  async function obterSignedUrl(requisicaoId, contentType) {
-    const url = AppConfig.buildApiUrl('/operacao/upload/signed-url/');
+  async function obterSignedUrls(requisicaoId, quantidade) {
+    const url = AppConfig.buildApiUrl('/operacao/upload/signed-urls/');
     const params = new URLSearchParams({
       requisicao_id: requisicaoId,
-      content_type: contentType
+      quantidade: quantidade
     });
     
     const response = await fetch(`${url}?${params}`, {
@@ -503,12 +500,12 @@ const DynamosoftScanner = (function() {
       headers: AppConfig.getDefaultHeaders()
     });
     
-    if (!response.ok) {
-      const error = await response.json();
-      throw new Error(error.message || 'Erro ao obter URL de upload');
+    const data = await response.json();
+    if (!response.ok || data.status !== 'success') {
+      throw new Error(data.message || 'Erro ao obter URLs de upload');
     }
     
-    return await response.json();
+    return data.arquivos;
   }
   
   /**
@@ -533,17 +530,21 @@ const DynamosoftScanner = (function() {
   }
   
   /**
-   * Confirma upload no backend e registra no banco
-   * @param {Object} data - Dados do arquivo
-   * @returns {Promise<Object>}
+   * Confirma os uploads no backend e registra todos no banco em uma única chamada
+   * @param {number} requisicaoId - ID da requisição
+   * @param {Array<Object>} arquivos - Lista de {file_key, filename, file_size}
+   * @returns {Promise<Array<Object>>}
    */
-  async function confirmarUpload(data) {
-    const url = AppConfig.buildApiUrl('/operacao/upload/confirmar/');
+  async function confirmarUploads(requisicaoId, arquivos) {
+    const url = AppConfig.buildApiUrl('/operacao/upload/confirmar-lote/');
     
-    const response = await fetch(url, {
-      method: 'POST',
+    // Uma Idempotency-Key por envio: reenvios após falha de rede recebem a resposta original
+    const response = await FemmeUtils.postIdempotente(url, {
       headers: AppConfig.getDefaultHeaders(),
-      body: JSON.stringify(data)
+      body: JSON.stringify({
+        requisicao_id: requisicaoId,
+        arquivos: arquivos
+      })
     });
     
     if (!response.ok) {
@@ -552,7 +553,7 @@ const DynamosoftScanner = (function() {
     }
     
     const result = await response.json();
-    return result.arquivo;
+    return result.arquivos;
   }
   
   /**
@@ -1007,8 +1007,7 @@ async function salvarAmostraTriagem() {
   const dados = coletarDadosAmostra();
   
   try {
-    const response = await fetch('/operacao/triagem/salvar-amostra/', {
-      method: 'POST',
+    const response = await FemmeUtils.postIdempotente('/operacao/triagem/salvar-amostra/', {
       headers: {
         'Content-Type': 'application/json',
         'X-CSRFToken': getCsrfToken()
@@ -1291,8 +1290,7 @@ async function finalizarEtapa2Confirmado(pendencias) {
     btnFinalizarE2.disabled = true;
     btnFinalizarE2.textContent = '⏳ Finalizando...';
     
-    const response = await fetch('/operacao/triagem/finalizar/', {
-      method: 'POST',
+    const response = await FemmeUtils.postIdempotente('/operacao/triagem/finalizar/', {
       headers: {
         'Content-Type': 'application/json',
         'X-CSRFToken': getCsrfToken()
@@ -3360,8 +3358,7 @@ async function processarUploadImagensE3(files) {
       }
       
       // 3. Confirmar upload no backend (tipo OUTROS = código 2)
-      const confirmarResponse = await fetch('/operacao/upload/confirmar/', {
-        method: 'POST',
+      const confirmarResponse = await FemmeUtils.postIdempotente('/operacao/upload/confirmar/', {
         headers: {
           'Content-Type': 'application/json',
           'X-CSRFToken': getCsrfToken()
@@ -0,0 +1,78 @@
+/**
+ * IDEMPOTENCIA.JS - POST com Idempotency-Key e novas tentativas
+ *
+ * Endpoints acionados por bipagem/scanner (recebimento, triagem, confirmação
+ * de upload) guardam a primeira resposta por Idempotency-Key (backend:
+ * operacao/idempotencia.py). Cada ação do usuário gera uma chave, mantida
+ * em todas as tentativas dessa ação: o reenvio após uma falha de rede
+ * recebe a resposta original em vez de repetir o trabalho no banco.
+ *
+ * Tentativas:
+ * - Falha de rede (fetch rejeitado): nova tentativa com a mesma chave
+ * - HTTP 409 (primeira requisição ainda em processamento): idem
+ * - Demais respostas são devolvidas ao chamador
+ *
+ * Inclua este arquivo no base_app.html para disponibilizar globalmente.
+ *
+ * Uso:
+ *   const response = await FemmeUtils.postIdempotente(url, {
+ *     headers: {'Content-Type': 'application/json', 'X-CSRFToken': token},
+ *     body: JSON.stringify(dados)
+ *   });
+ */
+
+window.FemmeUtils = window.FemmeUtils || {};
+
+(function(FemmeUtils) {
+  'use strict';
+
+  const TENTATIVAS_PADRAO = 3;
+  const ESPERA_INICIAL_MS = 500;
+
+  /**
+   * Gera uma chave de idempotência (UUID v4).
+   * crypto.randomUUID só existe em contexto seguro (HTTPS/localhost);
+   * na rede local por HTTP usa crypto.getRandomValues.
+   *
+   * @returns {string} Chave nova
+   */
+  FemmeUtils.novaChaveIdempotencia = function() {
+    if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+      return window.crypto.randomUUID();
+    }
+    const bytes = window.crypto.getRandomValues(new Uint8Array(16));
+    bytes[6] = (bytes[6] & 0x0f) | 0x40;
+    bytes[8] = (bytes[8] & 0x3f) | 0x80;
+    const hex = Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+    return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+  };
+
+  /**
+   * POST com Idempotency-Key, repetido em falhas de rede e HTTP 409.
+   *
+   * @param {string} url - Endpoint
+   * @param {Object} opcoes - {headers, body} repassados ao fetch
+   * @param {Object} [config] - {chave, tentativas}; sem chave, uma nova é gerada
+   * @returns {Promise<Response>} Resposta da última tentativa
+   */
+  FemmeUtils.postIdempotente = async function(url, opcoes = {}, config = {}) {
+    const chave = config.chave || FemmeUtils.novaChaveIdempotencia();
+    const tentativas = config.tentativas || TENTATIVAS_PADRAO;
+    const headers = {...(opcoes.headers || {}), 'Idempotency-Key': chave};
+
+    for (let tentativa = 1; ; tentativa++) {
+      try {
+        const response = await fetch(url, {...opcoes, method: 'POST', headers});
+        if (response.status !== 409 || tentativa >= tentativas) {
+          return response;
+        }
+      } catch (erro) {
+        if (tentativa >= tentativas) {
+          throw erro;
+        }
+      }
+      await new Promise((resolve) => setTimeout(resolve, ESPERA_INICIAL_MS * 2 ** (tentativa - 1)));
+    }
+  };
+
+})(window.FemmeUtils);